@@ -15,10 +15,15 @@ from app.database import Base
 # Import all models to ensure they're registered
 from app.models import (
     ApiToken,
+    AuditEvent,
+    CacheVersion,
+    CustomVulnerabilityType,
     Session,
     User,
     Vulnerability,
+    VulnerabilityChange,
     VulnerabilityHistory,
+    VulnerabilityTypeOverride,
 )  # noqa: F401
 
 logger = logging.getLogger(__name__)
@@ -0,0 +1,59 @@
+"""add_cvss_metric_columns
+
+Revision ID: 3c9e1f7a2b44
+Revises: 0a5cfbab3db9
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9e1f7a2b44'
+down_revision = '0a5cfbab3db9'
+branch_labels = None
+depends_on = None
+
+
+# column -> (metric, allowed values, versions the metric exists in)
+METRIC_COLUMNS = {
+    'cvss_av': ('AV', 'NALP', ('3.1', '4.0')),
+    'cvss_ac': ('AC', 'LH', ('3.1', '4.0')),
+    'cvss_pr': ('PR', 'NLH', ('3.1', '4.0')),
+    'cvss_ui': ('UI', 'NRPA', ('3.1', '4.0')),
+    'cvss_s': ('S', 'UC', ('3.1',)),
+    'cvss_c': ('C', 'NLH', ('3.1',)),
+    'cvss_i': ('I', 'NLH', ('3.1',)),
+    'cvss_a': ('A', 'NLH', ('3.1',)),
+}
+
+
+def upgrade() -> None:
+    for column in METRIC_COLUMNS:
+        op.add_column('vulnerabilities', sa.Column(column, sa.String(length=1), nullable=True))
+
+    # Backfill in one set-based UPDATE per version, extracting each metric with a regex.
+    for version in ('3.1', '4.0'):
+        assignments = ',\n'.join(
+            f"{column} = substring(cvss_vector from '/{metric}:([{values}])(/|$)')"
+            for column, (metric, values, versions) in METRIC_COLUMNS.items()
+            if version in versions
+        )
+        op.execute(
+            f"UPDATE vulnerabilities SET\n{assignments}\n"
+            f"WHERE cvss_vector LIKE 'CVSS:{version}/%'"
+        )
+
+    for column in METRIC_COLUMNS:
+        op.create_index(op.f(f'ix_vulnerabilities_{column}'), 'vulnerabilities', [column], unique=False)
+    op.create_index(
+        'ix_vulnerabilities_cvss_av_pr_ui', 'vulnerabilities', ['cvss_av', 'cvss_pr', 'cvss_ui'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vulnerabilities_cvss_av_pr_ui', table_name='vulnerabilities')
+    for column in METRIC_COLUMNS:
+        op.drop_index(op.f(f'ix_vulnerabilities_{column}'), table_name='vulnerabilities')
+        op.drop_column('vulnerabilities', column)
@@ -0,0 +1,40 @@
+"""add_type_overrides_and_cache_versions
+
+Revision ID: 5d2a8b6c9e13
+Revises: 3c9e1f7a2b44
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2a8b6c9e13'
+down_revision = '3c9e1f7a2b44'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'vulnerability_type_overrides',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('icon', sa.String(length=50), nullable=False),
+        sa.Column('color', sa.String(length=50), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    cache_versions = op.create_table(
+        'cache_versions',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(cache_versions, [{'name': 'vulnerability_types', 'version': 1}])
+
+
+def downgrade() -> None:
+    op.drop_table('cache_versions')
+    op.drop_table('vulnerability_type_overrides')
@@ -0,0 +1,61 @@
+"""add_audit_events_table
+
+Revision ID: 7b4e2f9a1c58
+Revises: 5d2a8b6c9e13
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from datetime import date
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7b4e2f9a1c58'
+down_revision = '5d2a8b6c9e13'
+branch_labels = None
+depends_on = None
+
+
+def _next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    # Range-partitioned by month; the writer creates further monthly partitions
+    # on demand and anything outside them lands in the default partition.
+    op.execute(
+        """
+        CREATE TABLE audit_events (
+            id UUID NOT NULL,
+            ts TIMESTAMPTZ NOT NULL,
+            action VARCHAR(100) NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            actor_id VARCHAR(64),
+            target JSONB,
+            ip VARCHAR(64),
+            user_agent VARCHAR(512),
+            extra JSONB,
+            PRIMARY KEY (id, ts)
+        ) PARTITION BY RANGE (ts)
+        """
+    )
+    op.execute("CREATE TABLE audit_events_default PARTITION OF audit_events DEFAULT")
+
+    month = date.today().replace(day=1)
+    for _ in range(3):
+        end = _next_month(month)
+        op.execute(
+            f"CREATE TABLE audit_events_{month:%Y_%m} PARTITION OF audit_events "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        month = end
+
+    op.create_index('ix_audit_events_ts', 'audit_events', ['ts'])
+    op.create_index('ix_audit_events_actor_ts', 'audit_events', ['actor_id', 'ts'])
+    op.create_index('ix_audit_events_action_ts', 'audit_events', ['action', 'ts'])
+
+
+def downgrade() -> None:
+    # Dropping the parent drops every partition and index.
+    op.execute("DROP TABLE audit_events")
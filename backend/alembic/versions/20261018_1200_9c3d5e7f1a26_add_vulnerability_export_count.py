@@ -0,0 +1,27 @@
+"""add_vulnerability_export_count
+
+Revision ID: 9c3d5e7f1a26
+Revises: 7b4e2f9a1c58
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c3d5e7f1a26'
+down_revision = '7b4e2f9a1c58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'vulnerabilities',
+        sa.Column('export_count', sa.Integer(), server_default='0', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('vulnerabilities', 'export_count')
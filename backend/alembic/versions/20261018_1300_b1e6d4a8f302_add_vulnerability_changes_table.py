@@ -0,0 +1,36 @@
+"""add_vulnerability_changes_table
+
+Revision ID: b1e6d4a8f302
+Revises: 9c3d5e7f1a26
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b1e6d4a8f302'
+down_revision = '9c3d5e7f1a26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'vulnerability_changes',
+        sa.Column('seq', sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column('ts', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('action', sa.String(length=20), nullable=False),
+        sa.Column('vulnerability_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.PrimaryKeyConstraint('seq'),
+    )
+    op.create_index('ix_vulnerability_changes_ts', 'vulnerability_changes', ['ts'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vulnerability_changes_ts', table_name='vulnerability_changes')
+    op.drop_table('vulnerability_changes')
+    op.execute("DELETE FROM cache_versions WHERE name = 'vulnerability_changes'")
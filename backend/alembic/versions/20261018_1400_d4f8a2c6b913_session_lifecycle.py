@@ -0,0 +1,38 @@
+"""session_lifecycle
+
+Revision ID: d4f8a2c6b913
+Revises: b1e6d4a8f302
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f8a2c6b913'
+down_revision = 'b1e6d4a8f302'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Deleting a user lets the database remove its sessions (api_tokens already cascade)
+    op.drop_constraint('sessions_user_id_fkey', 'sessions', type_='foreignkey')
+    op.create_foreign_key(
+        'sessions_user_id_fkey', 'sessions', 'users', ['user_id'], ['id'], ondelete='CASCADE'
+    )
+    op.create_index('ix_sessions_user_id', 'sessions', ['user_id'])
+    op.create_index('ix_sessions_expires_at', 'sessions', ['expires_at'])
+    # Small: only logged-out sessions awaiting expiry (lookups by token use uq_sessions_token_hash)
+    op.create_index(
+        'ix_sessions_revoked_expires_at', 'sessions', ['expires_at'], postgresql_where=sa.text('NOT is_active')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sessions_revoked_expires_at', table_name='sessions')
+    op.drop_index('ix_sessions_expires_at', table_name='sessions')
+    op.drop_index('ix_sessions_user_id', table_name='sessions')
+    op.drop_constraint('sessions_user_id_fkey', 'sessions', type_='foreignkey')
+    op.create_foreign_key('sessions_user_id_fkey', 'sessions', 'users', ['user_id'], ['id'])
@@ -13,10 +13,14 @@ class Settings(BaseSettings):
 
     # Database
     database_url: PostgresDsn
+    db_pool_size: int = 5
+    db_max_overflow: int = 15
 
     # Security
     secret_key: str
     session_lifetime_hours: int = 24
+    # "stateless": session cookies carry signed claims checked in memory instead of a lookup per request
+    session_mode: Literal["database", "stateless"] = "database"
     token_default_lifetime_days: int = 90
 
     # CORS
@@ -25,6 +29,20 @@ class Settings(BaseSettings):
     # Environment
     environment: Literal["development", "staging", "production"] = "development"
 
+    # Audit pipeline
+    audit_queue_size: int = 10000
+    audit_batch_size: int = 500
+    audit_flush_interval_seconds: float = 1.0
+
+    # Export render cache (memory budget for pre-rendered fragments)
+    render_cache_max_bytes: int = 64 * 1024 * 1024
+
+    # Similar-findings index (persisted between restarts when a path is set)
+    similarity_index_path: str | None = None
+
+    # Pre-rendered full-library payloads (bulk sync, XML export) served from this directory when set
+    snapshot_dir: str | None = None
+
     # Rate Limiting
     rate_limit_enabled: bool = True
     rate_limit_per_minute: int = 60
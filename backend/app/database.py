@@ -36,8 +36,8 @@ engine = create_async_engine(
     database_url,
     echo=settings.environment == "development",
     pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
     **engine_kwargs,
 )
 
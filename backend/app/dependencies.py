@@ -1,12 +1,14 @@
-"""FastAPI dependencies for auth, permissions, and rate limiting."""
+"""FastAPI dependencies for auth, permissions, rate limiting and admission control."""
 
 from __future__ import annotations
 
 import asyncio
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
 from typing import Annotated, Callable
 
 from fastapi import Cookie, Depends, Header, HTTPException, Request, status
+from fastapi.requests import HTTPConnection
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -14,6 +16,8 @@ from app.database import get_db
 from app.models.api_token import ApiToken
 from app.models.user import User, UserRole
 from app.security import hash_token
+from app.utils.bulkheads import bulkheads, endpoint_class
+from app.utils.query_budget import apply_budget, budget_for
 from app.utils.session_manager import SessionContext, validate_session
 
 
@@ -101,6 +105,32 @@ def rate_limited(
     return dependency
 
 
+def admission(default_class: str) -> Callable[..., AsyncIterator[None]]:
+    """
+    Router-level dependency holding a bulkhead slot for the whole request.
+
+    Routes use ``default_class`` unless marked with ``bulkhead_class``, and
+    that class's query budget unless they declare one with ``query_budget``.
+    Router dependencies resolve before the route's own, so the slot is taken
+    and the budget set before authentication or the endpoint touches the
+    database.
+    """
+
+    async def dependency(connection: HTTPConnection, db: AsyncSession = Depends(get_db)) -> AsyncIterator[None]:
+        endpoint = connection.scope.get("endpoint")
+        name = endpoint_class(endpoint, default_class)
+        budget = budget_for(endpoint, name)
+        if budget is not None:
+            apply_budget(connection, db, budget)
+        if name is None:
+            yield
+            return
+        async with bulkheads[name].slot():
+            yield
+
+    return dependency
+
+
 async def get_current_user_from_session(
     session_id: Annotated[str | None, Cookie(alias="session_id")] = None,
     db: AsyncSession = Depends(get_db),
@@ -242,3 +272,31 @@ def require_scope(
         return api_token
 
     return check_scope
+
+
+def require_user_or_scope(
+    required_scope: str,
+) -> callable:
+    """
+    Create a dependency accepting either a signed-in user (session cookie) or an
+    API token with ``required_scope`` (Authorization header), for endpoints
+    shared by the web UI and the Word add-in.
+    """
+    async def check_user_or_scope(
+        authorization: Annotated[str | None, Header()] = None,
+        session_id: Annotated[str | None, Cookie(alias="session_id")] = None,
+        db: AsyncSession = Depends(get_db),
+    ) -> User | ApiToken:
+        if authorization:
+            api_token, _ = await verify_api_token(authorization, db)
+            if not api_token.has_scope(required_scope):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=f"Token missing required scope: {required_scope}",
+                )
+            return api_token
+
+        user = await get_current_user_from_session(session_id, db)
+        return await get_current_active_user(user)
+
+    return check_user_or_scope
@@ -1,21 +1,59 @@
 """Main FastAPI application."""
 
+import asyncio
 from contextlib import asynccontextmanager
+from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import DBAPIError
 
 from app.config import settings
-from app.database import engine
-from app.routers import auth, cvss, tokens, types, users, vulnerabilities
+from app.database import AsyncSessionLocal, engine
+from app.routers import admin, auth, cvss, tokens, types, users, vulnerabilities
+from app.utils.audit import audit_pipeline
+from app.utils.change_feed import change_feed
+from app.utils.notifier import ChangeNotifier
+from app.utils.query_budget import QUERY_CANCELED, timeout_detail
+from app.utils.session_revocations import session_revocations
+from app.utils.session_sweeper import session_sweeper
+from app.utils.similarity import similarity_index
+from app.utils.snapshots import library_snapshots
+from app.utils.suggest import suggest_index
+from app.utils.type_catalog import type_catalog
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
+    audit_pipeline.start(AsyncSessionLocal)
+    session_sweeper.start(AsyncSessionLocal)
+    suggest_index.start(AsyncSessionLocal)
+    notifier = ChangeNotifier(engine)
+    type_catalog.watch(notifier)
+    session_revocations.watch(notifier)
+    change_feed.watch(notifier, AsyncSessionLocal)
+    if settings.snapshot_dir:
+        library_snapshots.configure(Path(settings.snapshot_dir), AsyncSessionLocal)
+        library_snapshots.watch(notifier)
+    await notifier.start()
+    await change_feed.start()
+    await library_snapshots.start()
+    app.state.notifier = notifier
+    if settings.similarity_index_path:
+        await asyncio.to_thread(similarity_index.load, Path(settings.similarity_index_path))
     yield
     # Shutdown
+    await library_snapshots.stop()
+    await change_feed.stop()
+    await notifier.stop()
+    if similarity_index.path is not None:
+        await asyncio.to_thread(similarity_index.save, similarity_index.path)
+    await session_sweeper.stop()
+    await suggest_index.stop()
+    await audit_pipeline.stop()
     await engine.dispose()
 
 
@@ -36,6 +74,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(DBAPIError)
+async def database_error_handler(request: Request, exc: DBAPIError):
+    """Report statements stopped by the route's query budget as ``504``."""
+    if getattr(exc.orig, "sqlstate", None) == QUERY_CANCELED:
+        return JSONResponse(status_code=504, content={"detail": timeout_detail(request)})
+    raise exc
+
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -43,6 +90,7 @@ app.include_router(tokens.router)
 app.include_router(vulnerabilities.router)
 app.include_router(cvss.router)
 app.include_router(types.router)
+app.include_router(admin.router)
 
 
 @app.get("/")
@@ -1,14 +1,23 @@
 """Database models."""
 
 from app.models.api_token import ApiToken
+from app.models.audit_event import AuditEvent
+from app.models.cache_version import CacheVersion
+from app.models.custom_type import CustomVulnerabilityType, VulnerabilityTypeOverride
 from app.models.session import Session
 from app.models.user import User
 from app.models.vulnerability import Vulnerability, VulnerabilityHistory
+from app.models.vulnerability_change import VulnerabilityChange
 
 __all__ = [
     "User",
     "ApiToken",
     "Vulnerability",
     "VulnerabilityHistory",
+    "VulnerabilityChange",
     "Session",
+    "CustomVulnerabilityType",
+    "VulnerabilityTypeOverride",
+    "CacheVersion",
+    "AuditEvent",
 ]
@@ -44,15 +44,18 @@ class ApiToken(Base):
     @property
     def is_valid(self) -> bool:
         """Check if token is currently valid."""
-        now = datetime.now(timezone.utc)
+        return self.compute_is_valid(self.revoked_at, self.expires_at)
 
+    @classmethod
+    def compute_is_valid(cls, revoked_at: datetime | None, expires_at: datetime | None) -> bool:
+        """Validity check on plain column values (used by column-only queries)."""
         # Check if revoked
-        if self.revoked_at is not None:
+        if revoked_at is not None:
             return False
 
         # Check if expired
-        expires_at = self._coerce_to_utc(self.expires_at)
-        if expires_at is not None and expires_at < now:
+        expires_at = cls._coerce_to_utc(expires_at)
+        if expires_at is not None and expires_at < datetime.now(timezone.utc):
             return False
 
         return True
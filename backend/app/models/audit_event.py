@@ -0,0 +1,53 @@
+"""Persisted audit events."""
+
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, DateTime, Index, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class AuditEvent(Base):
+    """
+    One audit entry.
+
+    On PostgreSQL the table is range-partitioned by month on ``ts`` (see the
+    migration), which is why ``ts`` is part of the primary key.
+    """
+
+    __tablename__ = "audit_events"
+    __table_args__ = (
+        Index("ix_audit_events_actor_ts", "actor_id", "ts"),
+        Index("ix_audit_events_action_ts", "action", "ts"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True, index=True)
+
+    action: Mapped[str] = mapped_column(String(100), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    actor_id: Mapped[str | None] = mapped_column(String(64))
+    target: Mapped[dict[str, Any] | None] = mapped_column(JSONB().with_variant(JSON(), "sqlite"))
+    ip: Mapped[str | None] = mapped_column(String(64))
+    user_agent: Mapped[str | None] = mapped_column(String(512))
+    extra: Mapped[dict[str, Any] | None] = mapped_column(JSONB().with_variant(JSON(), "sqlite"))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "id": str(self.id),
+            "ts": self.ts.isoformat(),
+            "action": self.action,
+            "status": self.status,
+            "actor_id": self.actor_id,
+            "target": self.target,
+            "ip": self.ip,
+            "user_agent": self.user_agent,
+            "extra": self.extra,
+        }
+
+    def __repr__(self) -> str:
+        return f"<AuditEvent {self.action} {self.ts}>"
@@ -0,0 +1,23 @@
+"""Version counters for data cached in memory by every worker."""
+
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class CacheVersion(Base):
+    """
+    Monotonic version of a named cache.
+
+    Writers bump the counter in the same transaction as the change; workers
+    compare it with the version they loaded to decide whether to reload.
+    """
+
+    __tablename__ = "cache_versions"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<CacheVersion {self.name}={self.version}>"
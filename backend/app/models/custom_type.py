@@ -34,3 +34,23 @@ class CustomVulnerabilityType(Base):
 
     def __repr__(self) -> str:
         return f"<CustomVulnerabilityType {self.name} ({self.category})>"
+
+
+class VulnerabilityTypeOverride(Base):
+    """Persisted metadata overrides for built-in vulnerability types."""
+
+    __tablename__ = "vulnerability_type_overrides"
+
+    # Name of the built-in type being overridden
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+
+    icon: Mapped[str] = mapped_column(String(50), nullable=False)
+    color: Mapped[str] = mapped_column(String(50), nullable=False)
+    description: Mapped[str] = mapped_column(Text, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<VulnerabilityTypeOverride {self.name}>"
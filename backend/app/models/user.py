@@ -41,12 +41,12 @@ class User(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
-    # Relationships
+    # Relationships (rows are removed by ON DELETE CASCADE, never loaded to delete a user)
     tokens: Mapped[list["ApiToken"]] = relationship(
-        "ApiToken", back_populates="owner", cascade="all, delete-orphan"
+        "ApiToken", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True
     )
     sessions: Mapped[list["Session"]] = relationship(
-        "Session", back_populates="user", cascade="all, delete-orphan"
+        "Session", back_populates="user", cascade="all, delete-orphan", passive_deletes=True
     )
 
     def __repr__(self) -> str:
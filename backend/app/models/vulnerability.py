@@ -4,11 +4,13 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Enum, Float, ForeignKey, JSON, String, Text, func
+from sqlalchemy import DateTime, Enum, Float, ForeignKey, Index, Integer, JSON, String, Text, func
 from sqlalchemy.dialects.postgresql import JSONB, UUID
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, validates
 
 from app.database import Base
+from app.utils import cvss4_calculator
+from app.utils.cvss_calculator import CVSSCalculator
 
 
 class VulnerabilityLevel(str, enum.Enum):
@@ -99,10 +101,43 @@ class VulnerabilityType(str, enum.Enum):
     OTHER = "Other"
 
 
+# Indexed per-metric columns derived from cvss_vector. AV/AC/PR/UI are filled
+# for both CVSS 3.1 and 4.0 vectors; S/C/I/A only exist in CVSS 3.1.
+CVSS_METRIC_COLUMNS = {
+    "AV": "cvss_av",
+    "AC": "cvss_ac",
+    "PR": "cvss_pr",
+    "UI": "cvss_ui",
+    "S": "cvss_s",
+    "C": "cvss_c",
+    "I": "cvss_i",
+    "A": "cvss_a",
+}
+
+
+def cvss_metric_values(vector: str | None) -> dict[str, str | None]:
+    """Return the metric column values for a CVSS vector (all None if unparseable)."""
+    metrics: dict[str, str] | None = None
+    if vector:
+        if vector.startswith(cvss4_calculator.VERSION_PREFIX):
+            metrics = cvss4_calculator.parse_vector(vector)
+        else:
+            metrics = CVSSCalculator.parse_vector(vector)
+            if metrics and not CVSSCalculator.validate_metrics(metrics):
+                metrics = None
+
+    metrics = metrics or {}
+    return {column: metrics.get(metric) for metric, column in CVSS_METRIC_COLUMNS.items()}
+
+
 class Vulnerability(Base):
     """Main vulnerability model."""
 
     __tablename__ = "vulnerabilities"
+    __table_args__ = (
+        # "Network-exploitable, no privileges, no interaction" style lookups
+        Index("ix_vulnerabilities_cvss_av_pr_ui", "cvss_av", "cvss_pr", "cvss_ui"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
@@ -118,6 +153,16 @@ class Vulnerability(Base):
     cvss_score: Mapped[float | None] = mapped_column(Float, nullable=True, index=True)
     cvss_vector: Mapped[str | None] = mapped_column(String(255), nullable=True)
 
+    # CVSS metrics parsed from cvss_vector on write (see CVSS_METRIC_COLUMNS)
+    cvss_av: Mapped[str | None] = mapped_column(String(1), nullable=True, index=True)
+    cvss_ac: Mapped[str | None] = mapped_column(String(1), nullable=True, index=True)
+    cvss_pr: Mapped[str | None] = mapped_column(String(1), nullable=True, index=True)
+    cvss_ui: Mapped[str | None] = mapped_column(String(1), nullable=True, index=True)
+    cvss_s: Mapped[str | None] = mapped_column(String(1), nullable=True, index=True)
+    cvss_c: Mapped[str | None] = mapped_column(String(1), nullable=True, index=True)
+    cvss_i: Mapped[str | None] = mapped_column(String(1), nullable=True, index=True)
+    cvss_a: Mapped[str | None] = mapped_column(String(1), nullable=True, index=True)
+
     # Details
     description: Mapped[str] = mapped_column(Text, nullable=False)
     risk: Mapped[str] = mapped_column(Text, nullable=False)
@@ -133,6 +178,9 @@ class Vulnerability(Base):
         JSONB().with_variant(JSON(), "sqlite"), nullable=True
     )
 
+    # Popularity: number of Word/docx exports (not part of the content, so updating it keeps updated_at)
+    export_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
     # Metadata
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
@@ -141,6 +189,13 @@ class Vulnerability(Base):
     created_by: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     updated_by: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
 
+    @validates("cvss_vector")
+    def _sync_cvss_metrics(self, _key: str, value: str | None) -> str | None:
+        """Keep the per-metric columns in step with the vector."""
+        for column, metric_value in cvss_metric_values(value).items():
+            setattr(self, column, metric_value)
+        return value
+
     def __repr__(self) -> str:
         return f"<Vulnerability {self.name} ({self.level.value})>"
 
@@ -0,0 +1,32 @@
+"""Sequenced log of library changes, read by the live change feed."""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, String, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class VulnerabilityChange(Base):
+    """
+    One committed create, update or delete of a vulnerability.
+
+    ``seq`` is allocated from a ``cache_versions`` counter whose row stays
+    locked until the writing transaction commits, so sequence order is commit
+    order and a client resuming after ``seq`` N cannot miss a later commit of
+    a lower number. There is no foreign key: entries outlive deleted rows.
+    """
+
+    __tablename__ = "vulnerability_changes"
+
+    seq: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    action: Mapped[str] = mapped_column(String(20), nullable=False)
+    vulnerability_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<VulnerabilityChange {self.seq} {self.action} {self.vulnerability_id}>"
@@ -0,0 +1,111 @@
+"""Administrative maintenance routes (admin-only)."""
+
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import get_db
+from app.dependencies import admission, require_admin
+from app.models.audit_event import AuditEvent
+from app.models.user import User
+from app.utils.audit import audit_log
+from app.utils.cvss_consistency import jobs, running_job, start_consistency_job
+from app.utils.metrics import metrics
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(admission("admin"))])
+
+
+@router.post("/cvss-consistency", status_code=status.HTTP_202_ACCEPTED)
+async def start_cvss_consistency_check(
+    request: Request,
+    fix: bool = Query(False, description="Rewrite mismatching scores and levels"),
+    chunk_size: int = Query(1000, ge=100, le=10000, description="Rows read per batch"),
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    """
+    Start a background CVSS consistency check over the whole library (admin-only).
+
+    Every stored vector is re-scored and compared with `cvss_score`, and `level`
+    is compared with the severity implied by the score. With `fix=true` the
+    mismatches are corrected, each with a history entry authored by the admin.
+    Poll the returned job for progress and results. Only one check runs at a
+    time per worker; job state is kept in the memory of the worker that
+    started it, so with several workers a poll landing elsewhere gets `404`.
+    """
+    if (current := running_job()) is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Consistency check {current.id} is already running",
+        )
+    session_factory = async_sessionmaker(db.bind, class_=AsyncSession, expire_on_commit=False)
+    job = start_consistency_job(session_factory, fix=fix, chunk_size=chunk_size, changed_by=admin.id)
+
+    audit_log(
+        "admin.cvss_consistency",
+        actor_id=str(admin.id),
+        request=request,
+        target={"job_id": str(job.id)},
+        extra={"fix": fix},
+    )
+
+    return job.as_dict()
+
+
+@router.get("/cvss-consistency/{job_id}")
+async def get_cvss_consistency_job(
+    job_id: UUID,
+    _: User = Depends(require_admin),
+):
+    """
+    Get status and report of a CVSS consistency job (admin-only).
+
+    Only the worker that started the job knows it; other workers answer `404`.
+    """
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+
+    return job.as_dict()
+
+
+@router.get("/audit/events")
+async def list_audit_events(
+    actor_id: str | None = Query(None, description="Filter by actor (user ID)"),
+    action: str | None = Query(None, description="Filter by action, e.g. vuln.export_doc"),
+    since: datetime | None = Query(None, description="Only events at or after this time (ISO 8601)"),
+    until: datetime | None = Query(None, description="Only events before this time (ISO 8601)"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of events"),
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(require_admin),
+):
+    """
+    Query persisted audit events, newest first (admin-only).
+
+    Filters use the (actor_id, ts) and (action, ts) indexes. To page back in
+    time, pass the `ts` of the last event received as `until`.
+    """
+    query = select(AuditEvent).order_by(AuditEvent.ts.desc()).limit(limit)
+    if actor_id:
+        query = query.where(AuditEvent.actor_id == actor_id)
+    if action:
+        query = query.where(AuditEvent.action == action)
+    if since:
+        query = query.where(AuditEvent.ts >= since)
+    if until:
+        query = query.where(AuditEvent.ts < until)
+
+    result = await db.execute(query)
+    return [event.as_dict() for event in result.scalars()]
+
+
+@router.get("/metrics")
+async def get_metrics(_: User = Depends(require_admin)):
+    """Return this worker's internal counters and gauges (admin-only)."""
+    return metrics.snapshot()
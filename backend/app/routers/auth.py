@@ -6,14 +6,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.database import get_db
-from app.dependencies import get_current_active_user, rate_limited
+from app.dependencies import admission, get_current_active_user, rate_limited
 from app.models.user import User
 from app.schemas.auth import LoginRequest, LoginResponse, UserInfo
 from app.security import verify_password
 from app.utils.audit import audit_log
 from app.utils.session_manager import create_session, invalidate_session
 
-router = APIRouter(prefix="/api/auth", tags=["auth"])
+router = APIRouter(prefix="/api/auth", tags=["auth"], dependencies=[Depends(admission("interactive"))])
 
 
 @router.post("/login", response_model=LoginResponse)
@@ -1,9 +1,13 @@
 """CVSS Calculator routes."""
 
-from fastapi import APIRouter, HTTPException, status
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query, status
 from pydantic import BaseModel, Field
 
-from app.utils.cvss_calculator import build_cvss_vector, calculate_cvss
+from app.utils import cvss4_calculator
+from app.utils.cvss_calculator import BASE_METRICS, CVSSCalculator, calculate_cvss
+from app.utils.cvss_calculator import build_cvss_from_metrics as build_cvss
 
 router = APIRouter(prefix="/api/cvss", tags=["cvss"])
 
@@ -11,29 +15,41 @@ router = APIRouter(prefix="/api/cvss", tags=["cvss"])
 class CVSSVectorRequest(BaseModel):
     """Request to parse CVSS vector string."""
 
-    vector: str = Field(..., description="CVSS 3.1 vector string")
+    vector: str = Field(..., description="CVSS 3.1 or 4.0 vector string")
 
 
 class CVSSMetricsRequest(BaseModel):
     """Request to calculate CVSS from individual metrics."""
 
-    av: str = Field(..., description="Attack Vector (N, A, L, P)")
-    ac: str = Field(..., description="Attack Complexity (L, H)")
-    pr: str = Field(..., description="Privileges Required (N, L, H)")
-    ui: str = Field(..., description="User Interaction (N, R)")
-    s: str = Field(..., description="Scope (U, C)")
-    c: str = Field(..., description="Confidentiality Impact (N, L, H)")
-    i: str = Field(..., description="Integrity Impact (N, L, H)")
-    a: str = Field(..., description="Availability Impact (N, L, H)")
+    version: Literal["3.1", "4.0"] = Field("3.1", description="CVSS version")
+    metrics: dict[str, str] = Field(
+        default_factory=dict,
+        description="Metric abbreviations mapped to values (any version, including temporal/environmental/threat)",
+    )
+    av: str | None = Field(None, description="Attack Vector (N, A, L, P)")
+    ac: str | None = Field(None, description="Attack Complexity (L, H)")
+    pr: str | None = Field(None, description="Privileges Required (N, L, H)")
+    ui: str | None = Field(None, description="User Interaction (N, R)")
+    s: str | None = Field(None, description="Scope (U, C)")
+    c: str | None = Field(None, description="Confidentiality Impact (N, L, H)")
+    i: str | None = Field(None, description="Integrity Impact (N, L, H)")
+    a: str | None = Field(None, description="Availability Impact (N, L, H)")
 
 
 class CVSSResponse(BaseModel):
     """CVSS calculation response."""
 
-    score: float = Field(..., description="CVSS Base Score (0.0 - 10.0)")
+    version: str = Field("3.1", description="CVSS version (3.1 or 4.0)")
+    score: float = Field(..., description="CVSS score (0.0 - 10.0): base score for 3.1, see nomenclature for 4.0")
     severity: str = Field(..., description="Severity rating (None, Low, Medium, High, Critical)")
-    vector: str = Field(..., description="CVSS 3.1 vector string")
+    vector: str = Field(..., description="CVSS vector string")
     metrics: dict = Field(..., description="Individual metric values")
+    base_score: float | None = Field(None, description="Base score")
+    temporal_score: float | None = Field(None, description="CVSS 3.1 Temporal score (if temporal metrics given)")
+    environmental_score: float | None = Field(
+        None, description="CVSS 3.1 Environmental score (if environmental metrics given)"
+    )
+    nomenclature: str | None = Field(None, description="CVSS 4.0 nomenclature (CVSS-B, CVSS-BT, CVSS-BE, CVSS-BTE)")
 
 
 @router.post("/calculate", response_model=CVSSResponse)
@@ -41,14 +57,19 @@ async def calculate_cvss_score(request: CVSSVectorRequest):
     """
     Calculate CVSS score from vector string.
 
-    Example vector: `CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H`
+    Example vectors:
+    - `CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H` (temporal and environmental metrics allowed)
+    - `CVSS:4.0/AV:N/AC:L/AT:N/PR:N/UI:N/VC:H/VI:H/VA:H/SC:N/SI:N/SA:N`
     """
     result = calculate_cvss(request.vector)
 
     if not result:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid CVSS vector string. Format: CVSS:3.1/AV:X/AC:X/PR:X/UI:X/S:X/C:X/I:X/A:X",
+            detail=(
+                "Invalid CVSS vector string. Format: CVSS:3.1/AV:X/AC:X/PR:X/UI:X/S:X/C:X/I:X/A:X "
+                "or CVSS:4.0/AV:X/AC:X/AT:X/PR:X/UI:X/VC:X/VI:X/VA:X/SC:X/SI:X/SA:X"
+            ),
         )
 
     return CVSSResponse(**result)
@@ -59,7 +80,9 @@ async def build_cvss_from_metrics(request: CVSSMetricsRequest):
     """
     Build CVSS vector and calculate score from individual metrics.
 
-    Metrics:
+    Pass `version` and a `metrics` mapping for any supported version (see
+    `GET /api/cvss/metrics?version=...`). For CVSS 3.1 base metrics, the
+    lowercase fields below are still accepted:
     - AV (Attack Vector): N=Network, A=Adjacent, L=Local, P=Physical
     - AC (Attack Complexity): L=Low, H=High
     - PR (Privileges Required): N=None, L=Low, H=High
@@ -69,16 +92,14 @@ async def build_cvss_from_metrics(request: CVSSMetricsRequest):
     - I (Integrity Impact): N=None, L=Low, H=High
     - A (Availability Impact): N=None, L=Low, H=High
     """
-    result = build_cvss_vector(
-        av=request.av,
-        ac=request.ac,
-        pr=request.pr,
-        ui=request.ui,
-        s=request.s,
-        c=request.c,
-        i=request.i,
-        a=request.a,
-    )
+    metrics = dict(request.metrics)
+    if request.version == "3.1":
+        for metric in BASE_METRICS:
+            value = getattr(request, metric.lower())
+            if value is not None:
+                metrics.setdefault(metric, value)
+
+    result = build_cvss(metrics, version=request.version)
 
     if not result:
         raise HTTPException(
@@ -90,27 +111,58 @@ async def build_cvss_from_metrics(request: CVSSMetricsRequest):
 
 
 @router.get("/metrics", response_model=dict)
-async def get_cvss_metrics():
+async def get_cvss_metrics(
+    version: Literal["3.1", "4.0"] = Query("3.1", description="CVSS version"),
+):
     """
-    Get available CVSS 3.1 metrics and their possible values.
+    Get available CVSS metrics and their possible values for a version.
 
-    Returns all metrics definitions for building a CVSS calculator UI.
+    Returns all metrics definitions for building a CVSS calculator UI. Each
+    metric carries its group (base, temporal, environmental, threat,
+    supplemental).
     """
-    from app.utils.cvss_calculator import CVSSCalculator
+    if version == "4.0":
+        return {
+            metric_code: {
+                "name": cvss4_calculator.METRICS[metric_code]["name"],
+                "group": group,
+                "options": [
+                    {"code": code, "value": value}
+                    for code, value in cvss4_calculator.METRICS[metric_code]["values"].items()
+                ],
+            }
+            for group, metric_codes in cvss4_calculator.METRIC_GROUPS.items()
+            for metric_code in metric_codes
+        }
+
+    metric_names = {
+        "AV": "Attack Vector",
+        "AC": "Attack Complexity",
+        "PR": "Privileges Required",
+        "UI": "User Interaction",
+        "S": "Scope",
+        "C": "Confidentiality Impact",
+        "I": "Integrity Impact",
+        "A": "Availability Impact",
+        "E": "Exploit Code Maturity",
+        "RL": "Remediation Level",
+        "RC": "Report Confidence",
+        "CR": "Confidentiality Requirement",
+        "IR": "Integrity Requirement",
+        "AR": "Availability Requirement",
+    }
+    groups = {
+        **{code: "base" for code in CVSSCalculator.METRICS},
+        **{code: "temporal" for code in CVSSCalculator.TEMPORAL_METRICS},
+        **{code: "environmental" for code in CVSSCalculator.ENVIRONMENTAL_METRICS},
+    }
 
     metrics_info = {}
 
-    for metric_code, metric_data in CVSSCalculator.METRICS.items():
-        metric_name = {
-            "AV": "Attack Vector",
-            "AC": "Attack Complexity",
-            "PR": "Privileges Required",
-            "UI": "User Interaction",
-            "S": "Scope",
-            "C": "Confidentiality Impact",
-            "I": "Integrity Impact",
-            "A": "Availability Impact",
-        }.get(metric_code, metric_code)
+    for metric_code, metric_data in {**CVSSCalculator.METRICS, **CVSSCalculator.OPTIONAL_METRICS}.items():
+        metric_name = metric_names.get(metric_code)
+        if metric_name is None and metric_code.startswith("M"):
+            metric_name = f"Modified {metric_names[metric_code[1:]]}"
 
         options = []
         for code, data in metric_data.items():
@@ -118,9 +170,9 @@ async def get_cvss_metrics():
                 "code": code,
                 "value": data["value"],
             }
-            # Add score if not Scope (which doesn't have a direct score)
-            if metric_code != "S" and "score" in data:
-                score = data["score"]
+            # Add score if the metric has a direct weight
+            score = data.get("score")
+            if score is not None:
                 # Handle PR's conditional scoring
                 if isinstance(score, dict):
                     option["score_unchanged"] = score["U"]
@@ -132,6 +184,7 @@ async def get_cvss_metrics():
 
         metrics_info[metric_code] = {
             "name": metric_name,
+            "group": groups[metric_code],
             "options": options,
         }
 
@@ -8,7 +8,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.dependencies import rate_limited, require_admin, verify_api_token
+from app.dependencies import admission, rate_limited, require_admin, verify_api_token
 from app.models.api_token import ApiToken
 from app.models.user import User
 from app.schemas.token import (
@@ -19,8 +19,9 @@ from app.schemas.token import (
 )
 from app.security import generate_api_token, get_default_token_expiration, hash_token
 from app.utils.audit import audit_log
+from app.utils.fast_read import API_TOKEN_COLUMNS, api_token_list_adapter, json_response, labelled, rows_as_dicts
 
-router = APIRouter(prefix="/api/tokens", tags=["tokens"])
+router = APIRouter(prefix="/api/tokens", tags=["tokens"], dependencies=[Depends(admission("interactive"))])
 
 
 @router.post("", response_model=ApiTokenWithSecret, status_code=status.HTTP_201_CREATED)
@@ -84,10 +85,13 @@ async def list_tokens(
 
     Does not include the actual token secrets.
     """
-    result = await db.execute(select(ApiToken).order_by(ApiToken.created_at.desc()))
-    tokens = result.scalars().all()
+    result = await db.execute(select(*labelled(API_TOKEN_COLUMNS)).order_by(ApiToken.created_at.desc()))
 
-    return [ApiTokenInfo.model_validate(token) for token in tokens]
+    tokens = rows_as_dicts(result.mappings())
+    for token in tokens:
+        token["is_valid"] = ApiToken.compute_is_valid(token["revoked_at"], token["expires_at"])
+
+    return json_response(api_token_list_adapter, tokens)
 
 
 @router.get("/{token_id}", response_model=ApiTokenInfo)
@@ -1,16 +1,17 @@
 """Vulnerability types routes."""
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.utils.vulnerability_types import VULNERABILITY_TYPES, get_types_by_category
-from app.dependencies import require_admin, get_db
+from app.utils.type_catalog import bump_version, type_catalog
+from app.utils.vulnerability_types import VULNERABILITY_TYPES
+from app.dependencies import admission, require_admin, get_db
 from app.models.user import User
-from app.models.custom_type import CustomVulnerabilityType
+from app.models.custom_type import CustomVulnerabilityType, VulnerabilityTypeOverride
 
-router = APIRouter(prefix="/api/types", tags=["types"])
+router = APIRouter(prefix="/api/types", tags=["types"], dependencies=[Depends(admission("interactive"))])
 
 
 class TypeMetadataUpdate(BaseModel):
@@ -30,68 +31,33 @@ class TypeMetadataCreate(BaseModel):
 
 
 @router.get("")
-async def get_vulnerability_types(db: AsyncSession = Depends(get_db)):
+async def get_vulnerability_types(request: Request, db: AsyncSession = Depends(get_db)):
     """
     Get all vulnerability types with their metadata (icons, colors, descriptions).
 
     Returns types organized by category for easy display in dropdowns.
     Includes both built-in ENUM types and custom user-created types.
-    """
-    # Get built-in types
-    all_types = list(VULNERABILITY_TYPES.values())
-
-    # Get custom types from database
-    result = await db.execute(select(CustomVulnerabilityType))
-    custom_types = result.scalars().all()
 
-    # Add custom types to the list
-    for custom_type in custom_types:
-        all_types.append({
-            "name": custom_type.name,
-            "category": custom_type.category,
-            "icon": custom_type.icon,
-            "color": custom_type.color,
-            "description": custom_type.description,
-            "is_custom": True
-        })
+    The catalog is served from memory with a version number and an ETag;
+    clients sending a matching `If-None-Match` get `304 Not Modified`.
+    """
+    catalog = await type_catalog.get(db)
+    headers = {"ETag": catalog.etag, "Cache-Control": "no-cache"}
 
-    # Organize by category
-    by_category = {}
-    for type_data in all_types:
-        category = type_data["category"]
-        if category not in by_category:
-            by_category[category] = []
-        by_category[category].append(type_data)
+    if request.headers.get("if-none-match") == catalog.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    return {
-        "types": all_types,
-        "by_category": by_category,
-    }
+    return Response(content=catalog.body, media_type="application/json", headers=headers)
 
 
 @router.get("/{type_name}")
 async def get_vulnerability_type(type_name: str, db: AsyncSession = Depends(get_db)):
     """Get metadata for a specific vulnerability type (built-in or custom)."""
-    # Check built-in types first
-    type_meta = VULNERABILITY_TYPES.get(type_name)
+    catalog = await type_catalog.get(db)
+    type_meta = catalog.get(type_name)
     if type_meta:
         return type_meta
 
-    # Check custom types
-    result = await db.execute(
-        select(CustomVulnerabilityType).where(CustomVulnerabilityType.name == type_name)
-    )
-    custom_type = result.scalar_one_or_none()
-    if custom_type:
-        return {
-            "name": custom_type.name,
-            "category": custom_type.category,
-            "icon": custom_type.icon,
-            "color": custom_type.color,
-            "description": custom_type.description,
-            "is_custom": True
-        }
-
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
         detail=f"Type '{type_name}' not found"
@@ -135,8 +101,10 @@ async def create_custom_type(
         description=type_data.description
     )
     db.add(custom_type)
+    await bump_version(db)
     await db.commit()
     await db.refresh(custom_type)
+    type_catalog.invalidate()
 
     return {
         "message": f"Custom type '{type_data.name}' created successfully",
@@ -161,20 +129,26 @@ async def update_vulnerability_type(
     """
     Update metadata for a vulnerability type (admin only).
 
-    Built-in types: Updates in-memory only (not persisted).
+    Built-in types: Metadata overrides are saved to database (persistent).
     Custom types: Updates are saved to database (persistent).
     """
     # Check if it's a built-in type
     if type_name in VULNERABILITY_TYPES:
-        # Update in-memory (non-persistent)
-        VULNERABILITY_TYPES[type_name]["icon"] = update.icon
-        VULNERABILITY_TYPES[type_name]["color"] = update.color
-        VULNERABILITY_TYPES[type_name]["description"] = update.description
-
+        override = await db.get(VulnerabilityTypeOverride, type_name)
+        if override is None:
+            override = VulnerabilityTypeOverride(name=type_name)
+            db.add(override)
+        override.icon = update.icon
+        override.color = update.color
+        override.description = update.description
+        await bump_version(db)
+        await db.commit()
+        type_catalog.invalidate()
+
+        catalog = await type_catalog.get(db)
         return {
-            "message": f"Built-in type '{type_name}' updated successfully (in-memory only)",
-            "type": VULNERABILITY_TYPES[type_name],
-            "warning": "Changes are not persisted. Update the source code for permanent changes."
+            "message": f"Built-in type '{type_name}' updated successfully",
+            "type": catalog.get(type_name),
         }
 
     # Check if it's a custom type
@@ -192,8 +166,10 @@ async def update_vulnerability_type(
     custom_type.icon = update.icon
     custom_type.color = update.color
     custom_type.description = update.description
+    await bump_version(db)
     await db.commit()
     await db.refresh(custom_type)
+    type_catalog.invalidate()
 
     return {
         "message": f"Custom type '{type_name}' updated successfully",
@@ -239,6 +215,8 @@ async def delete_custom_type(
 
     # Delete
     await db.delete(custom_type)
+    await bump_version(db)
     await db.commit()
+    type_catalog.invalidate()
 
     return {"message": f"Custom type '{type_name}' deleted successfully"}
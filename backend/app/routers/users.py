@@ -7,7 +7,7 @@ from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.dependencies import require_admin, get_current_active_user
+from app.dependencies import admission, require_admin, get_current_active_user
 from app.models.user import User, UserRole
 from app.schemas.user import (
     UserCreate,
@@ -18,8 +18,9 @@ from app.schemas.user import (
     UserListResponse,
 )
 from app.security import hash_password, verify_password
+from app.utils.session_revocations import session_revocations
 
-router = APIRouter(prefix="/api/users", tags=["users"])
+router = APIRouter(prefix="/api/users", tags=["users"], dependencies=[Depends(admission("interactive"))])
 
 
 @router.get("", response_model=UserListResponse)
@@ -128,6 +129,7 @@ async def update_user(
     user.full_name = user_data.full_name
     user.role = user_data.role
     user.is_active = user_data.is_active
+    await session_revocations.users_changed(db)
 
     await db.commit()
     await db.refresh(user)
@@ -174,15 +176,18 @@ async def change_own_password(
 
     Requires current password verification.
     """
+    # Stateless sessions resolve to a detached user without the password hash
+    user = await db.get(User, current_user.id)
+
     # Verify current password
-    if not verify_password(password_data.current_password, current_user.password_hash):
+    if not verify_password(password_data.current_password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect",
         )
 
     # Update password
-    current_user.password_hash = hash_password(password_data.new_password)
+    user.password_hash = hash_password(password_data.new_password)
     await db.commit()
 
     return {"message": "Password updated successfully"}
@@ -229,8 +234,9 @@ async def delete_user(
                 detail="Cannot delete the last admin user",
             )
 
-    # Delete user (sessions and tokens will cascade delete)
+    # Delete user (the database cascades to sessions and tokens)
     await db.delete(user)
+    await session_revocations.users_changed(db)
     await db.commit()
 
     return {"message": f"User '{user.username}' deleted successfully"}
@@ -1,48 +1,126 @@
 """Vulnerability CRUD and search routes."""
 
+import asyncio
+import json
 from datetime import datetime, timezone
-from typing import Any
+from functools import partial
+from typing import Any, Literal
 from uuid import UUID
 
 from fastapi import (
     APIRouter,
     Depends,
     File,
+    Header,
     HTTPException,
     Query,
     Request,
     Response,
     UploadFile,
+    WebSocket,
     status,
 )
+from fastapi.responses import StreamingResponse
+from starlette.websockets import WebSocketDisconnect
 from lxml import etree
-from sqlalchemy import and_, func, or_, select
+from sqlalchemy import ColumnElement, and_, delete, func, insert, literal, or_, select, union_all, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.dependencies import (
+    admission,
     get_current_active_user,
     require_editor,
     require_scope,
+    require_user_or_scope,
 )
 from app.models.api_token import ApiToken
 from app.models.user import User
-from app.models.vulnerability import Vulnerability, VulnerabilityHistory, VulnerabilityLevel, VulnerabilityType
+from app.models.vulnerability import (
+    CVSS_METRIC_COLUMNS,
+    Vulnerability,
+    cvss_metric_values,
+    VulnerabilityHistory,
+    VulnerabilityLevel,
+    VulnerabilityType,
+)
 from app.schemas.vulnerability import (
+    DocxReportRequest,
+    DuplicateCluster,
+    DuplicateEntry,
+    DuplicatesResponse,
+    SimilarVulnerability,
+    VulnerabilityBulkDelete,
+    VulnerabilityBulkResult,
+    VulnerabilityBulkUpdate,
     VulnerabilityCreate,
     VulnerabilityExportDoc,
+    VulnerabilityFacets,
+    VulnerabilityIdList,
     VulnerabilityInfo,
     VulnerabilityUpdate,
     VulnerabilitySearchResponse,
+    VulnerabilitySuggestion,
+)
+from app.utils.fast_read import (
+    VULNERABILITY_COLUMNS,
+    VULNERABILITY_VIEWS,
+    catalog_adapter,
+    json_response,
+    labelled,
+    rows_as_dicts,
+    vulnerability_details_adapter,
+    vulnerability_list_adapter,
+    vulnerability_page_adapter,
 )
+from app.utils import docx_report, ooxml
+from app.utils.bulkheads import bulkhead_class
+from app.utils.cancellation import cancel_on_disconnect
+from app.utils.change_feed import ChangeEvent, Subscription, change_feed, current_sequence, record_changes
+from app.utils.duplicates import duplicate_index
+from app.utils.library_state import content_version, library_state
+from app.utils.query_budget import enforce_row_budget, limit_rows, query_budget
+from app.utils.render_cache import export_cache
+from app.utils.similarity import SimilarMatch, similarity_index, term_vector
+from app.utils.single_flight import SingleFlight
+from app.utils.snapshots import library_snapshots
+from app.utils.suggest import suggest_index
+from app.utils.vulnerability_types import VULNERABILITY_TYPES
 from app.utils.xml_parser import parse_vulnerabilities_xml, export_vulnerabilities_xml
 from app.utils.audit import audit_log
 
-router = APIRouter(prefix="/api/vulns", tags=["vulnerabilities"])
+router = APIRouter(prefix="/api/vulns", tags=["vulnerabilities"], dependencies=[Depends(admission("interactive"))])
 
+# Identical concurrent full-library reads share one query and serialisation
+library_reads = SingleFlight("library_reads")
 
-@router.get("", response_model=VulnerabilitySearchResponse)
-async def search_vulnerabilities(
+
+CVSS_METRIC_PATTERN = "^[A-Za-z]$"
+
+# Upper bound for filter-based .docx annexes
+DOCX_REPORT_MAX_FINDINGS = 1000
+
+# Row budgets: full-library reads, and rows one bulk edit or delete may touch
+LIBRARY_MAX_ROWS = 50_000
+BULK_CHANGE_MAX_ROWS = 5000
+
+# Severity order used when a report selection comes from filters
+LEVEL_RANK = {level: rank for rank, level in enumerate(VulnerabilityLevel)}
+
+# Typeahead reads may lag writes by this many seconds (keeps lookups query-free)
+SUGGEST_MAX_STALENESS = 1.0
+
+# Seconds between keep-alives on idle change streams
+STREAM_HEARTBEAT_SECONDS = 15.0
+
+# Reconnect delay suggested to EventSource clients
+STREAM_RETRY_MS = 3000
+
+# Columns of the Word sync catalog (updated_at becomes the entry version)
+CATALOG_FIELDS = ("id", "name", "level", "type", "cvss_score", "updated_at")
+
+
+def vulnerability_filters(
     q: str | None = Query(None, description="Search query (name, description, risk)"),
     level: VulnerabilityLevel | None = Query(None, description="Filter by severity level"),
     scope: str | None = Query(None, description="Filter by scope (substring)"),
@@ -54,40 +132,39 @@ async def search_vulnerabilities(
     types_bracket: list[VulnerabilityType] | None = Query(None, alias="types[]", description="Filter by multiple types (types[] style)"),
     min_score: float | None = Query(None, ge=0.0, le=10.0, description="Minimum CVSS score"),
     max_score: float | None = Query(None, ge=0.0, le=10.0, description="Maximum CVSS score"),
-    page: int = Query(1, ge=1, description="Page number"),
-    per_page: int = Query(50, ge=1, le=100, description="Items per page"),
-    sort: str = Query("updated_at", description="Sort field (name, level, cvss_score, updated_at)"),
-    order: str = Query("desc", description="Sort order (asc, desc)"),
-    db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_active_user),
-):
-    """
-    Search and filter vulnerabilities.
-
-    Supports full-text search, filtering, pagination, and sorting.
-    """
-    # Build query
-    query = select(Vulnerability)
+    # CVSS metric filters (indexed columns parsed from cvss_vector)
+    av: str | None = Query(None, pattern=CVSS_METRIC_PATTERN, description="CVSS Attack Vector (N, A, L, P)"),
+    ac: str | None = Query(None, pattern=CVSS_METRIC_PATTERN, description="CVSS Attack Complexity (L, H)"),
+    pr: str | None = Query(None, pattern=CVSS_METRIC_PATTERN, description="CVSS Privileges Required (N, L, H)"),
+    ui: str | None = Query(None, pattern=CVSS_METRIC_PATTERN, description="CVSS User Interaction (N, R; 4.0: N, P, A)"),
+    s: str | None = Query(None, pattern=CVSS_METRIC_PATTERN, description="CVSS 3.1 Scope (U, C)"),
+    c: str | None = Query(None, pattern=CVSS_METRIC_PATTERN, description="CVSS 3.1 Confidentiality Impact (N, L, H)"),
+    i: str | None = Query(None, pattern=CVSS_METRIC_PATTERN, description="CVSS 3.1 Integrity Impact (N, L, H)"),
+    a: str | None = Query(None, pattern=CVSS_METRIC_PATTERN, description="CVSS 3.1 Availability Impact (N, L, H)"),
+) -> list[ColumnElement[bool]]:
+    """Build the WHERE clauses shared by the search and facet endpoints."""
+    filters: list[ColumnElement[bool]] = []
 
     # Text search
     if q:
-        search_filter = or_(
-            Vulnerability.name.ilike(f"%{q}%"),
-            Vulnerability.description.ilike(f"%{q}%"),
-            Vulnerability.risk.ilike(f"%{q}%"),
-            Vulnerability.recommendation.ilike(f"%{q}%"),
+        filters.append(
+            or_(
+                Vulnerability.name.ilike(f"%{q}%"),
+                Vulnerability.description.ilike(f"%{q}%"),
+                Vulnerability.risk.ilike(f"%{q}%"),
+                Vulnerability.recommendation.ilike(f"%{q}%"),
+            )
         )
-        query = query.where(search_filter)
 
     # Filters
     if level:
-        query = query.where(Vulnerability.level == level)
+        filters.append(Vulnerability.level == level)
 
     if scope:
-        query = query.where(Vulnerability.scope.ilike(f"%{scope}%"))
+        filters.append(Vulnerability.scope.ilike(f"%{scope}%"))
 
     if protocol:
-        query = query.where(Vulnerability.protocol_interface.ilike(f"%{protocol}%"))
+        filters.append(Vulnerability.protocol_interface.ilike(f"%{protocol}%"))
 
     # Consolidate type filters (multi-type takes precedence)
     type_filters: list[VulnerabilityType] | None = None
@@ -99,17 +176,108 @@ async def search_vulnerabilities(
         type_filters = [vuln_type]
 
     if type_filters:
-        query = query.where(Vulnerability.vuln_type.in_(type_filters))
+        filters.append(Vulnerability.vuln_type.in_(type_filters))
 
     if min_score is not None:
-        query = query.where(Vulnerability.cvss_score >= min_score)
+        filters.append(Vulnerability.cvss_score >= min_score)
 
     if max_score is not None:
-        query = query.where(Vulnerability.cvss_score <= max_score)
+        filters.append(Vulnerability.cvss_score <= max_score)
+
+    metric_filters = {"AV": av, "AC": ac, "PR": pr, "UI": ui, "S": s, "C": c, "I": i, "A": a}
+    for metric, value in metric_filters.items():
+        if value:
+            column = getattr(Vulnerability, CVSS_METRIC_COLUMNS[metric])
+            filters.append(column == value.upper())
+
+    return filters
+
+
+def vulnerability_projection(
+    view: Literal["summary", "card", "full"] = Query(
+        "full", description="Named projection: summary (list rows), card (no text bodies) or full"
+    ),
+    fields: str | None = Query(
+        None, description="Comma-separated response fields (overrides view), e.g. name,level,cvss_score"
+    ),
+) -> list[str]:
+    """Resolve the response fields to select; `id` is always included."""
+    if fields is None:
+        return list(VULNERABILITY_VIEWS[view])
+
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(requested) - VULNERABILITY_COLUMNS.keys())
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(VULNERABILITY_COLUMNS)}",
+        )
+    # Keep response order stable regardless of request order
+    selected = {"id", *requested}
+    return [name for name in VULNERABILITY_COLUMNS if name in selected]
+
+
+async def count_facets(db: AsyncSession, filters: list[ColumnElement[bool]]) -> VulnerabilityFacets:
+    """
+    Count matches per level, type and type category in a single statement.
+
+    The database groups by (level, type) only; the per-level, per-type,
+    per-category and total counts are rolled up from those few rows. This gives
+    the same result as GROUPING SETS while also running on SQLite.
+    """
+    result = await db.execute(
+        select(Vulnerability.level, Vulnerability.vuln_type, func.count())
+        .where(*filters)
+        .group_by(Vulnerability.level, Vulnerability.vuln_type)
+    )
+
+    facets = VulnerabilityFacets(total=0, level={}, type={}, category={})
+    for level, vuln_type, count in result:
+        category = VULNERABILITY_TYPES.get(vuln_type.value, {}).get("category", "Others")
+        facets.total += count
+        facets.level[level.value] = facets.level.get(level.value, 0) + count
+        facets.type[vuln_type.value] = facets.type.get(vuln_type.value, 0) + count
+        facets.category[category] = facets.category.get(category, 0) + count
+
+    return facets
+
 
+@router.get("", response_model=VulnerabilitySearchResponse)
+async def search_vulnerabilities(
+    request: Request,
+    filters: list[ColumnElement[bool]] = Depends(vulnerability_filters),
+    page: int = Query(1, ge=1, description="Page number"),
+    per_page: int = Query(50, ge=1, le=100, description="Items per page"),
+    sort: str = Query("updated_at", description="Sort field (name, level, cvss_score, updated_at)"),
+    order: str = Query("desc", description="Sort order (asc, desc)"),
+    facets: bool = Query(False, description="Include level/type/category counts for the filters"),
+    projection: list[str] = Depends(vulnerability_projection),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_active_user),
+):
+    """
+    Search and filter vulnerabilities.
+
+    Supports full-text search, filtering (including CVSS metrics such as
+    `av=N&pr=N`), pagination, and sorting. With `facets=true` the response also
+    carries the facet counts (the total then comes from the same query).
+
+    Use `view=summary|card` or `fields=` to fetch only some columns; the
+    others are not read from the database. Fetch full details per item with
+    `GET /api/vulns/{id}`.
+    """
     # Count total (before pagination)
-    count_query = select(func.count()).select_from(query.subquery())
-    total_count = await db.scalar(count_query)
+    facet_counts: VulnerabilityFacets | None = None
+    if facets:
+        facet_counts = await cancel_on_disconnect(request, db, count_facets(db, filters))
+        total_count = facet_counts.total
+    else:
+        total_count = await cancel_on_disconnect(
+            request, db, db.scalar(select(func.count()).select_from(Vulnerability).where(*filters))
+        )
+
+    # Build query (plain columns, serialised without ORM objects)
+    query = select(*labelled(VULNERABILITY_COLUMNS, projection)).where(*filters)
 
     # Sorting
     sort_field = getattr(Vulnerability, sort, Vulnerability.updated_at)
@@ -122,15 +290,17 @@ async def search_vulnerabilities(
     offset = (page - 1) * per_page
     query = query.offset(offset).limit(per_page)
 
-    result = await db.execute(query)
-    vulnerabilities = result.scalars().all()
+    result = await cancel_on_disconnect(request, db, db.execute(query))
 
-    items = [VulnerabilityInfo.model_validate(v) for v in vulnerabilities]
-    return VulnerabilitySearchResponse(
-        items=items,
-        total=int(total_count or 0),
-        page=page,
-        per_page=per_page,
+    return json_response(
+        vulnerability_page_adapter,
+        {
+            "items": rows_as_dicts(result.mappings()),
+            "total": int(total_count or 0),
+            "page": page,
+            "per_page": per_page,
+            "facets": facet_counts,
+        },
     )
 
 
@@ -140,19 +310,28 @@ async def search_vulnerabilities(
 
 
 @router.get("/bulk", response_model=list[VulnerabilityInfo])
+@bulkhead_class("sync")
+@query_budget(statement_timeout=30.0, max_rows=LIBRARY_MAX_ROWS)
 async def get_bulk_vulnerabilities(
+    request: Request,
     updated_since: str | None = Query(None, description="ISO 8601 datetime"),
+    projection: list[str] = Depends(vulnerability_projection),
     db: AsyncSession = Depends(get_db),
     token: ApiToken = Depends(require_scope("read:vulns")),
 ):
     """
     Get all vulnerabilities for Word macro cache (requires API token with read:vulns scope).
 
-    Optionally filter by updated_since to get only recent changes.
+    Optionally filter by updated_since to get only recent changes, and use
+    `view=` or `fields=` to fetch only some columns. A full sync (no filter,
+    full view) is served from the pre-rendered snapshot when it is current,
+    compressed and with an ETag; otherwise identical concurrent requests
+    against the same library version share one query.
     """
-    query = select(Vulnerability)
+    query = select(*labelled(VULNERABILITY_COLUMNS, projection))
 
     # Filter by updated_since if provided
+    since_dt = None
     if updated_since:
         try:
             since_dt = datetime.fromisoformat(updated_since.replace("Z", "+00:00"))
@@ -165,10 +344,318 @@ async def get_bulk_vulnerabilities(
 
     query = query.order_by(Vulnerability.name.asc())
 
-    result = await db.execute(query)
-    vulnerabilities = result.scalars().all()
+    async def render() -> bytes:
+        result = await db.execute(limit_rows(request, query))
+        rows = rows_as_dicts(result.mappings())
+        enforce_row_budget(request, len(rows))
+        return vulnerability_list_adapter.dump_json(rows)
+
+    state = await library_state(db)
+    if since_dt is None and projection == list(VULNERABILITY_COLUMNS):
+        snapshot = library_snapshots.lookup("bulk", state.version)
+        if snapshot is not None:
+            return library_snapshots.response(request, snapshot)
+
+    key = ("bulk", "read:vulns", state.version, since_dt, tuple(projection))
+    body = await cancel_on_disconnect(request, db, library_reads.do(key, render))
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/catalog")
+@bulkhead_class("sync")
+async def get_vulnerability_catalog(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    token: ApiToken = Depends(require_scope("read:vulns")),
+):
+    """
+    Lightweight library catalog for the Word add-in (requires API token with read:vulns scope).
+
+    Each entry carries only id, name, level, type, score and `v`, a content
+    version that changes whenever the entry changes. Fetch full cards with
+    `POST /api/vulns/details` for the entries that are actually used. The
+    response has an ETag: send it back in `If-None-Match` to get `304` when
+    nothing changed, without the catalog being rebuilt.
+    """
+    state = await library_state(db)
+    headers = {"ETag": state.etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == state.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    async def render() -> bytes:
+        result = await db.execute(
+            select(*labelled(VULNERABILITY_COLUMNS, CATALOG_FIELDS)).order_by(Vulnerability.name.asc())
+        )
+        items = []
+        for row in result.mappings():
+            entry = dict(row)
+            entry["v"] = content_version(entry.pop("updated_at"))
+            items.append(entry)
+        return catalog_adapter.dump_json({"version": state.version, "items": items})
+
+    body = await library_reads.do(("catalog", "read:vulns", state.version), render)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.post("/details")
+@bulkhead_class("sync")
+async def get_vulnerability_details(
+    payload: VulnerabilityIdList,
+    projection: list[str] = Depends(vulnerability_projection),
+    db: AsyncSession = Depends(get_db),
+    token: ApiToken = Depends(require_scope("read:vulns")),
+):
+    """
+    Full records for a list of IDs in one request (requires API token with read:vulns scope).
+
+    Items come back in request order; unknown IDs are listed in `missing`.
+    """
+    result = await db.execute(
+        select(*labelled(VULNERABILITY_COLUMNS, projection)).where(Vulnerability.id.in_(payload.ids))
+    )
+    by_id = {row["id"]: dict(row) for row in result.mappings()}
+
+    return json_response(
+        vulnerability_details_adapter,
+        {
+            "items": [by_id[vuln_id] for vuln_id in dict.fromkeys(payload.ids) if vuln_id in by_id],
+            "missing": [vuln_id for vuln_id in dict.fromkeys(payload.ids) if vuln_id not in by_id],
+        },
+    )
+
+
+@router.get("/facets", response_model=VulnerabilityFacets)
+async def get_vulnerability_facets(
+    request: Request,
+    filters: list[ColumnElement[bool]] = Depends(vulnerability_filters),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_active_user),
+):
+    """Count vulnerabilities per level, type and type category for the active filters."""
+    return await cancel_on_disconnect(request, db, count_facets(db, filters))
+
+
+@router.get("/facets/cvss", response_model=dict[str, dict[str, int]])
+async def get_cvss_metric_facets(
+    request: Request,
+    filters: list[ColumnElement[bool]] = Depends(vulnerability_filters),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_active_user),
+):
+    """
+    Count vulnerabilities per CVSS metric value for the active filters.
+
+    Returns e.g. `{"AV": {"N": 120, "L": 8}, "PR": {...}, ...}`. Vulnerabilities
+    without a (parseable) vector are not counted.
+    """
+    counts = union_all(
+        *(
+            select(
+                literal(metric).label("metric"),
+                getattr(Vulnerability, column).label("value"),
+                func.count().label("count"),
+            )
+            .where(*filters)
+            .group_by(getattr(Vulnerability, column))
+            for metric, column in CVSS_METRIC_COLUMNS.items()
+        )
+    )
+    result = await cancel_on_disconnect(request, db, db.execute(counts))
+
+    facets: dict[str, dict[str, int]] = {metric: {} for metric in CVSS_METRIC_COLUMNS}
+    for metric, value, count in result:
+        if value is not None:
+            facets[metric][value] = count
+
+    return facets
+
+
+@router.get("/duplicates", response_model=DuplicatesResponse)
+async def get_duplicate_clusters(
+    threshold: float = Query(0.6, ge=0.3, le=1.0, description="Minimum estimated similarity (Jaccard over word shingles)"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of clusters returned"),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_active_user),
+):
+    """
+    Report clusters of near-duplicate vulnerabilities.
+
+    Similarity is estimated from MinHash signatures of the name, description
+    and recommendation; only entries sharing an LSH bucket are compared. The
+    index is updated incrementally from the rows changed since the last call.
+    """
+    await duplicate_index.sync(db)
+    clusters = duplicate_index.clusters(threshold)
+
+    return DuplicatesResponse(
+        threshold=threshold,
+        total=len(clusters),
+        clusters=[
+            DuplicateCluster(
+                min_similarity=cluster.min_similarity,
+                items=[DuplicateEntry(id=vuln_id, name=duplicate_index.names[vuln_id]) for vuln_id in cluster.ids],
+            )
+            for cluster in clusters[:limit]
+        ],
+    )
+
+
+def _similar_response(matches: list[SimilarMatch]) -> list[SimilarVulnerability]:
+    return [
+        SimilarVulnerability(id=match.id, name=similarity_index.names[match.id], score=match.score)
+        for match in matches
+    ]
+
+
+@router.get("/similar", response_model=list[SimilarVulnerability])
+async def find_similar_to_text(
+    text: str = Query(..., min_length=3, max_length=20000, description="Draft name and/or description"),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_active_user),
+):
+    """Vulnerabilities most similar to a free text, e.g. a finding being written."""
+    await similarity_index.sync(db)
+    terms, tf = term_vector(text)
+    return _similar_response(similarity_index.query(terms, tf, limit=limit))
+
+
+@router.get("/suggest", response_model=list[VulnerabilitySuggestion])
+async def suggest_vulnerabilities(
+    prefix: str = Query(..., min_length=1, max_length=100, description="Start of any word of the name"),
+    limit: int = Query(10, ge=1, le=25),
+    db: AsyncSession = Depends(get_db),
+    _reader: User | ApiToken = Depends(require_user_or_scope("read:vulns")),
+):
+    """
+    Typeahead on vulnerability names, most exported first.
+
+    Served from an in-memory prefix index (case- and accent-insensitive,
+    matching the start of any word); it catches up with writes at most
+    a second later. Accepts a session or an API token with read:vulns scope.
+    """
+    await suggest_index.sync(db, max_age=SUGGEST_MAX_STALENESS)
+    return [
+        VulnerabilitySuggestion(id=item.id, name=item.name, export_count=item.export_count)
+        for item in suggest_index.suggest(prefix, limit)
+    ]
+
+
+async def _stream_start(db: AsyncSession, since: int | None) -> tuple[Subscription, list[ChangeEvent], int, bool]:
+    """
+    Subscribe, then collect the events a resuming client missed.
+
+    Returns the subscription, the backlog, the sequence the client will be
+    caught up to once the backlog is sent and whether it must reload instead (gap no longer replayable).
+    Subscribing first means nothing committed meanwhile is lost; live events
+    already in the backlog are skipped by sequence.
+    """
+    subscription = change_feed.subscribe()
+    try:
+        backlog = await change_feed.replay(db, since) if since is not None else []
+        head = await current_sequence(db)
+    except Exception:
+        change_feed.unsubscribe(subscription)
+        raise
+    if backlog is None:
+        return subscription, [], head, True
+    if backlog:
+        return subscription, backlog, backlog[-1].seq, False
+    return subscription, [], head if since is None else since, False
+
 
-    return [VulnerabilityInfo.model_validate(v) for v in vulnerabilities]
+def _sse_message(event: str, data: dict[str, Any], event_id: int | None = None) -> bytes:
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event}", f"data: {json.dumps(data, separators=(',', ':'))}"]
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+@router.get("/stream")
+@bulkhead_class(None)
+async def stream_changes(
+    since: int | None = Query(None, ge=0, description="Resume after this sequence number"),
+    last_event_id: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+    _reader: User | ApiToken = Depends(require_user_or_scope("read:vulns")),
+):
+    """
+    Server-Sent Events feed of committed creates, updates and deletes.
+
+    Each change is sent as a `created`, `updated` or `deleted` event whose `id`
+    is its sequence number. The stream opens with a `ready` event carrying the
+    sequence the client is caught up to; `reset: true` there means the missed
+    changes can no longer be replayed and the client should reload. Browsers
+    resume automatically through `Last-Event-ID`; other clients pass `since`.
+    Accepts a session or an API token with read:vulns scope.
+    """
+    if since is None and last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    subscription, backlog, head, reset = await _stream_start(db, since)
+
+    async def events():
+        yield f"retry: {STREAM_RETRY_MS}\n\n".encode()
+        yield _sse_message("ready", {"seq": head, "reset": reset}, head)
+        for event in backlog:
+            yield _sse_message(event.action, event.as_dict(), event.seq)
+        async for event in subscription.listen(head, STREAM_HEARTBEAT_SECONDS):
+            if event is None:
+                yield b": keep-alive\n\n"
+            else:
+                yield _sse_message(event.action, event.as_dict(), event.seq)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _wait_disconnect(websocket: WebSocket) -> None:
+    """Consume client messages until the socket closes."""
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+@router.websocket("/stream/ws")
+@bulkhead_class(None)
+async def stream_changes_ws(
+    websocket: WebSocket,
+    since: int | None = Query(None, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    WebSocket variant of `GET /stream` for clients without EventSource.
+
+    Messages are JSON objects: `{"type": "ready", "seq", "reset"}` first, then
+    `{"type": "change", ...}` per change and `{"type": "ping"}` when idle.
+    Authenticates like the SSE route (session cookie or Bearer token); a
+    refused client is closed with code 1008.
+    """
+    check = require_user_or_scope("read:vulns")
+    try:
+        await check(websocket.headers.get("authorization"), websocket.cookies.get("session_id"), db)
+        subscription, backlog, head, reset = await _stream_start(db, since)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    # Nothing below needs the database; release its connection for the life of the socket.
+    await db.close()
+
+    await websocket.accept()
+    disconnected = asyncio.create_task(_wait_disconnect(websocket))
+    try:
+        await websocket.send_json({"type": "ready", "seq": head, "reset": reset})
+        for event in backlog:
+            await websocket.send_json({"type": "change", **event.as_dict()})
+        async for event in subscription.listen(head, STREAM_HEARTBEAT_SECONDS):
+            if disconnected.done():
+                break
+            await websocket.send_json({"type": "ping"} if event is None else {"type": "change", **event.as_dict()})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnected.cancel()
+        change_feed.unsubscribe(subscription)
 
 
 @router.get("/{vuln_id}", response_model=VulnerabilityInfo)
@@ -206,10 +693,9 @@ async def create_vulnerability(
     )
 
     db.add(vuln)
-    await db.commit()
-    await db.refresh(vuln)
+    await db.flush()
 
-    # Create history entry
+    # History entry and change log go in the same transaction as the row
     history = VulnerabilityHistory(
         vulnerability_id=vuln.id,
         snapshot=vuln_data.model_dump(mode="json"),
@@ -217,7 +703,9 @@ async def create_vulnerability(
         change_type="created",
     )
     db.add(history)
+    await record_changes(db, "created", [(vuln.id, vuln.name)])
     await db.commit()
+    await db.refresh(vuln)
 
     audit_log(
         "vuln.create",
@@ -258,10 +746,9 @@ async def update_vulnerability(
     vuln.updated_by = user.id
     vuln.updated_at = datetime.now(timezone.utc)
 
-    await db.commit()
-    await db.refresh(vuln)
+    await db.flush()
 
-    # Create history entry
+    # History entry and change log go in the same transaction as the update
     history = VulnerabilityHistory(
         vulnerability_id=vuln.id,
         snapshot=VulnerabilityInfo.model_validate(vuln).model_dump(mode="json"),
@@ -269,7 +756,9 @@ async def update_vulnerability(
         change_type="updated",
     )
     db.add(history)
+    await record_changes(db, "updated", [(vuln.id, vuln.name)])
     await db.commit()
+    await db.refresh(vuln)
 
     audit_log(
         "vuln.update",
@@ -310,6 +799,7 @@ async def delete_vulnerability(
 
     # Delete
     await db.delete(vuln)
+    await record_changes(db, "deleted", [(vuln.id, vuln.name)])
     await db.commit()
 
     audit_log(
@@ -322,17 +812,160 @@ async def delete_vulnerability(
     return None
 
 
+def _bulk_selection(ids: list[UUID] | None, filters: list[ColumnElement[bool]]) -> list[ColumnElement[bool]]:
+    """WHERE clauses of a bulk operation; refuses to target the whole library implicitly."""
+    if not ids and not filters:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Select vulnerabilities with ids or at least one filter",
+        )
+    if ids:
+        return [*filters, Vulnerability.id.in_(set(ids))]
+    return filters
+
+
+@router.patch("/bulk", response_model=VulnerabilityBulkResult)
+@bulkhead_class("import_export")
+@query_budget(statement_timeout=60.0, max_rows=BULK_CHANGE_MAX_ROWS)
+async def bulk_update_vulnerabilities(
+    payload: VulnerabilityBulkUpdate,
+    request: Request,
+    filters: list[ColumnElement[bool]] = Depends(vulnerability_filters),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(require_editor),
+):
+    """
+    Apply the same changes to many vulnerabilities (requires editor or admin role).
+
+    Rows are selected by `ids`, the query filters (same parameters as search),
+    or both combined. Runs as one transaction: a single `UPDATE ... RETURNING`,
+    one multi-row history insert and one audit event. A selection larger than
+    the route's row budget is rolled back with `413`.
+    """
+    where = _bulk_selection(payload.ids, filters)
+
+    changes = payload.changes.model_dump(exclude_unset=True)
+    if "cvss_vector" in changes:
+        changes.update(cvss_metric_values(changes["cvss_vector"]))
+    values = {getattr(Vulnerability, field): value for field, value in changes.items()}
+    values[Vulnerability.updated_by] = user.id
+    values[Vulnerability.updated_at] = datetime.now(timezone.utc)
+
+    result = await db.execute(
+        update(Vulnerability)
+        .where(*where)
+        .values(values)
+        .returning(*labelled(VULNERABILITY_COLUMNS))
+        .execution_options(synchronize_session=False)
+    )
+    rows = result.mappings().all()
+    enforce_row_budget(request, len(rows))
+
+    if rows:
+        await db.execute(
+            insert(VulnerabilityHistory),
+            [
+                {
+                    "vulnerability_id": row["id"],
+                    "snapshot": VulnerabilityInfo.model_validate(dict(row)).model_dump(mode="json"),
+                    "changed_by": user.id,
+                    "change_type": "updated",
+                }
+                for row in rows
+            ],
+        )
+        await record_changes(db, "updated", [(row["id"], row["name"]) for row in rows])
+    await db.commit()
+
+    ids = [row["id"] for row in rows]
+    audit_log(
+        "vuln.bulk_update",
+        actor_id=str(user.id),
+        request=request,
+        target={"vulnerability_ids": [str(vuln_id) for vuln_id in ids]},
+        extra={"fields": sorted(payload.changes.model_fields_set), "count": len(ids)},
+    )
+
+    return VulnerabilityBulkResult(count=len(ids), ids=ids)
+
+
+@router.post("/bulk-delete", response_model=VulnerabilityBulkResult)
+@bulkhead_class("import_export")
+@query_budget(statement_timeout=60.0, max_rows=BULK_CHANGE_MAX_ROWS)
+async def bulk_delete_vulnerabilities(
+    payload: VulnerabilityBulkDelete,
+    request: Request,
+    filters: list[ColumnElement[bool]] = Depends(vulnerability_filters),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(require_editor),
+):
+    """
+    Delete many vulnerabilities at once (requires editor or admin role).
+
+    Rows are selected like `PATCH /bulk` and removed with a single
+    `DELETE ... RETURNING`. Their history goes with them (ON DELETE CASCADE),
+    so the audit event records the deleted IDs and names. Like `PATCH /bulk`,
+    a selection larger than the row budget is rolled back with `413`.
+    """
+    where = _bulk_selection(payload.ids, filters)
+
+    result = await db.execute(
+        delete(Vulnerability)
+        .where(*where)
+        .returning(Vulnerability.id, Vulnerability.name)
+        .execution_options(synchronize_session=False)
+    )
+    rows = result.all()
+    enforce_row_budget(request, len(rows))
+    await record_changes(db, "deleted", [(row.id, row.name) for row in rows])
+    await db.commit()
+
+    ids = [row.id for row in rows]
+    audit_log(
+        "vuln.bulk_delete",
+        actor_id=str(user.id),
+        request=request,
+        target={"vulnerability_ids": [str(vuln_id) for vuln_id in ids]},
+        extra={"names": [row.name for row in rows], "count": len(ids)},
+    )
+
+    return VulnerabilityBulkResult(count=len(ids), ids=ids)
+
+
+@router.get("/{vuln_id}/similar", response_model=list[SimilarVulnerability])
+async def find_similar_vulnerabilities(
+    vuln_id: UUID,
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_active_user),
+):
+    """Vulnerabilities most similar to an existing one (itself excluded)."""
+    await similarity_index.sync(db)
+    vector = similarity_index.vector(vuln_id)
+    if vector is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Vulnerability not found",
+        )
+    return _similar_response(similarity_index.query(*vector, limit=limit, exclude=vuln_id))
+
+
 @router.get("/{vuln_id}/history", response_model=list[dict])
 async def get_vulnerability_history(
     vuln_id: UUID,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_active_user),
 ):
     """Get history of changes for a vulnerability."""
-    result = await db.execute(
-        select(VulnerabilityHistory)
-        .where(VulnerabilityHistory.vulnerability_id == vuln_id)
-        .order_by(VulnerabilityHistory.changed_at.desc())
+    result = await cancel_on_disconnect(
+        request,
+        db,
+        db.execute(
+            select(VulnerabilityHistory)
+            .where(VulnerabilityHistory.vulnerability_id == vuln_id)
+            .order_by(VulnerabilityHistory.changed_at.desc())
+        ),
     )
     history = result.scalars().all()
 
@@ -348,11 +981,56 @@ async def get_vulnerability_history(
     ]
 
 
+def _export_doc(vuln: Vulnerability) -> VulnerabilityExportDoc:
+    """Build the Word export representation of a vulnerability."""
+    return VulnerabilityExportDoc(
+        id=vuln.id,
+        name=vuln.name,
+        level=vuln.level.value,
+        scope=vuln.scope,
+        protocol_interface=vuln.protocol_interface,
+        cvss_score=vuln.cvss_score,
+        cvss_vector=vuln.cvss_vector,
+        description=vuln.description,
+        risk=vuln.risk,
+        recommendation=vuln.recommendation,
+        type=vuln.vuln_type.value,
+        tag_order=vuln.tag_order,
+    )
+
+
+EXPORT_DOC_FORMATS = ("json", "xml", "ooxml")
+
+_XML_DECLARATION = b"<?xml version='1.0' encoding='UTF-8'?>\n"
+
+
+def _render_export_doc(vuln: Vulnerability, export_format: str) -> bytes:
+    """Serialise the export card of a vulnerability (no XML declaration)."""
+    export_data = _export_doc(vuln)
+    if export_format == "json":
+        return export_data.model_dump_json().encode()
+    if export_format == "ooxml":
+        return ooxml.render_cartouche_xml(export_data.model_dump())
+    root = etree.Element("vulnerability")
+    for field, value in export_data.model_dump().items():
+        elem = etree.SubElement(root, field)
+        elem.text = "" if value is None else str(value)
+    return etree.tostring(root, pretty_print=True, encoding="UTF-8")
+
+
+def _export_doc_fragment(vuln: Vulnerability, export_format: str) -> bytes:
+    """Rendered export card for a vulnerability, cached per version and format."""
+    return export_cache.get_or_render(
+        (vuln.id, vuln.updated_at, export_format, ooxml.TEMPLATE_VERSION),
+        lambda: _render_export_doc(vuln, export_format),
+    )
+
+
 @router.get("/{vuln_id}/exportdoc", response_model=VulnerabilityExportDoc)
 async def export_vulnerability_for_doc(
     vuln_id: UUID,
     request: Request,
-    format: str = Query("json", description="Export format (json or xml)"),
+    format: str = Query("json", description="Export format (json, xml or ooxml)"),
     db: AsyncSession = Depends(get_db),
     token: ApiToken = Depends(require_scope("export:doc")),
 ):
@@ -360,6 +1038,8 @@ async def export_vulnerability_for_doc(
     Export a specific vulnerability for Word document insertion (requires API token with export:doc scope).
 
     Returns the vulnerability in a format suitable for Word macro insertion.
+    `format=ooxml` returns the rendered cartouche table as a Flat OPC package,
+    ready for `Range.InsertXML`.
     """
     result = await db.execute(select(Vulnerability).where(Vulnerability.id == vuln_id))
     vuln = result.scalar_one_or_none()
@@ -370,48 +1050,166 @@ async def export_vulnerability_for_doc(
             detail="Vulnerability not found",
         )
 
-    # Convert to export format
-    export_data = VulnerabilityExportDoc(
-        id=vuln.id,
-        name=vuln.name,
-        level=vuln.level.value,
-        scope=vuln.scope,
-        protocol_interface=vuln.protocol_interface,
-        cvss_score=vuln.cvss_score,
-        cvss_vector=vuln.cvss_vector,
-        description=vuln.description,
-        risk=vuln.risk,
-        recommendation=vuln.recommendation,
-        type=vuln.vuln_type.value,
-        tag_order=vuln.tag_order,
-    )
+    export_format = format.lower()
+    if export_format not in EXPORT_DOC_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported export format",
+        )
 
     audit_log(
         "vuln.export_doc",
         actor_id=str(token.owner_user_id),
         request=request,
         target={"vulnerability_id": str(vuln.id)},
-        extra={"format": format.lower()},
+        extra={"format": export_format},
     )
 
-    if format.lower() == "json":
-        return export_data
-    if format.lower() == "xml":
-        root = etree.Element("vulnerability")
-        for field, value in export_data.model_dump().items():
-            elem = etree.SubElement(root, field)
-            elem.text = "" if value is None else str(value)
-        xml_bytes = etree.tostring(
-            root,
-            pretty_print=True,
-            xml_declaration=True,
-            encoding="UTF-8",
+    fragment = _export_doc_fragment(vuln, export_format)
+    suggest_index.record_exports({vuln.id})
+    if export_format == "json":
+        return Response(content=fragment, media_type="application/json")
+    if export_format == "xml":
+        return Response(content=_XML_DECLARATION + fragment, media_type="application/xml")
+    return Response(content=ooxml.render_package([fragment]), media_type="application/xml")
+
+
+@router.post("/exportdoc/batch")
+@bulkhead_class("sync")
+async def export_vulnerabilities_for_doc_batch(
+    payload: VulnerabilityIdList,
+    request: Request,
+    format: str = Query("json", description="Export format (json, xml or ooxml)"),
+    db: AsyncSession = Depends(get_db),
+    token: ApiToken = Depends(require_scope("export:doc")),
+):
+    """
+    Export several vulnerabilities for Word insertion in one request (requires API token with export:doc scope).
+
+    Items follow the order of `ids` (repeats allowed). Each item reports
+    `found`; unknown IDs get `found: false` instead of failing the batch.
+    With `format=ooxml` the response is one Flat OPC package holding every
+    cartouche in order, and unknown IDs are listed in the `X-Missing-Ids` header.
+    """
+    export_format = format.lower()
+    if export_format not in EXPORT_DOC_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported export format",
         )
-        return Response(content=xml_bytes, media_type="application/xml")
 
-    raise HTTPException(
-        status_code=status.HTTP_400_BAD_REQUEST,
-        detail="Unsupported export format",
+    result = await db.execute(select(Vulnerability).where(Vulnerability.id.in_(set(payload.ids))))
+    vulns = {vuln.id: vuln for vuln in result.scalars()}
+    missing = [str(vuln_id) for vuln_id in dict.fromkeys(payload.ids) if vuln_id not in vulns]
+
+    audit_log(
+        "vuln.export_doc_batch",
+        actor_id=str(token.owner_user_id),
+        request=request,
+        target={"vulnerability_ids": [str(vuln_id) for vuln_id in vulns]},
+        extra={"format": export_format, "requested": len(payload.ids), "missing": missing},
+    )
+
+    suggest_index.record_exports(vulns)
+
+    # Responses are stitched together from cached per-card fragments.
+    if export_format == "json":
+        items = []
+        for vuln_id in payload.ids:
+            if vuln_id in vulns:
+                card = _export_doc_fragment(vulns[vuln_id], "json")
+                items.append(b'{"id":"%s","found":true,"card":%s}' % (str(vuln_id).encode(), card))
+            else:
+                items.append(b'{"id":"%s","found":false,"card":null}' % str(vuln_id).encode())
+        body = b'{"items":[%s],"missing":%s}' % (b",".join(items), json.dumps(missing).encode())
+        return Response(content=body, media_type="application/json")
+
+    if export_format == "ooxml":
+        package = ooxml.render_package(
+            _export_doc_fragment(vulns[vuln_id], "ooxml") for vuln_id in payload.ids if vuln_id in vulns
+        )
+        return Response(
+            content=package,
+            media_type="application/xml",
+            headers={"X-Missing-Ids": ",".join(missing)},
+        )
+
+    parts = [_XML_DECLARATION, b"<vulnerabilities>\n"]
+    for vuln_id in payload.ids:
+        if vuln_id in vulns:
+            parts.append(_export_doc_fragment(vulns[vuln_id], "xml"))
+        else:
+            parts.append(b'<missing id="%s"/>\n' % str(vuln_id).encode())
+    parts.append(b"</vulnerabilities>\n")
+    return Response(content=b"".join(parts), media_type="application/xml")
+
+
+@router.post("/report/docx")
+@bulkhead_class("import_export")
+async def generate_docx_report(
+    payload: DocxReportRequest,
+    request: Request,
+    filters: list[ColumnElement[bool]] = Depends(vulnerability_filters),
+    template: str = Query("default", description=f"Report template ({', '.join(docx_report.TEMPLATES)})"),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_active_user),
+):
+    """
+    Generate a .docx findings annex, streamed as it is built.
+
+    The selection is `ids` from the body, in that order, or, when `ids` is
+    omitted, every vulnerability matching the query filters (same parameters
+    as search), ordered by severity then name. Each finding is rendered as the
+    same cartouche table as `exportdoc?format=ooxml`.
+    """
+    if template not in docx_report.TEMPLATES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown template '{template}'",
+        )
+
+    # Load everything before streaming: the session is released once the
+    # response starts.
+    if payload.ids:
+        result = await db.execute(select(Vulnerability).where(Vulnerability.id.in_(set(payload.ids))))
+        by_id = {vuln.id: vuln for vuln in result.scalars()}
+        vulns = [by_id[vuln_id] for vuln_id in payload.ids if vuln_id in by_id]
+    else:
+        result = await db.execute(
+            select(Vulnerability).where(*filters).limit(DOCX_REPORT_MAX_FINDINGS + 1)
+        )
+        vulns = list(result.scalars())
+        if len(vulns) > DOCX_REPORT_MAX_FINDINGS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Selection exceeds {DOCX_REPORT_MAX_FINDINGS} findings; narrow the filters",
+            )
+        vulns.sort(key=lambda vuln: (LEVEL_RANK[vuln.level], vuln.name.lower()))
+
+    if not vulns:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No vulnerabilities found",
+        )
+
+    renderers = [partial(_export_doc_fragment, vuln, "ooxml") for vuln in vulns]
+    suggest_index.record_exports(vuln.id for vuln in vulns)
+
+    audit_log(
+        "vuln.export_docx",
+        actor_id=str(user.id),
+        request=request,
+        extra={"count": len(vulns), "template": template},
+    )
+
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    return StreamingResponse(
+        docx_report.stream_docx(template, payload.title, renderers),
+        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        headers={
+            "Content-Disposition": f"attachment; filename=findings_{timestamp}.docx",
+            "X-Items-Exported": str(len(vulns)),
+        },
     )
 
 
@@ -421,6 +1219,7 @@ async def export_vulnerability_for_doc(
 
 
 @router.post("/import/xml", status_code=status.HTTP_200_OK)
+@bulkhead_class("import_export")
 async def import_vulnerabilities_xml(
     request: Request,
     file: UploadFile = File(..., description="XML file containing vulnerabilities"),
@@ -451,6 +1250,7 @@ async def import_vulnerabilities_xml(
         )
 
     stats = {"created": 0, "updated": 0, "skipped": 0}
+    touched: dict[str, list[Vulnerability]] = {"created": [], "updated": []}
     seen_ids: set[UUID] = set()
     seen_names: set[str] = set()
 
@@ -503,6 +1303,7 @@ async def import_vulnerabilities_xml(
 
                     existing.updated_by = user.id
                     existing.updated_at = datetime.now(timezone.utc)
+                    touched["updated"].append(existing)
                     stats["updated"] += 1
                 else:
                     create_kwargs = {
@@ -526,8 +1327,13 @@ async def import_vulnerabilities_xml(
                         updated_by=user.id,
                     )
                     db.add(vuln)
+                    touched["created"].append(vuln)
                     stats["created"] += 1
 
+            await db.flush()
+            for action, vulns in touched.items():
+                await record_changes(db, action, [(vuln.id, vuln.name) for vuln in vulns])
+
     except HTTPException:
         raise
     except Exception as exc:
@@ -558,6 +1364,8 @@ async def import_vulnerabilities_xml(
 
 
 @router.post("/export/xml")
+@bulkhead_class("import_export")
+@query_budget(statement_timeout=120.0, max_rows=LIBRARY_MAX_ROWS)
 async def export_vulnerabilities_to_xml(
     request: Request,
     ids: list[UUID] | None = None,
@@ -568,7 +1376,9 @@ async def export_vulnerabilities_to_xml(
     Export vulnerabilities to XML format.
 
     If ids are provided, only export those vulnerabilities.
-    Otherwise, export all vulnerabilities.
+    Otherwise, export all vulnerabilities, from the pre-rendered snapshot
+    when it is current. Identical concurrent exports of the same library
+    version share one query and rendering.
     """
     query = select(Vulnerability)
 
@@ -577,29 +1387,40 @@ async def export_vulnerabilities_to_xml(
 
     query = query.order_by(Vulnerability.name.asc())
 
-    result = await db.execute(query)
-    vulnerabilities = result.scalars().all()
+    async def render() -> tuple[bytes, int]:
+        result = await db.execute(limit_rows(request, query))
+        vulnerabilities = result.scalars().all()
+        enforce_row_budget(request, len(vulnerabilities))
+        return export_vulnerabilities_xml(vulnerabilities) if vulnerabilities else b"", len(vulnerabilities)
 
-    if not vulnerabilities:
+    state = await library_state(db)
+    snapshot = None if ids else library_snapshots.lookup("export", state.version)
+    if snapshot is not None:
+        count = snapshot.count
+    else:
+        key = ("export_xml", "user", state.version, tuple(sorted(set(ids))) if ids else None)
+        xml_content, count = await cancel_on_disconnect(request, db, library_reads.do(key, render))
+
+    if not count:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No vulnerabilities found",
         )
 
-    # Convert to XML
-    xml_content = export_vulnerabilities_xml(vulnerabilities)
-
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     headers = {
         "Content-Disposition": f"attachment; filename=vulnerabilities_{timestamp}.xml",
-        "X-Items-Exported": str(len(vulnerabilities)),
+        "X-Items-Exported": str(count),
     }
 
     audit_log(
         "vuln.export_xml",
         actor_id=str(user.id),
         request=request,
-        extra={"count": len(vulnerabilities)},
+        extra={"count": count},
     )
 
+    if snapshot is not None:
+        return library_snapshots.response(request, snapshot, headers)
+
     return Response(content=xml_content, media_type="application/xml", headers=headers)
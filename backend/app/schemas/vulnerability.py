@@ -1,9 +1,10 @@
 """Vulnerability schemas."""
 
 from datetime import datetime
+from typing import ClassVar
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 from app.models.vulnerability import VulnerabilityLevel, VulnerabilityType
 
@@ -77,6 +78,77 @@ class VulnerabilityExportDoc(BaseModel):
     tag_order: list[str] | None
 
 
+class VulnerabilityIdList(BaseModel):
+    """Ordered list of vulnerability IDs for batched fetches."""
+
+    ids: list[UUID] = Field(..., min_length=1, max_length=500)
+
+
+class VulnerabilityBulkChanges(BaseModel):
+    """Fields a bulk update may set on every selected vulnerability."""
+
+    level: VulnerabilityLevel | None = None
+    scope: str | None = Field(None, min_length=1)
+    protocol_interface: str | None = Field(None, min_length=1, max_length=255)
+    cvss_score: float | None = Field(None, ge=0.0, le=10.0)
+    cvss_vector: str | None = Field(None, max_length=255)
+    risk: str | None = Field(None, min_length=1)
+    recommendation: str | None = Field(None, min_length=1)
+    vuln_type: VulnerabilityType | None = Field(None, alias="type")
+
+    # Only these may be cleared; the other columns are NOT NULL
+    NULLABLE_FIELDS: ClassVar[frozenset[str]] = frozenset({"cvss_score", "cvss_vector"})
+
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "VulnerabilityBulkChanges":
+        if not self.model_fields_set:
+            raise ValueError("At least one field must be changed")
+        cleared = sorted(
+            (self.model_fields[field].alias or field)
+            for field in self.model_fields_set - self.NULLABLE_FIELDS
+            if getattr(self, field) is None
+        )
+        if cleared:
+            raise ValueError(f"These fields cannot be null: {', '.join(cleared)}")
+        return self
+
+
+class VulnerabilityBulkUpdate(BaseModel):
+    """Bulk update: `ids` and/or the query filters select the rows, `changes` are applied to all."""
+
+    ids: list[UUID] | None = Field(None, min_length=1, max_length=5000)
+    changes: VulnerabilityBulkChanges
+
+
+class VulnerabilityBulkDelete(BaseModel):
+    """Bulk delete: `ids` and/or the query filters select the rows."""
+
+    ids: list[UUID] | None = Field(None, min_length=1, max_length=5000)
+
+
+class VulnerabilityBulkResult(BaseModel):
+    """Outcome of a bulk update or delete."""
+
+    count: int
+    ids: list[UUID]
+
+
+class DocxReportRequest(BaseModel):
+    """Selection for a generated .docx annex: explicit IDs, or the query filters when omitted."""
+
+    ids: list[UUID] | None = Field(None, min_length=1, max_length=1000)
+    title: str = Field("Annexe - Vulnérabilités", min_length=1, max_length=255)
+
+
+class VulnerabilityFacets(BaseModel):
+    """Result counts per level, type and type category for a set of filters."""
+
+    total: int
+    level: dict[str, int]
+    type: dict[str, int]
+    category: dict[str, int]
+
+
 class VulnerabilitySearchResponse(BaseModel):
     """Paginated vulnerability search results."""
 
@@ -84,3 +156,42 @@ class VulnerabilitySearchResponse(BaseModel):
     total: int
     page: int
     per_page: int
+    facets: VulnerabilityFacets | None = None
+
+
+class DuplicateEntry(BaseModel):
+    """Member of a near-duplicate cluster."""
+
+    id: UUID
+    name: str
+
+
+class DuplicateCluster(BaseModel):
+    """Vulnerabilities linked by estimated similarity above the threshold."""
+
+    min_similarity: float
+    items: list[DuplicateEntry]
+
+
+class DuplicatesResponse(BaseModel):
+    """Near-duplicate clusters across the library, largest first."""
+
+    threshold: float
+    total: int
+    clusters: list[DuplicateCluster]
+
+
+class SimilarVulnerability(BaseModel):
+    """Vulnerability ranked by textual similarity (cosine of TF-IDF vectors)."""
+
+    id: UUID
+    name: str
+    score: float
+
+
+class VulnerabilitySuggestion(BaseModel):
+    """Typeahead entry, ranked by number of exports."""
+
+    id: UUID
+    name: str
+    export_count: int
@@ -1,16 +1,199 @@
-"""Structured audit logging helpers."""
+"""Structured audit logging helpers.
+
+``audit_log`` is called on the request path (including the per-card
+``vuln.export_doc`` route), so it only builds a dict and enqueues it. A
+background writer drains the queue in batches, emits the JSON log lines and
+bulk-inserts the events into ``audit_events``. When the queue is full new
+events are dropped and counted rather than blocking the request.
+
+Outside the application lifespan (scripts, tests) the pipeline is not running
+and events are logged synchronously as before.
+"""
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from typing import Any
 
 from fastapi import Request
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.models.audit_event import AuditEvent
+from app.utils.metrics import metrics
 
 logger = logging.getLogger("vulnmanager.audit")
 
+_EVENT_COLUMNS = ("ts", "action", "status", "actor_id", "target", "ip", "user_agent")
+
+
+def _log_line(event: dict[str, Any]) -> str:
+    payload: dict[str, Any] = {
+        "ts": event["ts"].isoformat(),
+        "action": event["action"],
+        "status": event["status"],
+        "actor_id": event["actor_id"],
+    }
+    if event["target"]:
+        payload["target"] = event["target"]
+    if event["ip"] is not None:
+        payload["ip"] = event["ip"]
+        payload["user_agent"] = event["user_agent"]
+    if event["extra"]:
+        payload.update(event["extra"])
+    return json.dumps(payload, sort_keys=True)
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+class AuditPipeline:
+    """Bounded queue plus a background batch writer."""
+
+    def __init__(self) -> None:
+        self._queue: asyncio.Queue[dict[str, Any]] | None = None
+        self._task: asyncio.Task | None = None
+        self._session_factory: async_sessionmaker[AsyncSession] | None = None
+        self._partitions: set[date] = set()
+        self.batch_size = settings.audit_batch_size
+        self.flush_interval = settings.audit_flush_interval_seconds
+        metrics.register_gauge("audit.queue_depth", self.depth)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def start(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] | None,
+        *,
+        queue_size: int | None = None,
+    ) -> None:
+        """Start the writer; with no session factory events are only logged."""
+        if self._task is not None:
+            return
+        self._session_factory = session_factory
+        self._queue = asyncio.Queue(maxsize=queue_size or settings.audit_queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Write out everything queued, then stop the writer."""
+        if self._task is None:
+            return
+        await self.flush()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._queue = None
+
+    async def flush(self) -> None:
+        """Wait until every event enqueued so far has been written."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    def submit(self, event: dict[str, Any]) -> None:
+        """Enqueue an event without blocking; log it directly if not running."""
+        if self._queue is None:
+            logger.info(_log_line(event))
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            metrics.inc("audit.dropped")
+        else:
+            metrics.inc("audit.enqueued")
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _write(self, batch: list[dict[str, Any]]) -> None:
+        for event in batch:
+            logger.info(_log_line(event))
+        metrics.inc("audit.batches")
+
+        if self._session_factory is None:
+            return
+        try:
+            async with self._session_factory() as session:
+                if session.bind.dialect.name == "postgresql":
+                    await self._ensure_partitions(session, batch)
+                rows = [
+                    {**{key: event[key] for key in _EVENT_COLUMNS}, "extra": event["extra"] or None}
+                    for event in batch
+                ]
+                await session.execute(insert(AuditEvent), rows)
+                await session.commit()
+        except Exception:
+            metrics.inc("audit.write_failures")
+            metrics.inc("audit.dropped", len(batch))
+            logger.exception("Failed to persist %d audit events", len(batch))
+        else:
+            metrics.inc("audit.written", len(batch))
+
+    async def _ensure_partitions(self, session: AsyncSession, batch: list[dict[str, Any]]) -> None:
+        """
+        Create the monthly partitions the batch needs (PostgreSQL only).
+
+        Each partition is created in its own transaction. If that fails (for
+        instance because the default partition already holds rows for the
+        month), the events simply land in the default partition.
+        """
+        for month in {_month_start(event["ts"].date()) for event in batch} - self._partitions:
+            end = _next_month(month)
+            try:
+                await session.execute(
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS audit_events_{month:%Y_%m} PARTITION OF audit_events "
+                        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+                    )
+                )
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                logger.warning("Could not create audit partition for %s; using default partition", month)
+            self._partitions.add(month)
+
+
+audit_pipeline = AuditPipeline()
+
 
 def audit_log(
     action: str,
@@ -23,21 +206,14 @@ def audit_log(
 ) -> None:
     """Emit a structured audit entry."""
 
-    payload: dict[str, Any] = {
-        "ts": datetime.now(timezone.utc).isoformat(),
+    client = request.client if request else None
+    audit_pipeline.submit({
+        "ts": datetime.now(timezone.utc),
         "action": action,
         "status": status,
         "actor_id": actor_id,
-    }
-
-    if target:
-        payload["target"] = target
-
-    if request and request.client:
-        payload["ip"] = request.client.host
-        payload["user_agent"] = request.headers.get("user-agent")
-
-    if extra:
-        payload.update(extra)
-
-    logger.info(json.dumps(payload, sort_keys=True))
+        "target": target,
+        "ip": client.host if client else None,
+        "user_agent": request.headers.get("user-agent") if client else None,
+        "extra": extra,
+    })
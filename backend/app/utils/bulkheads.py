@@ -0,0 +1,148 @@
+"""Admission control: per-class concurrency limits in front of the database pool.
+
+Routes are grouped into classes (interactive, sync, import/export, admin).
+Each class may only run a fixed number of requests at once, sized so that
+together they never need more connections than the pool has: batch classes
+cannot starve logins and searches, which keep their own reserved share.
+Requests beyond a class's limit wait in its queue for a short, class-specific
+time and are then refused with ``503`` and ``Retry-After``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Work that checks out a pool connection outside any request, at most one each at a time.
+# Keep in sync when adding a background task that uses the shared session factory.
+BACKGROUND_USERS = (
+    "audit_writer",  # app.utils.audit
+    "change_feed",  # app.utils.change_feed
+    "snapshots",  # app.utils.snapshots
+    "session_sweeper",  # app.utils.session_sweeper
+    "suggest_popularity",  # app.utils.suggest
+    "cvss_consistency",  # app.utils.cvss_consistency (one job at a time)
+    "notifier_poll",  # app.utils.notifier, when polling instead of LISTEN
+)
+BACKGROUND_CONNECTIONS = len(BACKGROUND_USERS)
+
+
+@dataclass(frozen=True)
+class BulkheadConfig:
+    limit: int | None  # None: whatever the pool has left after the other classes
+    queue_timeout: float
+    max_queue: int
+    retry_after: int
+
+
+BULKHEAD_CONFIGS = {
+    "interactive": BulkheadConfig(limit=None, queue_timeout=5.0, max_queue=200, retry_after=1),
+    "sync": BulkheadConfig(limit=3, queue_timeout=10.0, max_queue=100, retry_after=5),
+    "import_export": BulkheadConfig(limit=2, queue_timeout=30.0, max_queue=10, retry_after=15),
+    "admin": BulkheadConfig(limit=2, queue_timeout=10.0, max_queue=10, retry_after=5),
+}
+
+
+class Bulkhead:
+    """Concurrency limit with a bounded, time-limited queue."""
+
+    def __init__(self, name: str, limit: int, queue_timeout: float, max_queue: int, retry_after: int) -> None:
+        self.name = name
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._semaphore = asyncio.Semaphore(limit)
+        self.active = 0
+        self.queued = 0
+        metrics.register_gauge(f"bulkhead.{name}.active", lambda: self.active)
+        metrics.register_gauge(f"bulkhead.{name}.queued", lambda: self.queued)
+
+    def _reject(self) -> HTTPException:
+        metrics.inc(f"bulkhead.{self.name}.rejected")
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry shortly",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the class's slots; raises a ``503`` HTTPException if none frees up in time."""
+        if self._semaphore.locked() and self.queued >= self.max_queue:
+            raise self._reject()
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._reject() from None
+        finally:
+            self.queued -= 1
+
+        self.active += 1
+        metrics.inc(f"bulkhead.{self.name}.admitted")
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+
+def _build_bulkheads() -> dict[str, Bulkhead]:
+    capacity = settings.db_pool_size + settings.db_max_overflow - BACKGROUND_CONNECTIONS
+    reserved = sum(config.limit or 0 for config in BULKHEAD_CONFIGS.values())
+    if capacity - reserved < 1:
+        logger.warning(
+            "Database pool (%d connections) is too small for the bulkhead limits and %d background users",
+            settings.db_pool_size + settings.db_max_overflow, BACKGROUND_CONNECTIONS,
+        )
+    return {
+        name: Bulkhead(
+            name,
+            limit=config.limit if config.limit is not None else max(1, capacity - reserved),
+            queue_timeout=config.queue_timeout,
+            max_queue=config.max_queue,
+            retry_after=config.retry_after,
+        )
+        for name, config in BULKHEAD_CONFIGS.items()
+    }
+
+
+bulkheads = _build_bulkheads()
+
+# Endpoint function -> class, for routes outside their router's default class
+_endpoint_classes: dict[Callable[..., Any], str | None] = {}
+
+
+def bulkhead_class(name: str | None) -> Callable[[F], F]:
+    """
+    Put a route in another admission class than its router's default.
+
+    ``None`` exempts it, e.g. long-lived streams that hold no connection.
+    Apply below the route decorator.
+    """
+    if name is not None and name not in bulkheads:
+        raise ValueError(f"Unknown bulkhead class: {name}")
+
+    def decorator(endpoint: F) -> F:
+        _endpoint_classes[endpoint] = name
+        return endpoint
+
+    return decorator
+
+
+def endpoint_class(endpoint: Callable[..., Any] | None, default: str) -> str | None:
+    return _endpoint_classes.get(endpoint, default) if endpoint is not None else default
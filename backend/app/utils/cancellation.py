@@ -0,0 +1,57 @@
+"""Stop database work for clients that have gone away.
+
+A search abandoned after a filter change, or a Word sync the client gave up
+on, would otherwise run to completion and have its result discarded. Long
+queries are awaited through ``cancel_on_disconnect``, which checks the
+connection while they run and cancels them once the client has left.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable
+from typing import TypeVar
+
+from fastapi import HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.metrics import metrics
+
+T = TypeVar("T")
+
+# How often a running query checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = 0.1
+
+# Non-standard "client closed request"; never reaches the client
+CLIENT_CLOSED_REQUEST = 499
+
+
+async def cancel_on_disconnect(request: Request, db: AsyncSession, work: Awaitable[T]) -> T:
+    """
+    Await ``work`` (typically a query on ``db``), abandoning it if the client disconnects.
+
+    Queries that finish within ``DISCONNECT_POLL_SECONDS`` cost no extra
+    round trip. On disconnect the task is cancelled, which makes asyncpg send
+    a cancel request for the running statement, and the session's connection
+    is invalidated rather than returned to the pool mid-statement; the
+    request then ends with ``499``.
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                break
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+    task.cancel()
+    await asyncio.wait({task})
+    if not task.cancelled():
+        task.exception()  # finished or failed meanwhile; the result is not wanted
+    await db.invalidate()
+    metrics.inc("requests.cancelled_on_disconnect")
+    raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
@@ -0,0 +1,298 @@
+"""Live feed of committed vulnerability changes.
+
+Writers call ``record_changes`` inside their transaction: it allocates
+sequence numbers, appends to the ``vulnerability_changes`` log and publishes
+on the ``vulnerability_changes`` channel. Each worker's ``ChangeFeed`` is
+woken by the shared ``ChangeNotifier`` (one LISTEN connection per worker, or
+polling of the sequence elsewhere), reads the new log entries once and fans
+them out to its in-memory subscribers, so a connected client costs a queue
+rather than a query.
+
+Clients resume after a reconnect by passing the last ``seq`` they saw; recent
+events are replayed from memory, older ones from the log. When the gap can
+no longer be filled (log pruned, too far behind) the client is told to reload.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.cache_version import CacheVersion
+from app.models.vulnerability_change import VulnerabilityChange
+from app.utils.metrics import metrics
+from app.utils.notifier import ChangeNotifier, publish
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "vulnerability_changes"
+SEQUENCE_NAME = "vulnerability_changes"
+
+# Events kept in memory for cheap resumes
+BUFFER_SIZE = 1000
+
+# Undelivered events per subscriber before it is dropped (it resumes from the log)
+QUEUE_SIZE = 1000
+
+# A client further behind than this reloads instead of replaying
+RESUME_LIMIT = 5000
+
+# Log entries older than this are pruned
+RETENTION = timedelta(days=7)
+PRUNE_INTERVAL_SECONDS = 3600.0
+
+FETCH_BATCH = 500
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    seq: int
+    action: str
+    id: UUID
+    name: str
+    ts: datetime
+
+    @classmethod
+    def from_row(cls, row: VulnerabilityChange) -> ChangeEvent:
+        return cls(seq=row.seq, action=row.action, id=row.vulnerability_id, name=row.name, ts=row.ts)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "action": self.action,
+            "id": str(self.id),
+            "name": self.name,
+            "ts": self.ts.isoformat(),
+        }
+
+
+async def current_sequence(db: AsyncSession) -> int:
+    """Last allocated sequence number (0 if nothing was ever recorded)."""
+    result = await db.execute(select(CacheVersion.version).where(CacheVersion.name == SEQUENCE_NAME))
+    return result.scalar_one_or_none() or 0
+
+
+async def record_changes(db: AsyncSession, action: str, changes: Iterable[tuple[UUID, str]]) -> None:
+    """
+    Log ``action`` for each ``(vulnerability id, name)`` in the current transaction.
+
+    The sequence row upsert locks the counter until commit, which serialises
+    writers so that sequence order is commit order; call this as late as
+    possible in the transaction. Log entries and notification take effect on
+    commit.
+    """
+    changes = list(changes)
+    if not changes:
+        return
+    # One statement whether or not the counter row exists yet: concurrent first writers
+    # cannot both insert it.
+    dialect_insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    result = await db.execute(
+        dialect_insert(CacheVersion)
+        .values(name=SEQUENCE_NAME, version=len(changes))
+        .on_conflict_do_update(
+            index_elements=[CacheVersion.name], set_={"version": CacheVersion.version + len(changes)}
+        )
+        .returning(CacheVersion.version)
+    )
+    last = result.scalar_one()
+
+    first = last - len(changes) + 1
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        insert(VulnerabilityChange),
+        [
+            {"seq": first + offset, "ts": now, "action": action, "vulnerability_id": vuln_id, "name": name}
+            for offset, (vuln_id, name) in enumerate(changes)
+        ],
+    )
+    await publish(db, CHANNEL, str(last))
+
+
+class Subscription:
+    """One client's queue of live events."""
+
+    def __init__(self, feed: ChangeFeed) -> None:
+        self._feed = feed
+        self._queue: asyncio.Queue[ChangeEvent | None] = asyncio.Queue(QUEUE_SIZE)
+        self.closed = False
+
+    def _put(self, event: ChangeEvent) -> None:
+        if self.closed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too slow to keep up: end the stream; the client resumes from the log.
+            metrics.inc("change_feed.dropped_subscribers")
+            self.close()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    async def listen(self, after: int, heartbeat: float) -> AsyncIterator[ChangeEvent | None]:
+        """
+        Yield events with ``seq > after``, or ``None`` after ``heartbeat`` idle seconds.
+
+        Ends when the subscription is closed (feed shutdown, slow consumer).
+        """
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(self._queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event is None:
+                    return
+                if event.seq > after:
+                    after = event.seq
+                    yield event
+        finally:
+            self._feed.unsubscribe(self)
+
+
+class ChangeFeed:
+    """Per-worker fan-out of the change log to live subscribers."""
+
+    def __init__(self) -> None:
+        self._events: deque[ChangeEvent] = deque(maxlen=BUFFER_SIZE)
+        self._subscribers: set[Subscription] = set()
+        self._session_factory: async_sessionmaker[AsyncSession] | None = None
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._pruned_at: float | None = None
+        self.last_seq: int | None = None
+        metrics.register_gauge("change_feed.subscribers", lambda: len(self._subscribers))
+
+    def reset(self) -> None:
+        """Forget buffered events (used when switching databases, e.g. in tests)."""
+        self._events.clear()
+        self.last_seq = None
+        self._pruned_at = None
+
+    def watch(self, notifier: ChangeNotifier, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        """Read new log entries whenever ``notifier`` reports a change."""
+        self._session_factory = session_factory
+        notifier.subscribe(CHANNEL, self.notify, poll=current_sequence)
+
+    def notify(self, _payload: str | None = None) -> None:
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._task is None and self._session_factory is not None:
+            self._wakeup.set()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        for subscription in list(self._subscribers):
+            subscription.close()
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            try:
+                async with self._session_factory() as db:
+                    await self.catch_up(db)
+                    await self._prune(db)
+            except Exception:  # pragma: no cover - depends on database failures
+                logger.exception("Change feed update failed")
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    async def catch_up(self, db: AsyncSession) -> int:
+        """Read log entries after ``last_seq`` and deliver them; returns how many."""
+        if self.last_seq is None:
+            self.last_seq = await current_sequence(db)
+            return 0
+        delivered = 0
+        while True:
+            result = await db.execute(
+                select(VulnerabilityChange)
+                .where(VulnerabilityChange.seq > self.last_seq)
+                .order_by(VulnerabilityChange.seq)
+                .limit(FETCH_BATCH)
+            )
+            events = [ChangeEvent.from_row(row) for row in result.scalars()]
+            for event in events:
+                self._events.append(event)
+                for subscription in list(self._subscribers):
+                    subscription._put(event)
+            if events:
+                self.last_seq = events[-1].seq
+                delivered += len(events)
+            if len(events) < FETCH_BATCH:
+                break
+        if delivered:
+            metrics.inc("change_feed.events", delivered)
+        return delivered
+
+    async def _prune(self, db: AsyncSession) -> None:
+        now = time.monotonic()
+        if self._pruned_at is not None and now - self._pruned_at < PRUNE_INTERVAL_SECONDS:
+            return
+        self._pruned_at = now
+        await db.execute(
+            delete(VulnerabilityChange).where(VulnerabilityChange.ts < datetime.now(timezone.utc) - RETENTION)
+        )
+        await db.commit()
+
+    async def replay(self, db: AsyncSession, since: int) -> list[ChangeEvent] | None:
+        """
+        Events after ``since``, or ``None`` if they can no longer all be replayed.
+
+        Served from memory when the buffer reaches back far enough, otherwise
+        from the log.
+        """
+        if self._events and self._events[0].seq <= since + 1 and since <= self._events[-1].seq:
+            return [event for event in self._events if event.seq > since]
+
+        head = await current_sequence(db)
+        if since > head:
+            return None  # sequence from another database, or the log was reset
+        if since == head:
+            return []
+        result = await db.execute(
+            select(VulnerabilityChange)
+            .where(VulnerabilityChange.seq > since)
+            .order_by(VulnerabilityChange.seq)
+            .limit(RESUME_LIMIT + 1)
+        )
+        events = [ChangeEvent.from_row(row) for row in result.scalars()]
+        if not events or events[0].seq != since + 1 or len(events) > RESUME_LIMIT:
+            return None
+        return events
+
+
+change_feed = ChangeFeed()
@@ -0,0 +1,370 @@
+"""CVSS 4.0 Calculator utility (macrovector lookup)."""
+
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+
+VERSION_PREFIX = "CVSS:4.0/"
+
+# Metric definitions grouped as in the specification. The first value of every
+# non-base metric is "X" (Not Defined).
+METRIC_GROUPS = {
+    "base": ["AV", "AC", "AT", "PR", "UI", "VC", "VI", "VA", "SC", "SI", "SA"],
+    "threat": ["E"],
+    "environmental": [
+        "CR", "IR", "AR",
+        "MAV", "MAC", "MAT", "MPR", "MUI", "MVC", "MVI", "MVA", "MSC", "MSI", "MSA",
+    ],
+    "supplemental": ["S", "AU", "R", "V", "RE", "U"],
+}
+
+METRICS = {
+    "AV": {"name": "Attack Vector", "values": {"N": "Network", "A": "Adjacent", "L": "Local", "P": "Physical"}},
+    "AC": {"name": "Attack Complexity", "values": {"L": "Low", "H": "High"}},
+    "AT": {"name": "Attack Requirements", "values": {"N": "None", "P": "Present"}},
+    "PR": {"name": "Privileges Required", "values": {"N": "None", "L": "Low", "H": "High"}},
+    "UI": {"name": "User Interaction", "values": {"N": "None", "P": "Passive", "A": "Active"}},
+    "VC": {"name": "Vulnerable System Confidentiality", "values": {"H": "High", "L": "Low", "N": "None"}},
+    "VI": {"name": "Vulnerable System Integrity", "values": {"H": "High", "L": "Low", "N": "None"}},
+    "VA": {"name": "Vulnerable System Availability", "values": {"H": "High", "L": "Low", "N": "None"}},
+    "SC": {"name": "Subsequent System Confidentiality", "values": {"H": "High", "L": "Low", "N": "None"}},
+    "SI": {"name": "Subsequent System Integrity", "values": {"H": "High", "L": "Low", "N": "None"}},
+    "SA": {"name": "Subsequent System Availability", "values": {"H": "High", "L": "Low", "N": "None"}},
+    "E": {"name": "Exploit Maturity", "values": {"X": "Not Defined", "A": "Attacked", "P": "POC", "U": "Unreported"}},
+    "CR": {"name": "Confidentiality Requirement", "values": {"X": "Not Defined", "H": "High", "M": "Medium", "L": "Low"}},
+    "IR": {"name": "Integrity Requirement", "values": {"X": "Not Defined", "H": "High", "M": "Medium", "L": "Low"}},
+    "AR": {"name": "Availability Requirement", "values": {"X": "Not Defined", "H": "High", "M": "Medium", "L": "Low"}},
+    "MAV": {"name": "Modified Attack Vector", "values": {"X": "Not Defined", "N": "Network", "A": "Adjacent", "L": "Local", "P": "Physical"}},
+    "MAC": {"name": "Modified Attack Complexity", "values": {"X": "Not Defined", "L": "Low", "H": "High"}},
+    "MAT": {"name": "Modified Attack Requirements", "values": {"X": "Not Defined", "N": "None", "P": "Present"}},
+    "MPR": {"name": "Modified Privileges Required", "values": {"X": "Not Defined", "N": "None", "L": "Low", "H": "High"}},
+    "MUI": {"name": "Modified User Interaction", "values": {"X": "Not Defined", "N": "None", "P": "Passive", "A": "Active"}},
+    "MVC": {"name": "Modified Vulnerable System Confidentiality", "values": {"X": "Not Defined", "H": "High", "L": "Low", "N": "None"}},
+    "MVI": {"name": "Modified Vulnerable System Integrity", "values": {"X": "Not Defined", "H": "High", "L": "Low", "N": "None"}},
+    "MVA": {"name": "Modified Vulnerable System Availability", "values": {"X": "Not Defined", "H": "High", "L": "Low", "N": "None"}},
+    "MSC": {"name": "Modified Subsequent System Confidentiality", "values": {"X": "Not Defined", "H": "High", "L": "Low", "N": "Negligible"}},
+    "MSI": {"name": "Modified Subsequent System Integrity", "values": {"X": "Not Defined", "S": "Safety", "H": "High", "L": "Low", "N": "Negligible"}},
+    "MSA": {"name": "Modified Subsequent System Availability", "values": {"X": "Not Defined", "S": "Safety", "H": "High", "L": "Low", "N": "Negligible"}},
+    "S": {"name": "Safety", "values": {"X": "Not Defined", "N": "Negligible", "P": "Present"}},
+    "AU": {"name": "Automatable", "values": {"X": "Not Defined", "N": "No", "Y": "Yes"}},
+    "R": {"name": "Recovery", "values": {"X": "Not Defined", "A": "Automatic", "U": "User", "I": "Irrecoverable"}},
+    "V": {"name": "Value Density", "values": {"X": "Not Defined", "D": "Diffuse", "C": "Concentrated"}},
+    "RE": {"name": "Vulnerability Response Effort", "values": {"X": "Not Defined", "L": "Low", "M": "Moderate", "H": "High"}},
+    "U": {"name": "Provider Urgency", "values": {"X": "Not Defined", "Clear": "Clear", "Green": "Green", "Amber": "Amber", "Red": "Red"}},
+}
+
+METRIC_ORDER = [metric for group in METRIC_GROUPS.values() for metric in group]
+
+# Score of every macrovector (EQ1..EQ6), as published by FIRST with the 4.0 specification.
+MACROVECTOR_SCORES = {
+    "000000": 10, "000001": 9.9, "000010": 9.8, "000011": 9.5, "000020": 9.5, "000021": 9.2,
+    "000100": 10, "000101": 9.6, "000110": 9.3, "000111": 8.7, "000120": 9.1, "000121": 8.1,
+    "000200": 9.3, "000201": 9, "000210": 8.9, "000211": 8, "000220": 8.1, "000221": 6.8,
+    "001000": 9.8, "001001": 9.5, "001010": 9.5, "001011": 9.2, "001020": 9, "001021": 8.4,
+    "001100": 9.3, "001101": 9.2, "001110": 8.9, "001111": 8.1, "001120": 8.1, "001121": 6.5,
+    "001200": 8.8, "001201": 8, "001210": 7.8, "001211": 7, "001220": 6.9, "001221": 4.8,
+    "002001": 9.2, "002011": 8.2, "002021": 7.2, "002101": 7.9, "002111": 6.9, "002121": 5,
+    "002201": 6.9, "002211": 5.5, "002221": 2.7, "010000": 9.9, "010001": 9.7, "010010": 9.5,
+    "010011": 9.2, "010020": 9.2, "010021": 8.5, "010100": 9.5, "010101": 9.1, "010110": 9,
+    "010111": 8.3, "010120": 8.4, "010121": 7.1, "010200": 9.2, "010201": 8.1, "010210": 8.2,
+    "010211": 7.1, "010220": 7.2, "010221": 5.3, "011000": 9.5, "011001": 9.3, "011010": 9.2,
+    "011011": 8.5, "011020": 8.5, "011021": 7.3, "011100": 9.2, "011101": 8.2, "011110": 8,
+    "011111": 7.2, "011120": 7, "011121": 5.9, "011200": 8.4, "011201": 7, "011210": 7.1,
+    "011211": 5.2, "011220": 5, "011221": 3, "012001": 8.6, "012011": 7.5, "012021": 5.2,
+    "012101": 7.1, "012111": 5.2, "012121": 2.9, "012201": 6.3, "012211": 2.9, "012221": 1.7,
+    "100000": 9.8, "100001": 9.5, "100010": 9.4, "100011": 8.7, "100020": 9.1, "100021": 8.1,
+    "100100": 9.4, "100101": 8.9, "100110": 8.6, "100111": 7.4, "100120": 7.7, "100121": 6.4,
+    "100200": 8.7, "100201": 7.5, "100210": 7.4, "100211": 6.3, "100220": 6.3, "100221": 4.9,
+    "101000": 9.4, "101001": 8.9, "101010": 8.8, "101011": 7.7, "101020": 7.6, "101021": 6.7,
+    "101100": 8.6, "101101": 7.6, "101110": 7.4, "101111": 5.8, "101120": 5.9, "101121": 5,
+    "101200": 7.2, "101201": 5.7, "101210": 5.7, "101211": 5.2, "101220": 5.2, "101221": 2.5,
+    "102001": 8.3, "102011": 7, "102021": 5.4, "102101": 6.5, "102111": 5.8, "102121": 2.6,
+    "102201": 5.3, "102211": 2.1, "102221": 1.3, "110000": 9.5, "110001": 9, "110010": 8.8,
+    "110011": 7.6, "110020": 7.6, "110021": 7, "110100": 9, "110101": 7.7, "110110": 7.5,
+    "110111": 6.2, "110120": 6.1, "110121": 5.3, "110200": 7.7, "110201": 6.6, "110210": 6.8,
+    "110211": 5.9, "110220": 5.2, "110221": 3, "111000": 8.9, "111001": 7.8, "111010": 7.6,
+    "111011": 6.7, "111020": 6.2, "111021": 5.8, "111100": 7.4, "111101": 5.9, "111110": 5.7,
+    "111111": 5.7, "111120": 4.7, "111121": 2.3, "111200": 6.1, "111201": 5.2, "111210": 5.7,
+    "111211": 2.9, "111220": 2.4, "111221": 1.6, "112001": 7.1, "112011": 5.9, "112021": 3,
+    "112101": 5.8, "112111": 2.6, "112121": 1.5, "112201": 2.3, "112211": 1.3, "112221": 0.6,
+    "200000": 9.3, "200001": 8.7, "200010": 8.6, "200011": 7.2, "200020": 7.5, "200021": 5.8,
+    "200100": 8.6, "200101": 7.4, "200110": 7.4, "200111": 6.1, "200120": 5.6, "200121": 3.4,
+    "200200": 7, "200201": 5.4, "200210": 5.2, "200211": 4, "200220": 4, "200221": 2.2,
+    "201000": 8.5, "201001": 7.5, "201010": 7.4, "201011": 5.5, "201020": 6.2, "201021": 5.1,
+    "201100": 7.2, "201101": 5.7, "201110": 5.5, "201111": 4.1, "201120": 4.6, "201121": 1.9,
+    "201200": 5.3, "201201": 3.6, "201210": 3.4, "201211": 1.9, "201220": 1.9, "201221": 0.8,
+    "202001": 6.4, "202011": 5.1, "202021": 2, "202101": 4.7, "202111": 2.1, "202121": 1.1,
+    "202201": 2.4, "202211": 0.9, "202221": 0.4, "210000": 8.8, "210001": 7.5, "210010": 7.3,
+    "210011": 5.3, "210020": 6, "210021": 5, "210100": 7.3, "210101": 5.5, "210110": 5.9,
+    "210111": 4, "210120": 4.1, "210121": 2, "210200": 5.4, "210201": 4.3, "210210": 4.5,
+    "210211": 2.2, "210220": 2, "210221": 1.1, "211000": 7.5, "211001": 5.5, "211010": 5.8,
+    "211011": 4.5, "211020": 4, "211021": 2.1, "211100": 6.1, "211101": 5.1, "211110": 4.8,
+    "211111": 1.8, "211120": 2, "211121": 0.9, "211200": 4.6, "211201": 1.8, "211210": 1.7,
+    "211211": 0.7, "211220": 0.8, "211221": 0.2, "212001": 5.3, "212011": 2.4, "212021": 1.4,
+    "212101": 2.4, "212111": 1.2, "212121": 0.5, "212201": 1, "212211": 0.3, "212221": 0.1,
+}
+
+# Highest-severity vectors of each equivalence class, used to measure how far a
+# vector sits below the top of its macrovector.
+MAX_COMPOSED = {
+    "eq1": {
+        0: ["AV:N/PR:N/UI:N"],
+        1: ["AV:A/PR:N/UI:N", "AV:N/PR:L/UI:N", "AV:N/PR:N/UI:P"],
+        2: ["AV:P/PR:N/UI:N", "AV:A/PR:L/UI:P"],
+    },
+    "eq2": {
+        0: ["AC:L/AT:N"],
+        1: ["AC:H/AT:N", "AC:L/AT:P"],
+    },
+    "eq3eq6": {
+        (0, 0): ["VC:H/VI:H/VA:H/CR:H/IR:H/AR:H"],
+        (0, 1): ["VC:H/VI:H/VA:L/CR:M/IR:M/AR:H", "VC:H/VI:H/VA:H/CR:M/IR:M/AR:M"],
+        (1, 0): ["VC:L/VI:H/VA:H/CR:H/IR:H/AR:H", "VC:H/VI:L/VA:H/CR:H/IR:H/AR:H"],
+        (1, 1): [
+            "VC:L/VI:H/VA:L/CR:H/IR:M/AR:H",
+            "VC:L/VI:H/VA:H/CR:H/IR:M/AR:M",
+            "VC:H/VI:L/VA:H/CR:M/IR:H/AR:M",
+            "VC:H/VI:L/VA:L/CR:M/IR:H/AR:H",
+            "VC:L/VI:L/VA:H/CR:H/IR:H/AR:M",
+        ],
+        (2, 1): ["VC:L/VI:L/VA:L/CR:H/IR:H/AR:H"],
+    },
+    "eq4": {
+        0: ["SC:H/SI:S/SA:S"],
+        1: ["SC:H/SI:H/SA:H"],
+        2: ["SC:L/SI:L/SA:L"],
+    },
+}
+
+# Depth (in 0.1 steps) of each equivalence class.
+MAX_SEVERITY = {
+    "eq1": {0: 1, 1: 4, 2: 5},
+    "eq2": {0: 1, 1: 2},
+    "eq3eq6": {(0, 0): 7, (0, 1): 6, (1, 0): 8, (1, 1): 8, (2, 1): 10},
+    "eq4": {0: 6, 1: 5, 2: 4},
+}
+
+# Severity distance of each metric value from the most severe value.
+LEVELS = {
+    "AV": {"N": 0.0, "A": 0.1, "L": 0.2, "P": 0.3},
+    "PR": {"N": 0.0, "L": 0.1, "H": 0.2},
+    "UI": {"N": 0.0, "P": 0.1, "A": 0.2},
+    "AC": {"L": 0.0, "H": 0.1},
+    "AT": {"N": 0.0, "P": 0.1},
+    "VC": {"H": 0.0, "L": 0.1, "N": 0.2},
+    "VI": {"H": 0.0, "L": 0.1, "N": 0.2},
+    "VA": {"H": 0.0, "L": 0.1, "N": 0.2},
+    "SC": {"H": 0.1, "L": 0.2, "N": 0.3},
+    "SI": {"S": 0.0, "H": 0.1, "L": 0.2, "N": 0.3},
+    "SA": {"S": 0.0, "H": 0.1, "L": 0.2, "N": 0.3},
+    "CR": {"H": 0.0, "M": 0.1, "L": 0.2},
+    "IR": {"H": 0.0, "M": 0.1, "L": 0.2},
+    "AR": {"H": 0.0, "M": 0.1, "L": 0.2},
+}
+
+# Metrics that drive the score, in the order used for memoization keys.
+SCORING_METRICS = ("AV", "AC", "AT", "PR", "UI", "VC", "VI", "VA", "SC", "SI", "SA", "E", "CR", "IR", "AR")
+
+
+def _parse_composed(vector: str) -> dict[str, float]:
+    """Turn a MAX_COMPOSED fragment into per-metric severity levels."""
+    levels = {}
+    for part in vector.split("/"):
+        metric, value = part.split(":")
+        levels[metric] = LEVELS[metric][value]
+    return levels
+
+
+def _build_max_vectors() -> dict[tuple[int, ...], tuple[dict[str, float], ...]]:
+    """Precompute the candidate max vectors (as severity levels) for every macrovector."""
+    table = {}
+    for key in MACROVECTOR_SCORES:
+        eq1, eq2, eq3, eq4, _eq5, eq6 = (int(c) for c in key)
+        candidates = []
+        for v1 in MAX_COMPOSED["eq1"][eq1]:
+            for v2 in MAX_COMPOSED["eq2"][eq2]:
+                for v36 in MAX_COMPOSED["eq3eq6"][(eq3, eq6)]:
+                    for v4 in MAX_COMPOSED["eq4"][eq4]:
+                        candidates.append(_parse_composed("/".join((v1, v2, v36, v4))))
+        table[tuple(int(c) for c in key)] = tuple(candidates)
+    return table
+
+
+_MAX_VECTORS = _build_max_vectors()
+
+
+def _round_half_up(value: float) -> float:
+    return float(Decimal(value * 10).quantize(Decimal("1"), rounding=ROUND_HALF_UP) / 10)
+
+
+def parse_vector(vector_string: str) -> dict[str, str] | None:
+    """
+    Parse a CVSS 4.0 vector string into its metrics.
+
+    Args:
+        vector_string: CVSS vector (e.g., "CVSS:4.0/AV:N/AC:L/AT:N/PR:N/UI:N/VC:H/VI:H/VA:H/SC:N/SI:N/SA:N")
+
+    Returns:
+        Dictionary of metric values or None if invalid
+    """
+    if not vector_string or not vector_string.startswith(VERSION_PREFIX):
+        return None
+
+    metrics: dict[str, str] = {}
+    for part in vector_string[len(VERSION_PREFIX):].split("/"):
+        key, sep, value = part.partition(":")
+        if not sep or key in metrics or key not in METRICS or value not in METRICS[key]["values"]:
+            return None
+        metrics[key] = value
+
+    if not all(metric in metrics for metric in METRIC_GROUPS["base"]):
+        return None
+
+    return metrics
+
+
+def effective_metrics(metrics: dict[str, str]) -> tuple[str, ...]:
+    """
+    Resolve the values used for scoring, in SCORING_METRICS order.
+
+    Modified metrics override base metrics, and undefined threat and
+    requirement metrics take their worst-case defaults.
+    """
+    values = []
+    for metric in SCORING_METRICS:
+        modified = metrics.get(f"M{metric}", "X")
+        if modified != "X":
+            values.append(modified)
+        elif metric == "E":
+            values.append(metrics.get("E", "X") if metrics.get("E", "X") != "X" else "A")
+        elif metric in ("CR", "IR", "AR"):
+            value = metrics.get(metric, "X")
+            values.append("H" if value == "X" else value)
+        else:
+            values.append(metrics[metric])
+    return tuple(values)
+
+
+def macrovector(values: tuple[str, ...]) -> tuple[int, int, int, int, int, int]:
+    """Compute the EQ1..EQ6 macrovector for effective metric values."""
+    m = dict(zip(SCORING_METRICS, values, strict=True))
+
+    if m["AV"] == "N" and m["PR"] == "N" and m["UI"] == "N":
+        eq1 = 0
+    elif (m["AV"] == "N" or m["PR"] == "N" or m["UI"] == "N") and m["AV"] != "P":
+        eq1 = 1
+    else:
+        eq1 = 2
+
+    eq2 = 0 if m["AC"] == "L" and m["AT"] == "N" else 1
+
+    if m["VC"] == "H" and m["VI"] == "H":
+        eq3 = 0
+    elif m["VC"] == "H" or m["VI"] == "H" or m["VA"] == "H":
+        eq3 = 1
+    else:
+        eq3 = 2
+
+    if m["SI"] == "S" or m["SA"] == "S":
+        eq4 = 0
+    elif m["SC"] == "H" or m["SI"] == "H" or m["SA"] == "H":
+        eq4 = 1
+    else:
+        eq4 = 2
+
+    eq5 = {"A": 0, "P": 1, "U": 2}[m["E"]]
+
+    if (
+        (m["CR"] == "H" and m["VC"] == "H")
+        or (m["IR"] == "H" and m["VI"] == "H")
+        or (m["AR"] == "H" and m["VA"] == "H")
+    ):
+        eq6 = 0
+    else:
+        eq6 = 1
+
+    return eq1, eq2, eq3, eq4, eq5, eq6
+
+
+def _lookup(eqs: tuple[int, ...]) -> float:
+    return MACROVECTOR_SCORES.get("".join(str(eq) for eq in eqs), float("nan"))
+
+
+@lru_cache(maxsize=65536)
+def score_effective(values: tuple[str, ...]) -> float:
+    """Score effective metric values (memoized: each combination is computed once)."""
+    m = dict(zip(SCORING_METRICS, values, strict=True))
+    if all(m[metric] == "N" for metric in ("VC", "VI", "VA", "SC", "SI", "SA")):
+        return 0.0
+
+    eqs = macrovector(values)
+    eq1, eq2, eq3, eq4, eq5, eq6 = eqs
+    value = _lookup(eqs)
+
+    lower_eq1 = _lookup((eq1 + 1, eq2, eq3, eq4, eq5, eq6))
+    lower_eq2 = _lookup((eq1, eq2 + 1, eq3, eq4, eq5, eq6))
+    if eq3 == 0 and eq6 == 0:
+        lower_eq3eq6 = max(
+            _lookup((eq1, eq2, eq3, eq4, eq5, eq6 + 1)),
+            _lookup((eq1, eq2, eq3 + 1, eq4, eq5, eq6)),
+        )
+    elif eq3 == 1 and eq6 == 0:
+        lower_eq3eq6 = _lookup((eq1, eq2, eq3, eq4, eq5, eq6 + 1))
+    elif eq6 == 1 and eq3 in (0, 1):
+        lower_eq3eq6 = _lookup((eq1, eq2, eq3 + 1, eq4, eq5, eq6))
+    else:
+        lower_eq3eq6 = _lookup((eq1, eq2, eq3 + 1, eq4, eq5, eq6 + 1))
+    lower_eq4 = _lookup((eq1, eq2, eq3, eq4 + 1, eq5, eq6))
+    lower_eq5 = _lookup((eq1, eq2, eq3, eq4, eq5 + 1, eq6))
+
+    # Distance of each metric from the first max vector it does not exceed.
+    levels = {metric: LEVELS[metric][m[metric]] for metric in LEVELS}
+    for candidate in _MAX_VECTORS[eqs]:
+        distance = {metric: levels[metric] - candidate[metric] for metric in LEVELS}
+        if all(d >= 0 for d in distance.values()):
+            break
+
+    current_eq1 = distance["AV"] + distance["PR"] + distance["UI"]
+    current_eq2 = distance["AC"] + distance["AT"]
+    current_eq3eq6 = (
+        distance["VC"] + distance["VI"] + distance["VA"] + distance["CR"] + distance["IR"] + distance["AR"]
+    )
+    current_eq4 = distance["SC"] + distance["SI"] + distance["SA"]
+
+    step = 0.1
+    parts = [
+        (value - lower_eq1, current_eq1 / (MAX_SEVERITY["eq1"][eq1] * step)),
+        (value - lower_eq2, current_eq2 / (MAX_SEVERITY["eq2"][eq2] * step)),
+        (value - lower_eq3eq6, current_eq3eq6 / (MAX_SEVERITY["eq3eq6"][(eq3, eq6)] * step)),
+        (value - lower_eq4, current_eq4 / (MAX_SEVERITY["eq4"][eq4] * step)),
+        # EQ5 has no intra-class distance.
+        (value - lower_eq5, 0.0),
+    ]
+    # NaN (no lower macrovector) fails the comparison and is skipped.
+    available = [available * percent for available, percent in parts if available >= 0]
+    mean_distance = sum(available) / len(available) if available else 0.0
+
+    return _round_half_up(min(10.0, max(0.0, value - mean_distance)))
+
+
+def nomenclature(metrics: dict[str, str]) -> str:
+    """Return CVSS-B, CVSS-BT, CVSS-BE or CVSS-BTE depending on the metrics supplied."""
+    threat = metrics.get("E", "X") != "X"
+    environmental = any(metrics.get(metric, "X") != "X" for metric in METRIC_GROUPS["environmental"])
+    if threat and environmental:
+        return "CVSS-BTE"
+    if threat:
+        return "CVSS-BT"
+    if environmental:
+        return "CVSS-BE"
+    return "CVSS-B"
+
+
+def build_vector_string(metrics: dict[str, str]) -> str:
+    """Build a CVSS 4.0 vector string in canonical order, omitting undefined optional metrics."""
+    base = set(METRIC_GROUPS["base"])
+    parts = [
+        f"{metric}:{metrics[metric]}"
+        for metric in METRIC_ORDER
+        if metric in metrics and (metric in base or metrics[metric] != "X")
+    ]
+    return f"{VERSION_PREFIX}{'/'.join(parts)}"
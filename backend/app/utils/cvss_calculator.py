@@ -1,7 +1,14 @@
-"""CVSS 3.1 Calculator utility."""
+"""CVSS Calculator utility (3.1 base, temporal and environmental; 4.0 via cvss4_calculator)."""
 
+import math
+from functools import lru_cache
+from itertools import product
 from typing import Dict, Optional
 
+from app.utils import cvss4_calculator
+
+BASE_METRICS = ["AV", "AC", "PR", "UI", "S", "C", "I", "A"]
+
 
 class CVSSCalculator:
     """Calculate CVSS 3.1 scores from vector strings."""
@@ -48,6 +55,63 @@ class CVSSCalculator:
         },
     }
 
+    # CVSS 3.1 Temporal metrics ("X" = Not Defined)
+    TEMPORAL_METRICS = {
+        "E": {  # Exploit Code Maturity
+            "X": {"value": "Not Defined", "score": 1.0},
+            "H": {"value": "High", "score": 1.0},
+            "F": {"value": "Functional", "score": 0.97},
+            "P": {"value": "Proof-of-Concept", "score": 0.94},
+            "U": {"value": "Unproven", "score": 0.91},
+        },
+        "RL": {  # Remediation Level
+            "X": {"value": "Not Defined", "score": 1.0},
+            "U": {"value": "Unavailable", "score": 1.0},
+            "W": {"value": "Workaround", "score": 0.97},
+            "T": {"value": "Temporary Fix", "score": 0.96},
+            "O": {"value": "Official Fix", "score": 0.95},
+        },
+        "RC": {  # Report Confidence
+            "X": {"value": "Not Defined", "score": 1.0},
+            "C": {"value": "Confirmed", "score": 1.0},
+            "R": {"value": "Reasonable", "score": 0.96},
+            "U": {"value": "Unknown", "score": 0.92},
+        },
+    }
+
+    # CVSS 3.1 Environmental metrics. Modified base metrics reuse the base
+    # weights; "X" falls back to the base metric value.
+    NOT_DEFINED = {"value": "Not Defined", "score": None}
+    REQUIREMENT_SCORES = {
+        "X": {"value": "Not Defined", "score": 1.0},
+        "H": {"value": "High", "score": 1.5},
+        "M": {"value": "Medium", "score": 1.0},
+        "L": {"value": "Low", "score": 0.5},
+    }
+    ENVIRONMENTAL_METRICS = {
+        "CR": REQUIREMENT_SCORES,  # Confidentiality Requirement
+        "IR": REQUIREMENT_SCORES,  # Integrity Requirement
+        "AR": REQUIREMENT_SCORES,  # Availability Requirement
+        "MAV": {"X": NOT_DEFINED, **METRICS["AV"]},
+        "MAC": {"X": NOT_DEFINED, **METRICS["AC"]},
+        "MPR": {"X": NOT_DEFINED, **METRICS["PR"]},
+        "MUI": {"X": NOT_DEFINED, **METRICS["UI"]},
+        "MS": {"X": NOT_DEFINED, **METRICS["S"]},
+        "MC": {"X": NOT_DEFINED, **METRICS["C"]},
+        "MI": {"X": NOT_DEFINED, **METRICS["I"]},
+        "MA": {"X": NOT_DEFINED, **METRICS["A"]},
+    }
+
+    OPTIONAL_METRICS = {**TEMPORAL_METRICS, **ENVIRONMENTAL_METRICS}
+
+    @staticmethod
+    def roundup(value: float) -> float:
+        """Round up to one decimal as defined in CVSS 3.1 Appendix A."""
+        int_input = round(value * 100000)
+        if int_input % 10000 == 0:
+            return int_input / 100000.0
+        return (math.floor(int_input / 10000) + 1) / 10.0
+
     @staticmethod
     def parse_vector(vector_string: str) -> Optional[Dict[str, str]]:
         """
@@ -74,8 +138,7 @@ class CVSSCalculator:
                 metrics[key] = value
 
             # Validate required metrics
-            required = ["AV", "AC", "PR", "UI", "S", "C", "I", "A"]
-            if not all(m in metrics for m in required):
+            if not all(m in metrics for m in BASE_METRICS):
                 return None
 
             return metrics
@@ -84,9 +147,11 @@ class CVSSCalculator:
             return None
 
     @staticmethod
-    def calculate_base_score(metrics: Dict[str, str]) -> Optional[float]:
+    def compute_base_score(metrics: Dict[str, str]) -> Optional[float]:
         """
-        Calculate CVSS 3.1 Base Score.
+        Compute CVSS 3.1 Base Score from the specification formulas.
+
+        Prefer calculate_base_score, which reads the precomputed table.
 
         Args:
             metrics: Dictionary of metric values
@@ -121,18 +186,100 @@ class CVSSCalculator:
 
             # Calculate Base Score
             if impact <= 0:
-                base_score = 0.0
-            elif scope == "U":
-                base_score = min(impact + exploitability, 10.0)
-            else:
-                base_score = min(1.08 * (impact + exploitability), 10.0)
-
-            # Round up to 1 decimal
-            return round(base_score * 10) / 10
+                return 0.0
+            if scope == "U":
+                return CVSSCalculator.roundup(min(impact + exploitability, 10.0))
+            return CVSSCalculator.roundup(min(1.08 * (impact + exploitability), 10.0))
 
         except (KeyError, ValueError):
             return None
 
+    @staticmethod
+    def calculate_base_score(metrics: Dict[str, str]) -> Optional[float]:
+        """
+        Calculate CVSS 3.1 Base Score.
+
+        Args:
+            metrics: Dictionary of metric values
+
+        Returns:
+            Base score (0.0 - 10.0) or None if invalid
+        """
+        try:
+            return BASE_SCORES[tuple(metrics[m] for m in BASE_METRICS)]
+        except KeyError:
+            return None
+
+    @staticmethod
+    def calculate_temporal_score(metrics: Dict[str, str], base_score: float) -> float:
+        """
+        Calculate CVSS 3.1 Temporal Score.
+
+        Args:
+            metrics: Dictionary of metric values (undefined temporal metrics count as "X")
+            base_score: Base score of the same vector
+
+        Returns:
+            Temporal score (0.0 - 10.0)
+        """
+        return CVSSCalculator.roundup(base_score * CVSSCalculator._temporal_multiplier(metrics))
+
+    @staticmethod
+    def calculate_environmental_score(metrics: Dict[str, str]) -> Optional[float]:
+        """
+        Calculate CVSS 3.1 Environmental Score.
+
+        Args:
+            metrics: Dictionary of metric values (modified metrics fall back to base values)
+
+        Returns:
+            Environmental score (0.0 - 10.0) or None if invalid
+        """
+        calc = CVSSCalculator
+        try:
+            def modified(metric: str) -> str:
+                value = metrics.get(f"M{metric}", "X")
+                return metrics[metric] if value == "X" else value
+
+            scope = modified("S")
+            mav = calc.METRICS["AV"][modified("AV")]["score"]
+            mac = calc.METRICS["AC"][modified("AC")]["score"]
+            mpr = calc.METRICS["PR"][modified("PR")]["score"][scope]
+            mui = calc.METRICS["UI"][modified("UI")]["score"]
+            mc = calc.METRICS["C"][modified("C")]["score"]
+            mi = calc.METRICS["I"][modified("I")]["score"]
+            ma = calc.METRICS["A"][modified("A")]["score"]
+            cr = calc.REQUIREMENT_SCORES[metrics.get("CR", "X")]["score"]
+            ir = calc.REQUIREMENT_SCORES[metrics.get("IR", "X")]["score"]
+            ar = calc.REQUIREMENT_SCORES[metrics.get("AR", "X")]["score"]
+        except KeyError:
+            return None
+
+        miss = min(1 - (1 - cr * mc) * (1 - ir * mi) * (1 - ar * ma), 0.915)
+        if scope == "U":
+            modified_impact = 6.42 * miss
+        else:
+            modified_impact = 7.52 * (miss - 0.029) - 3.25 * pow(miss * 0.9731 - 0.02, 13)
+        modified_exploitability = 8.22 * mav * mac * mpr * mui
+
+        if modified_impact <= 0:
+            return 0.0
+
+        if scope == "U":
+            base = calc.roundup(min(modified_impact + modified_exploitability, 10.0))
+        else:
+            base = calc.roundup(min(1.08 * (modified_impact + modified_exploitability), 10.0))
+        return calc.roundup(base * calc._temporal_multiplier(metrics))
+
+    @staticmethod
+    def _temporal_multiplier(metrics: Dict[str, str]) -> float:
+        temporal = CVSSCalculator.TEMPORAL_METRICS
+        return (
+            temporal["E"][metrics.get("E", "X")]["score"]
+            * temporal["RL"][metrics.get("RL", "X")]["score"]
+            * temporal["RC"][metrics.get("RC", "X")]["score"]
+        )
+
     @staticmethod
     def build_vector_string(metrics: Dict[str, str]) -> str:
         """
@@ -144,8 +291,12 @@ class CVSSCalculator:
         Returns:
             CVSS vector string
         """
-        required = ["AV", "AC", "PR", "UI", "S", "C", "I", "A"]
-        parts = [f"{m}:{metrics[m]}" for m in required if m in metrics]
+        order = BASE_METRICS + list(CVSSCalculator.OPTIONAL_METRICS)
+        parts = [
+            f"{m}:{metrics[m]}"
+            for m in order
+            if m in metrics and (m in BASE_METRICS or metrics[m] != "X")
+        ]
         return f"CVSS:3.1/{'/'.join(parts)}"
 
     @staticmethod
@@ -181,48 +332,133 @@ class CVSSCalculator:
         Returns:
             True if valid, False otherwise
         """
-        required = ["AV", "AC", "PR", "UI", "S", "C", "I", "A"]
-
         # Check all required metrics present
-        if not all(m in metrics for m in required):
+        if not all(m in metrics for m in BASE_METRICS):
             return False
 
         # Check all values are valid
         for metric, value in metrics.items():
-            if metric not in CVSSCalculator.METRICS:
-                return False
-            if value not in CVSSCalculator.METRICS[metric]:
+            definitions = CVSSCalculator.METRICS.get(metric) or CVSSCalculator.OPTIONAL_METRICS.get(metric)
+            if definitions is None or value not in definitions:
                 return False
 
         return True
 
 
-def calculate_cvss(vector_string: str) -> Optional[Dict]:
-    """
-    Calculate CVSS score from vector string.
+# Every CVSS 3.1 base vector has a fixed score: compute them all once (2,592 entries).
+BASE_SCORES: Dict[tuple, float] = {
+    combo: CVSSCalculator.compute_base_score(dict(zip(BASE_METRICS, combo, strict=True)))
+    for combo in product(*(CVSSCalculator.METRICS[m] for m in BASE_METRICS))
+}
 
-    Args:
-        vector_string: CVSS vector string
 
-    Returns:
-        Dictionary with score, severity, and metrics or None
-    """
+def _score_cvss31(vector_string: str) -> Optional[Dict]:
     metrics = CVSSCalculator.parse_vector(vector_string)
-    if not metrics:
+    if not metrics or not CVSSCalculator.validate_metrics(metrics):
         return None
 
-    score = CVSSCalculator.calculate_base_score(metrics)
-    if score is None:
+    base_score = CVSSCalculator.calculate_base_score(metrics)
+    if base_score is None:
+        return None
+
+    has_temporal = any(metrics.get(m, "X") != "X" for m in CVSSCalculator.TEMPORAL_METRICS)
+    has_environmental = any(metrics.get(m, "X") != "X" for m in CVSSCalculator.ENVIRONMENTAL_METRICS)
+
+    return {
+        "version": "3.1",
+        "score": base_score,
+        "severity": CVSSCalculator.get_severity_rating(base_score),
+        "vector": vector_string,
+        "metrics": metrics,
+        "base_score": base_score,
+        "temporal_score": (
+            CVSSCalculator.calculate_temporal_score(metrics, base_score) if has_temporal else None
+        ),
+        "environmental_score": (
+            CVSSCalculator.calculate_environmental_score(metrics) if has_environmental else None
+        ),
+        "nomenclature": None,
+    }
+
+
+def _score_cvss40(vector_string: str) -> Optional[Dict]:
+    metrics = cvss4_calculator.parse_vector(vector_string)
+    if not metrics:
         return None
 
+    score = cvss4_calculator.score_effective(cvss4_calculator.effective_metrics(metrics))
+    base_only = {m: metrics[m] for m in cvss4_calculator.METRIC_GROUPS["base"]}
+    base_score = cvss4_calculator.score_effective(cvss4_calculator.effective_metrics(base_only))
+
     return {
+        "version": "4.0",
         "score": score,
         "severity": CVSSCalculator.get_severity_rating(score),
         "vector": vector_string,
         "metrics": metrics,
+        "base_score": base_score,
+        "temporal_score": None,
+        "environmental_score": None,
+        "nomenclature": cvss4_calculator.nomenclature(metrics),
     }
 
 
+@lru_cache(maxsize=16384)
+def _calculate_cached(vector_string: str) -> Optional[Dict]:
+    if vector_string.startswith(cvss4_calculator.VERSION_PREFIX):
+        return _score_cvss40(vector_string)
+    return _score_cvss31(vector_string)
+
+
+def calculate_cvss(vector_string: str) -> Optional[Dict]:
+    """
+    Calculate CVSS score from vector string.
+
+    Supports CVSS 3.1 (base, temporal and environmental metrics) and CVSS 4.0.
+    Results are memoized per vector string, so re-scoring a library full of
+    repeated vectors costs one dictionary lookup per row.
+
+    Args:
+        vector_string: CVSS vector string
+
+    Returns:
+        Dictionary with score, severity, and metrics or None.
+        For 3.1, ``score`` is the base score; for 4.0 it is the score matching
+        the supplied metric groups (see ``nomenclature``).
+    """
+    if not vector_string:
+        return None
+
+    result = _calculate_cached(vector_string.strip())
+    if result is None:
+        return None
+
+    return {**result, "metrics": dict(result["metrics"])}
+
+
+def build_cvss_from_metrics(metrics: Dict[str, str], version: str = "3.1") -> Optional[Dict]:
+    """
+    Build CVSS vector and calculate score from a metric dictionary.
+
+    Args:
+        metrics: Metric abbreviations mapped to values (e.g. {"AV": "N", ...})
+        version: "3.1" or "4.0"
+
+    Returns:
+        Dictionary with score, severity, vector, and metrics or None
+    """
+    if version == "4.0":
+        vector = cvss4_calculator.build_vector_string(metrics)
+    elif version == "3.1":
+        if not CVSSCalculator.validate_metrics(metrics):
+            return None
+        vector = CVSSCalculator.build_vector_string(metrics)
+    else:
+        return None
+
+    return calculate_cvss(vector)
+
+
 def build_cvss_vector(
     av: str,
     ac: str,
@@ -234,7 +470,7 @@ def build_cvss_vector(
     a: str,
 ) -> Optional[Dict]:
     """
-    Build CVSS vector and calculate score from individual metrics.
+    Build CVSS 3.1 vector and calculate score from individual base metrics.
 
     Args:
         av: Attack Vector (N, A, L, P)
@@ -260,18 +496,4 @@ def build_cvss_vector(
         "A": a,
     }
 
-    if not CVSSCalculator.validate_metrics(metrics):
-        return None
-
-    vector = CVSSCalculator.build_vector_string(metrics)
-    score = CVSSCalculator.calculate_base_score(metrics)
-
-    if score is None:
-        return None
-
-    return {
-        "score": score,
-        "severity": CVSSCalculator.get_severity_rating(score),
-        "vector": vector,
-        "metrics": metrics,
-    }
+    return build_cvss_from_metrics(metrics, version="3.1")
@@ -0,0 +1,325 @@
+"""Library-wide CVSS consistency checks and rescoring.
+
+Jobs are tracked in memory by the worker that started them: with several
+workers, poll ``GET /api/admin/cvss-consistency/{job_id}`` until it lands on
+that worker (a 404 elsewhere does not mean the job is gone), and the
+one-job-at-a-time guard only holds per worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.vulnerability import Vulnerability, VulnerabilityHistory, VulnerabilityLevel
+from app.schemas.vulnerability import VulnerabilityInfo
+from app.utils.change_feed import record_changes
+from app.utils.cvss_calculator import CVSSCalculator, calculate_cvss
+from app.utils.fast_read import VULNERABILITY_COLUMNS, labelled
+
+logger = logging.getLogger(__name__)
+
+# Stored scores are floats coming from XML or the UI; treat anything closer than
+# this to the computed score as equal.
+SCORE_TOLERANCE = 0.05
+
+# Cap on the number of individual findings kept in a report.
+MAX_REPORTED_MISMATCHES = 500
+
+_SEVERITY_TO_LEVEL = {
+    "None": VulnerabilityLevel.INFO,
+    "Low": VulnerabilityLevel.LOW,
+    "Medium": VulnerabilityLevel.MEDIUM,
+    "High": VulnerabilityLevel.HIGH,
+    "Critical": VulnerabilityLevel.CRITICAL,
+}
+
+
+def score_vector(vector: str) -> float | None:
+    """Return the score for a vector string, or None if it cannot be scored."""
+
+    result = calculate_cvss(vector)
+    return result["score"] if result else None
+
+
+def expected_level(score: float) -> VulnerabilityLevel:
+    """Map a CVSS score to the severity level it implies."""
+
+    return _SEVERITY_TO_LEVEL[CVSSCalculator.get_severity_rating(score)]
+
+
+@dataclass(slots=True)
+class CVSSMismatch:
+    """A single vulnerability whose CVSS data does not agree with itself."""
+
+    vulnerability_id: uuid.UUID
+    name: str
+    issues: list[str]
+    stored_score: float | None
+    computed_score: float | None
+    stored_level: str
+    expected_level: str | None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "vulnerability_id": str(self.vulnerability_id),
+            "name": self.name,
+            "issues": self.issues,
+            "stored_score": self.stored_score,
+            "computed_score": self.computed_score,
+            "stored_level": self.stored_level,
+            "expected_level": self.expected_level,
+        }
+
+
+@dataclass
+class ConsistencyReport:
+    """Aggregated result of a consistency run."""
+
+    fix: bool
+    scanned: int = 0
+    vectors_scored: int = 0
+    invalid_vectors: int = 0
+    score_mismatches: int = 0
+    level_mismatches: int = 0
+    fixed_scores: int = 0
+    fixed_levels: int = 0
+    mismatches: list[CVSSMismatch] = field(default_factory=list)
+
+    def record(self, mismatch: CVSSMismatch) -> None:
+        if len(self.mismatches) < MAX_REPORTED_MISMATCHES:
+            self.mismatches.append(mismatch)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "fix": self.fix,
+            "scanned": self.scanned,
+            "vectors_scored": self.vectors_scored,
+            "invalid_vectors": self.invalid_vectors,
+            "score_mismatches": self.score_mismatches,
+            "level_mismatches": self.level_mismatches,
+            "fixed_scores": self.fixed_scores,
+            "fixed_levels": self.fixed_levels,
+            "mismatches": [m.as_dict() for m in self.mismatches],
+            "truncated": len(self.mismatches) >= MAX_REPORTED_MISMATCHES,
+        }
+
+
+async def check_cvss_consistency(
+    db: AsyncSession,
+    *,
+    fix: bool = False,
+    chunk_size: int = 1000,
+    report: ConsistencyReport | None = None,
+    changed_by: uuid.UUID | None = None,
+) -> ConsistencyReport:
+    """
+    Scan the whole vulnerabilities table for CVSS inconsistencies.
+
+    Rows are read in primary-key order, one chunk at a time, selecting only the
+    columns needed for scoring. Each distinct vector in a chunk is scored once.
+    When ``fix`` is set, corrections are applied per chunk with one
+    ``UPDATE ... RETURNING`` per distinct (score, level) target and committed,
+    together with one multi-row history insert and their change log entries,
+    before moving on, so no long-lived transaction or lock is held.
+
+    Args:
+        db: Session used for reading and, when fixing, writing.
+        fix: Rewrite mismatching scores and levels.
+        chunk_size: Number of rows read per round trip.
+        report: Optional report to fill in (lets callers observe progress).
+        changed_by: User recorded as author of the corrections.
+
+    Returns:
+        The completed report.
+    """
+    report = report or ConsistencyReport(fix=fix)
+    last_id: uuid.UUID | None = None
+
+    while True:
+        query = (
+            select(
+                Vulnerability.id,
+                Vulnerability.name,
+                Vulnerability.level,
+                Vulnerability.cvss_score,
+                Vulnerability.cvss_vector,
+            )
+            .order_by(Vulnerability.id)
+            .limit(chunk_size)
+        )
+        if last_id is not None:
+            query = query.where(Vulnerability.id > last_id)
+
+        rows = (await db.execute(query)).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        computed = {
+            vector: score_vector(vector)
+            for vector in {row.cvss_vector for row in rows if row.cvss_vector}
+        }
+        # (new score or None, new level or None) -> ids needing exactly that correction
+        fixes: dict[tuple[float | None, VulnerabilityLevel | None], list[uuid.UUID]] = {}
+
+        for row in rows:
+            report.scanned += 1
+            issues: list[str] = []
+            computed_score: float | None = None
+            effective_score = row.cvss_score
+            new_score: float | None = None
+            new_level: VulnerabilityLevel | None = None
+
+            if row.cvss_vector:
+                computed_score = computed[row.cvss_vector]
+                if computed_score is None:
+                    report.invalid_vectors += 1
+                    issues.append("invalid_vector")
+                else:
+                    report.vectors_scored += 1
+                    effective_score = computed_score
+                    if row.cvss_score is None or abs(row.cvss_score - computed_score) > SCORE_TOLERANCE:
+                        report.score_mismatches += 1
+                        issues.append("score_mismatch")
+                        new_score = computed_score
+
+            level: VulnerabilityLevel | None = None
+            if effective_score is not None:
+                level = expected_level(effective_score)
+                if row.level != level:
+                    report.level_mismatches += 1
+                    issues.append("level_mismatch")
+                    new_level = level
+
+            if new_score is not None or new_level is not None:
+                fixes.setdefault((new_score, new_level), []).append(row.id)
+
+            if issues:
+                report.record(
+                    CVSSMismatch(
+                        vulnerability_id=row.id,
+                        name=row.name,
+                        issues=issues,
+                        stored_score=row.cvss_score,
+                        computed_score=computed_score,
+                        stored_level=row.level.value,
+                        expected_level=level.value if level else None,
+                    )
+                )
+
+        if fix and fixes:
+            now = datetime.now(timezone.utc)
+            updated: list[dict[str, Any]] = []
+            for (score, level), ids in fixes.items():
+                values: dict[Any, Any] = {Vulnerability.updated_at: now, Vulnerability.updated_by: changed_by}
+                if score is not None:
+                    values[Vulnerability.cvss_score] = score
+                    report.fixed_scores += len(ids)
+                if level is not None:
+                    values[Vulnerability.level] = level
+                    report.fixed_levels += len(ids)
+                result = await db.execute(
+                    update(Vulnerability)
+                    .where(Vulnerability.id.in_(ids))
+                    .values(values)
+                    .returning(*labelled(VULNERABILITY_COLUMNS))
+                    .execution_options(synchronize_session=False)
+                )
+                updated.extend(result.mappings().all())
+            await db.execute(
+                insert(VulnerabilityHistory),
+                [
+                    {
+                        "vulnerability_id": row["id"],
+                        "snapshot": VulnerabilityInfo.model_validate(dict(row)).model_dump(mode="json"),
+                        "changed_by": changed_by,
+                        "change_type": "updated",
+                    }
+                    for row in updated
+                ],
+            )
+            await record_changes(db, "updated", [(row["id"], row["name"]) for row in updated])
+            await db.commit()
+        else:
+            # End the read transaction between chunks.
+            await db.rollback()
+
+        # Give other request handlers a turn between chunks.
+        await asyncio.sleep(0)
+
+    return report
+
+
+@dataclass
+class ConsistencyJob:
+    """Background consistency run tracked in memory."""
+
+    id: uuid.UUID
+    report: ConsistencyReport
+    status: str = "pending"
+    error: str | None = None
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: datetime | None = None
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "id": str(self.id),
+            "status": self.status,
+            "error": self.error,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "report": self.report.as_dict(),
+        }
+
+
+# Most recent jobs, oldest first. Kept small: reports are also audit-logged.
+MAX_TRACKED_JOBS = 20
+jobs: dict[uuid.UUID, ConsistencyJob] = {}
+
+
+def running_job() -> ConsistencyJob | None:
+    """The job still pending or running, if any (one at a time: it holds a pool connection)."""
+    return next((job for job in jobs.values() if job.status in ("pending", "running")), None)
+
+
+def start_consistency_job(
+    session_factory: async_sessionmaker[AsyncSession],
+    *,
+    fix: bool,
+    chunk_size: int,
+    changed_by: uuid.UUID | None = None,
+) -> ConsistencyJob:
+    """Schedule a consistency run on the event loop and return its handle."""
+
+    job = ConsistencyJob(id=uuid.uuid4(), report=ConsistencyReport(fix=fix))
+
+    async def run() -> None:
+        job.status = "running"
+        try:
+            async with session_factory() as session:
+                await check_cvss_consistency(
+                    session, fix=fix, chunk_size=chunk_size, report=job.report, changed_by=changed_by
+                )
+        except Exception as exc:  # pragma: no cover - depends on database failures
+            logger.exception("CVSS consistency job %s failed", job.id)
+            job.status = "failed"
+            job.error = str(exc)
+        else:
+            job.status = "completed"
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+
+    job.task = asyncio.create_task(run())
+    jobs[job.id] = job
+    while len(jobs) > MAX_TRACKED_JOBS:
+        jobs.pop(next(iter(jobs)))
+    return job
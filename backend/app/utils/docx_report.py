@@ -0,0 +1,200 @@
+"""Streaming generation of .docx findings annexes.
+
+The package is written with ``zipfile`` into a sink that hands compressed
+chunks to the response as they are produced, so a 300-finding annex never
+exists in memory as a whole. Only ``word/document.xml`` depends on the
+selection; every other part comes from a per-template skeleton built once.
+Zip entries carry a fixed timestamp, so identical input yields identical
+bytes (handy for comparing generated files).
+"""
+
+from __future__ import annotations
+
+import zipfile
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from functools import cache
+from xml.sax.saxutils import escape
+
+from app.utils.ooxml import W_NS
+
+# Fixed entry timestamp (earliest date zip supports) for reproducible output.
+ZIP_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+
+# Compressed bytes buffered before a chunk is handed to the response.
+CHUNK_SIZE = 64 * 1024
+
+DOCUMENT_PART = "word/document.xml"
+
+
+@dataclass(frozen=True)
+class DocxTemplate:
+    """Static styling of a generated annex."""
+
+    name: str
+    font: str
+    font_size: int  # half-points
+    heading_color: str
+    landscape: bool = False
+
+
+TEMPLATES: dict[str, DocxTemplate] = {
+    "default": DocxTemplate(name="default", font="Calibri", font_size=20, heading_color="1F2937"),
+    "landscape": DocxTemplate(
+        name="landscape", font="Calibri", font_size=20, heading_color="1F2937", landscape=True
+    ),
+}
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    "</Types>"
+)
+
+_PACKAGE_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    "</Relationships>"
+)
+
+_DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    "</Relationships>"
+)
+
+
+def _styles(template: DocxTemplate) -> str:
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:styles xmlns:w="{W_NS}">'
+        "<w:docDefaults><w:rPrDefault><w:rPr>"
+        f'<w:rFonts w:ascii="{template.font}" w:hAnsi="{template.font}" w:cs="{template.font}"/>'
+        f'<w:sz w:val="{template.font_size}"/>'
+        "</w:rPr></w:rPrDefault></w:docDefaults>"
+        '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/></w:style>'
+        '<w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/>'
+        '<w:basedOn w:val="Normal"/><w:next w:val="Normal"/><w:qFormat/>'
+        '<w:pPr><w:keepNext/><w:spacing w:before="240" w:after="120"/><w:outlineLvl w:val="0"/></w:pPr>'
+        f'<w:rPr><w:b/><w:color w:val="{template.heading_color}"/><w:sz w:val="32"/></w:rPr>'
+        "</w:style>"
+        '<w:style w:type="table" w:default="1" w:styleId="TableNormal"><w:name w:val="Normal Table"/>'
+        '<w:tblPr><w:tblCellMar><w:left w:w="108" w:type="dxa"/><w:right w:w="108" w:type="dxa"/>'
+        "</w:tblCellMar></w:tblPr></w:style>"
+        "</w:styles>"
+    )
+
+
+def _section(template: DocxTemplate) -> str:
+    if template.landscape:
+        size = '<w:pgSz w:w="16838" w:h="11906" w:orient="landscape"/>'
+    else:
+        size = '<w:pgSz w:w="11906" w:h="16838"/>'
+    return (
+        f"<w:sectPr>{size}"
+        '<w:pgMar w:top="1134" w:right="1134" w:bottom="1134" w:left="1134" '
+        'w:header="567" w:footer="567" w:gutter="0"/></w:sectPr>'
+    )
+
+
+@cache
+def template_skeleton(name: str) -> tuple[tuple[str, bytes], ...]:
+    """Static parts of the package for a template, built once per process."""
+    template = TEMPLATES[name]
+    return (
+        ("[Content_Types].xml", _CONTENT_TYPES.encode()),
+        ("_rels/.rels", _PACKAGE_RELS.encode()),
+        ("word/_rels/document.xml.rels", _DOCUMENT_RELS.encode()),
+        ("word/styles.xml", _styles(template).encode()),
+    )
+
+
+def _heading(text: str) -> bytes:
+    return (
+        f'<w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+    ).encode()
+
+
+_SPACER = b"<w:p/>"
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object collecting zip output."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._size = 0
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+            self._size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self, minimum: int = 0) -> bytes | None:
+        """Return buffered output once at least ``minimum`` bytes are available."""
+        if not self._chunks or self._size < minimum:
+            return None
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self._size = 0
+        return data
+
+
+def _entry(name: str) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name, date_time=ZIP_TIMESTAMP)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    return info
+
+
+def stream_docx(
+    template_name: str,
+    title: str,
+    fragments: Iterable[Callable[[], bytes]],
+) -> Iterator[bytes]:
+    """
+    Yield the .docx package for ``fragments`` chunk by chunk.
+
+    Each fragment is a callable returning one rendered ``w:tbl`` so that
+    rendering happens lazily while the response is being sent.
+    """
+    template = TEMPLATES[template_name]
+    sink = _ChunkSink()
+
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as package:
+        for name, data in template_skeleton(template_name):
+            package.writestr(_entry(name), data)
+
+        with package.open(_entry(DOCUMENT_PART), mode="w", force_zip64=True) as document:
+            document.write(
+                f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document xmlns:w="{W_NS}"><w:body>'.encode()
+            )
+            document.write(_heading(title))
+            for render in fragments:
+                document.write(render())
+                document.write(_SPACER)
+                chunk = sink.drain(CHUNK_SIZE)
+                if chunk:
+                    yield chunk
+            document.write(_section(template).encode())
+            document.write(b"</w:body></w:document>")
+
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
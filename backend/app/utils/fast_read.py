@@ -0,0 +1,158 @@
+"""Column-only read path for list endpoints.
+
+Large listings (search pages, the Word macro's ``/bulk`` cache, tokens) skip
+ORM hydration and per-row ``model_validate``: they select Core columns into
+row mappings and serialise them in one pass with a prebuilt ``TypeAdapter``
+over TypedDicts, returning the encoded bytes directly. The TypedDicts mirror
+the public response schemas, which stay the documented ``response_model``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy import Label
+from typing_extensions import TypedDict  # pydantic needs it on Python < 3.12
+
+from app.models.api_token import ApiToken
+from app.models.vulnerability import Vulnerability, VulnerabilityLevel, VulnerabilityType
+from app.schemas.vulnerability import VulnerabilityFacets
+
+
+class VulnerabilityRow(TypedDict, total=False):
+    """Serialised form of ``VulnerabilityInfo`` (keys by alias)."""
+
+    id: UUID
+    name: str
+    level: VulnerabilityLevel
+    scope: str
+    protocol_interface: str
+    cvss_score: float | None
+    cvss_vector: str | None
+    description: str
+    risk: str
+    recommendation: str
+    type: VulnerabilityType
+    tag_order: list[str] | None
+    created_at: datetime
+    updated_at: datetime
+    created_by: UUID | None
+    updated_by: UUID | None
+
+
+class VulnerabilityPage(TypedDict):
+    """Serialised form of ``VulnerabilitySearchResponse``."""
+
+    items: list[VulnerabilityRow]
+    total: int
+    page: int
+    per_page: int
+    facets: VulnerabilityFacets | None
+
+
+class CatalogEntry(TypedDict):
+    """One line of the Word sync catalog."""
+
+    id: UUID
+    name: str
+    level: VulnerabilityLevel
+    type: VulnerabilityType
+    cvss_score: float | None
+    v: int
+
+
+class Catalog(TypedDict):
+    version: str
+    items: list[CatalogEntry]
+
+
+class VulnerabilityDetails(TypedDict):
+    """Batched detail fetch: rows in request order plus unknown ids."""
+
+    items: list[VulnerabilityRow]
+    missing: list[UUID]
+
+
+class ApiTokenRow(TypedDict):
+    """Serialised form of ``ApiTokenInfo``."""
+
+    id: UUID
+    owner_user_id: UUID
+    label: str
+    scopes: list[str]
+    expires_at: datetime | None
+    revoked_at: datetime | None
+    last_used_at: datetime | None
+    last_used_ip: str | None
+    created_at: datetime
+    is_valid: bool
+
+
+# Response key -> column, in response order.
+VULNERABILITY_COLUMNS: dict[str, Any] = {
+    "id": Vulnerability.id,
+    "name": Vulnerability.name,
+    "level": Vulnerability.level,
+    "scope": Vulnerability.scope,
+    "protocol_interface": Vulnerability.protocol_interface,
+    "cvss_score": Vulnerability.cvss_score,
+    "cvss_vector": Vulnerability.cvss_vector,
+    "description": Vulnerability.description,
+    "risk": Vulnerability.risk,
+    "recommendation": Vulnerability.recommendation,
+    "type": Vulnerability.vuln_type,
+    "tag_order": Vulnerability.tag_order,
+    "created_at": Vulnerability.created_at,
+    "updated_at": Vulnerability.updated_at,
+    "created_by": Vulnerability.created_by,
+    "updated_by": Vulnerability.updated_by,
+}
+
+# Named projections for vulnerability listings. Columns outside the projection
+# are not selected at all, so the large Text columns stay in the database.
+VULNERABILITY_VIEWS: dict[str, tuple[str, ...]] = {
+    "summary": ("id", "name", "level", "type", "cvss_score", "updated_at"),
+    "card": (
+        "id", "name", "level", "type", "cvss_score", "cvss_vector",
+        "scope", "protocol_interface", "created_at", "updated_at",
+    ),
+    "full": tuple(VULNERABILITY_COLUMNS),
+}
+
+API_TOKEN_COLUMNS: dict[str, Any] = {
+    "id": ApiToken.id,
+    "owner_user_id": ApiToken.owner_user_id,
+    "label": ApiToken.label,
+    "scopes": ApiToken.scopes,
+    "expires_at": ApiToken.expires_at,
+    "revoked_at": ApiToken.revoked_at,
+    "last_used_at": ApiToken.last_used_at,
+    "last_used_ip": ApiToken.last_used_ip,
+    "created_at": ApiToken.created_at,
+}
+
+vulnerability_list_adapter = TypeAdapter(list[VulnerabilityRow])
+vulnerability_page_adapter = TypeAdapter(VulnerabilityPage)
+vulnerability_details_adapter = TypeAdapter(VulnerabilityDetails)
+catalog_adapter = TypeAdapter(Catalog)
+api_token_list_adapter = TypeAdapter(list[ApiTokenRow])
+
+
+def labelled(columns: Mapping[str, Any], keys: Iterable[str] | None = None) -> list[Label[Any]]:
+    """Return ``columns`` (or the subset ``keys``) labelled with their response keys."""
+    names = columns if keys is None else keys
+    return [columns[name].label(name) for name in names]
+
+
+def rows_as_dicts(rows: Iterable[Mapping[str, Any]]) -> list[dict[str, Any]]:
+    return [dict(row) for row in rows]
+
+
+def json_response(adapter: TypeAdapter[Any], value: Any, headers: Mapping[str, str] | None = None) -> Response:
+    """Serialise ``value`` with ``adapter`` straight to a JSON response."""
+    return Response(content=adapter.dump_json(value), media_type="application/json", headers=headers)
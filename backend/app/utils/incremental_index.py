@@ -0,0 +1,133 @@
+"""Base class for in-process indexes over the vulnerability library.
+
+An index is built from the table on first use and then kept in step
+incrementally: each ``sync`` only reads rows whose ``updated_at`` moved past
+the last value seen, and drops IDs that no longer exist. Because it follows
+the table rather than hooking individual routes, changes made by CRUD,
+imports, bulk operations or another worker are all picked up the same way.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Mapping, Sequence
+from datetime import datetime, timedelta
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.vulnerability import Vulnerability
+from app.utils.metrics import metrics
+
+# ``updated_at`` is the transaction start time, so a long transaction can
+# commit rows older than the watermark. Re-reading a short window catches them.
+SYNC_OVERLAP = timedelta(minutes=5)
+
+# Batches larger than this are applied in a worker thread.
+THREADED_BATCH = 500
+
+
+class IncrementalIndex:
+    """
+    Keeps a derived structure in step with the ``vulnerabilities`` table.
+
+    Subclasses declare the ``columns`` they need and implement ``_upsert``
+    (called with one row mapping, keyed by column name) and ``_remove``.
+    ``version`` increases on every change, so derived results can be memoised.
+    """
+
+    name: str = "index"
+    columns: Sequence[Any] = ()
+
+    def __init__(self) -> None:
+        self._lock = asyncio.Lock()
+        self._versions: dict[UUID, datetime] = {}
+        self._watermark: datetime | None = None
+        self._synced_at: float | None = None
+        self.version = 0
+        metrics.register_gauge(f"index.{self.name}.entries", self.__len__)
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    def _upsert(self, row: Mapping[str, Any]) -> None:
+        raise NotImplementedError
+
+    def _remove(self, vuln_id: UUID) -> None:
+        raise NotImplementedError
+
+    def _clear(self) -> None:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        """Forget everything (used when switching databases, e.g. in tests)."""
+        self._clear()
+        self._versions.clear()
+        self._watermark = None
+        self._synced_at = None
+        self.version += 1
+
+    def _upsert_many(self, rows: Sequence[Mapping[str, Any]]) -> None:
+        """Apply a batch of rows; override when a batch can be applied faster than row by row."""
+        for row in rows:
+            self._upsert(row)
+
+    def _apply(self, rows: Sequence[Mapping[str, Any]]) -> None:
+        self._upsert_many(rows)
+        for row in rows:
+            self._versions[row["id"]] = row["updated_at"]
+            if self._watermark is None or row["updated_at"] > self._watermark:
+                self._watermark = row["updated_at"]
+
+    def _fresh(self, max_age: float) -> bool:
+        return self._synced_at is not None and time.monotonic() - self._synced_at < max_age
+
+    async def sync(self, db: AsyncSession, *, max_age: float = 0.0) -> None:
+        """
+        Bring the index up to date with ``db``.
+
+        With ``max_age``, a sync done less than that many seconds ago is
+        considered recent enough and no query is made.
+        """
+        if max_age and self._fresh(max_age):
+            return
+        async with self._lock:
+            if max_age and self._fresh(max_age):
+                return
+            await self._sync(db)
+            self._synced_at = time.monotonic()
+
+    async def _sync(self, db: AsyncSession) -> int:
+        """Apply the changes since the last sync; returns the number of rows added, changed or removed."""
+        query = select(Vulnerability.id, Vulnerability.updated_at, *self.columns)
+        if self._watermark is not None:
+            query = query.where(Vulnerability.updated_at >= self._watermark - SYNC_OVERLAP)
+
+        rows = [
+            row
+            for row in (await db.execute(query)).mappings()
+            if self._versions.get(row["id"]) != row["updated_at"]
+        ]
+        # Initial builds and large imports are CPU-bound; keep them off the event loop.
+        if len(rows) > THREADED_BATCH:
+            await asyncio.to_thread(self._apply, rows)
+        else:
+            self._apply(rows)
+        changed = len(rows)
+
+        # Deletions leave no trace in updated_at; a count mismatch reveals them.
+        total = (await db.execute(select(func.count()).select_from(Vulnerability))).scalar_one()
+        if total != len(self._versions):
+            existing = set((await db.execute(select(Vulnerability.id))).scalars())
+            for vuln_id in set(self._versions) - existing:
+                self._remove(vuln_id)
+                del self._versions[vuln_id]
+                changed += 1
+
+        if changed:
+            self.version += 1
+            metrics.inc(f"index.{self.name}.updates", changed)
+        return changed
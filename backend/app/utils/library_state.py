@@ -0,0 +1,44 @@
+"""Cheap fingerprint of the vulnerability library's current contents."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.vulnerability import Vulnerability
+
+
+@dataclass(frozen=True, slots=True)
+class LibraryState:
+    """Row count and latest modification time of the library."""
+
+    count: int
+    last_updated: datetime | None
+
+    @property
+    def version(self) -> str:
+        """
+        Opaque version string; changes on every create, update or delete.
+
+        Creates and updates move ``last_updated``, deletes change ``count``.
+        """
+        stamp = int(self.last_updated.timestamp() * 1_000_000) if self.last_updated else 0
+        return f"{self.count:x}-{stamp:x}"
+
+    @property
+    def etag(self) -> str:
+        return f'"lib-{self.version}"'
+
+
+async def library_state(db: AsyncSession) -> LibraryState:
+    """Read the library state with one aggregate query (served by the updated_at index)."""
+    row = (await db.execute(select(func.count(), func.max(Vulnerability.updated_at)))).one()
+    return LibraryState(count=row[0], last_updated=row[1])
+
+
+def content_version(updated_at: datetime) -> int:
+    """Per-entry content version: ``updated_at`` in milliseconds."""
+    return int(updated_at.timestamp() * 1000)
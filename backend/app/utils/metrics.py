@@ -0,0 +1,34 @@
+"""Process-local counters and gauges exposed on the admin metrics endpoint."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+
+class MetricsRegistry:
+    """
+    Minimal metrics registry.
+
+    Counters are plain integers incremented in place (safe on the event loop);
+    gauges are callables sampled when a snapshot is taken. Values are per
+    worker process.
+    """
+
+    def __init__(self) -> None:
+        self.counters: dict[str, int] = {}
+        self.gauges: dict[str, Callable[[], float]] = {}
+
+    def inc(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def register_gauge(self, name: str, sample: Callable[[], float]) -> None:
+        self.gauges[name] = sample
+
+    def snapshot(self) -> dict[str, float]:
+        values: dict[str, float] = dict(self.counters)
+        for name, sample in self.gauges.items():
+            values[name] = sample()
+        return dict(sorted(values.items()))
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,149 @@
+"""Cross-worker change notifications.
+
+Each worker keeps caches in memory; when one worker changes the underlying
+data, the others must learn about it. On PostgreSQL this uses LISTEN/NOTIFY
+over a dedicated connection (outside the SQLAlchemy pool, since a listening
+connection must stay open). Other databases, or a PostgreSQL setup without
+asyncpg, fall back to polling a cheap version query per channel.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# Called with the notification payload, or None when notifications may have
+# been missed (listener reconnect) and the subscriber should resynchronise.
+Callback = Callable[[str | None], Any]
+
+# Returns a token that changes whenever the channel's data changes.
+PollFunction = Callable[[AsyncSession], Awaitable[Any]]
+
+
+async def publish(db: AsyncSession, channel: str, payload: str = "") -> None:
+    """
+    Queue a notification on ``channel``.
+
+    On PostgreSQL the notification is delivered when the surrounding
+    transaction commits (and dropped if it rolls back). Elsewhere this is a
+    no-op: pollers pick the change up from the version data itself.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return
+    await db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+
+
+@dataclass
+class _Subscription:
+    channel: str
+    callback: Callback
+    poll: PollFunction | None
+    last_token: Any = None
+
+
+@dataclass
+class ChangeNotifier:
+    """Dispatch change notifications to in-process subscribers."""
+
+    engine: AsyncEngine
+    poll_interval: float = 5.0
+    reconnect_delay: float = 2.0
+    subscriptions: list[_Subscription] = field(default_factory=list)
+    mode: str | None = None
+    _task: asyncio.Task | None = field(default=None, repr=False)
+
+    def subscribe(self, channel: str, callback: Callback, *, poll: PollFunction | None = None) -> None:
+        """Register ``callback`` for ``channel``; ``poll`` is used when LISTEN is unavailable."""
+        self.subscriptions.append(_Subscription(channel, callback, poll))
+
+    def _dispatch(self, channel: str, payload: str | None) -> None:
+        for sub in self.subscriptions:
+            if sub.channel == channel:
+                try:
+                    sub.callback(payload)
+                except Exception:  # pragma: no cover - subscriber bug
+                    logger.exception("Notification callback for %s failed", channel)
+
+    def _resync_all(self) -> None:
+        for sub in self.subscriptions:
+            self._dispatch(sub.channel, None)
+
+    async def start(self) -> None:
+        """Start listening (PostgreSQL + asyncpg) or polling in the background."""
+        if self._task is not None:
+            return
+        if self.engine.dialect.name == "postgresql" and self.engine.dialect.driver == "asyncpg":
+            self.mode = "listen"
+            self._task = asyncio.create_task(self._listen_loop())
+        else:
+            self.mode = "poll"
+            self._task = asyncio.create_task(self._poll_loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _listen_loop(self) -> None:  # pragma: no cover - requires PostgreSQL
+        import asyncpg
+
+        url = self.engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        channels = {sub.channel for sub in self.subscriptions}
+
+        while True:
+            closed = asyncio.Event()
+            try:
+                connection = await asyncpg.connect(url)
+            except (OSError, asyncpg.PostgresError):
+                logger.warning("LISTEN connection failed; retrying in %.1fs", self.reconnect_delay)
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            try:
+                connection.add_termination_listener(lambda _conn, closed=closed: closed.set())
+                for channel in channels:
+                    await connection.add_listener(
+                        channel, lambda _conn, _pid, ch, payload: self._dispatch(ch, payload)
+                    )
+                # Anything published while we were not listening is lost.
+                self._resync_all()
+                await closed.wait()
+                logger.warning("LISTEN connection lost; reconnecting")
+            finally:
+                if not connection.is_closed():
+                    await connection.close()
+
+    async def _poll_loop(self) -> None:
+        while True:
+            await self.poll_once()
+            await asyncio.sleep(self.poll_interval)
+
+    async def poll_once(self) -> None:
+        """Run every poll function once and dispatch the channels whose token changed."""
+        polled = [sub for sub in self.subscriptions if sub.poll is not None]
+        if not polled:
+            return
+        try:
+            async with AsyncSession(self.engine) as session:
+                for sub in polled:
+                    token = await sub.poll(session)
+                    if token != sub.last_token:
+                        first = sub.last_token is None
+                        sub.last_token = token
+                        if not first:
+                            self._dispatch(sub.channel, str(token))
+        except Exception:  # pragma: no cover - depends on database failures
+            logger.exception("Change polling failed")
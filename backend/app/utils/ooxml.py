@@ -0,0 +1,177 @@
+"""WordprocessingML (OOXML) rendering of vulnerability cartouches.
+
+Each vulnerability becomes one ``w:tbl``: a title row shaded with the level
+colour, then label/value rows (level, scope, protocol, CVSS, description,
+risk, recommendation). Fragments are serialised once and wrapped in a Flat
+OPC package, which Word inserts in a single ``Range.InsertXML`` call.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from typing import Any
+
+from lxml import etree
+
+# Bump whenever the generated markup changes, so cached fragments are invalidated.
+TEMPLATE_VERSION = "1"
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+PKG_NS = "http://schemas.microsoft.com/office/2006/xmlPackage"
+NSMAP = {"w": W_NS}
+
+# Same palette as the Word add-in (office/Insert.bas).
+LEVEL_COLORS = {
+    "Critical": "DC2626",
+    "High": "EA580C",
+    "Medium": "CA8A04",
+    "Low": "2563EB",
+    "Informational": "6B7280",
+}
+DEFAULT_COLOR = "6B7280"
+
+LABEL_FILL = "F3F4F6"
+BORDER_COLOR = "D1D5DB"
+
+# Column widths in twentieths of a point (total ~ 16 cm)
+LABEL_WIDTH = 2400
+VALUE_WIDTH = 6670
+
+# Characters XML 1.0 cannot carry
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _w(tag: str) -> str:
+    return f"{{{W_NS}}}{tag}"
+
+
+def _sub(parent: etree._Element, tag: str, **attrs: str) -> etree._Element:
+    return etree.SubElement(parent, _w(tag), {_w(key): value for key, value in attrs.items()})
+
+
+def _clean(value: Any) -> str:
+    return _INVALID_XML_CHARS.sub("", "" if value is None else str(value))
+
+
+def _paragraphs(cell: etree._Element, text: str, *, bold: bool = False, color: str | None = None,
+                size: int = 20) -> None:
+    """Append one ``w:p`` per line of ``text`` to ``cell`` (size in half-points)."""
+    for line in _clean(text).splitlines() or [""]:
+        paragraph = _sub(cell, "p")
+        spacing = _sub(_sub(paragraph, "pPr"), "spacing", after="0")
+        spacing.set(_w("line"), "240")
+        run = _sub(paragraph, "r")
+        run_props = _sub(run, "rPr")
+        if bold:
+            _sub(run_props, "b")
+        if color:
+            _sub(run_props, "color", val=color)
+        _sub(run_props, "sz", val=str(size))
+        text_elem = _sub(run, "t")
+        text_elem.set("{http://www.w3.org/XML/1998/namespace}space", "preserve")
+        text_elem.text = line
+
+
+def _cell(row: etree._Element, width: int, *, fill: str | None = None, span: int = 1) -> etree._Element:
+    cell = _sub(row, "tc")
+    props = _sub(cell, "tcPr")
+    _sub(props, "tcW", w=str(width), type="dxa")
+    if span > 1:
+        _sub(props, "gridSpan", val=str(span))
+    if fill:
+        _sub(props, "shd", val="clear", color="auto", fill=fill)
+    return cell
+
+
+def _label_row(table: etree._Element, label: str, value: str, *, color: str | None = None,
+               bold: bool = False) -> None:
+    row = _sub(table, "tr")
+    _paragraphs(_cell(row, LABEL_WIDTH, fill=LABEL_FILL), label, bold=True)
+    _paragraphs(_cell(row, VALUE_WIDTH), value, color=color, bold=bold)
+
+
+def render_cartouche(card: dict[str, Any]) -> etree._Element:
+    """Build the ``w:tbl`` for one export card (``VulnerabilityExportDoc`` fields)."""
+    level = card.get("level") or ""
+    color = LEVEL_COLORS.get(level, DEFAULT_COLOR)
+
+    table = etree.Element(_w("tbl"), nsmap=NSMAP)
+    props = _sub(table, "tblPr")
+    _sub(props, "tblW", w=str(LABEL_WIDTH + VALUE_WIDTH), type="dxa")
+    borders = _sub(props, "tblBorders")
+    for side in ("top", "left", "bottom", "right", "insideH", "insideV"):
+        _sub(borders, side, val="single", sz="4", space="0", color=BORDER_COLOR)
+    _sub(props, "tblLayout", type="fixed")
+    grid = _sub(table, "tblGrid")
+    _sub(grid, "gridCol", w=str(LABEL_WIDTH))
+    _sub(grid, "gridCol", w=str(VALUE_WIDTH))
+
+    title_row = _sub(table, "tr")
+    _paragraphs(
+        _cell(title_row, LABEL_WIDTH + VALUE_WIDTH, fill=color, span=2),
+        card.get("name", ""),
+        bold=True,
+        color="FFFFFF",
+        size=28,
+    )
+
+    _label_row(table, "Criticité", level, color=color, bold=True)
+    _label_row(table, "Périmètre", card.get("scope", ""))
+    _label_row(table, "Protocole / Interface", card.get("protocol_interface", ""))
+    if card.get("cvss_score") is not None:
+        cvss = str(card["cvss_score"])
+        if card.get("cvss_vector"):
+            cvss = f"{cvss} ({card['cvss_vector']})"
+        _label_row(table, "CVSS", cvss)
+    _label_row(table, "Description", card.get("description", ""))
+    _label_row(table, "Risque", card.get("risk", ""))
+    _label_row(table, "Recommandation", card.get("recommendation", ""))
+
+    return table
+
+
+def render_cartouche_xml(card: dict[str, Any]) -> bytes:
+    """Serialised ``w:tbl`` fragment (no XML declaration) for caching and concatenation."""
+    return etree.tostring(render_cartouche(card), encoding="UTF-8")
+
+
+_EMPTY_PARAGRAPH = f'<w:p xmlns:w="{W_NS}"/>'.encode()
+
+_PACKAGE_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<?mso-application progid="Word.Document"?>'
+    f'<pkg:package xmlns:pkg="{PKG_NS}">'
+    '<pkg:part pkg:name="/_rels/.rels" pkg:contentType="application/vnd.openxmlformats-package.relationships+xml">'
+    "<pkg:xmlData>"
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    "</Relationships>"
+    "</pkg:xmlData>"
+    "</pkg:part>"
+    '<pkg:part pkg:name="/word/document.xml" '
+    'pkg:contentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml">'
+    "<pkg:xmlData>"
+    f'<w:document xmlns:w="{W_NS}"><w:body>'
+).encode()
+
+_PACKAGE_TAIL = b"</w:body></w:document></pkg:xmlData></pkg:part></pkg:package>"
+
+
+def render_package(fragments: Iterable[bytes]) -> bytes:
+    """
+    Wrap ``w:tbl`` fragments in a Flat OPC package for ``Range.InsertXML``.
+
+    Tables are separated by empty paragraphs (Word merges adjacent tables
+    otherwise) and the body ends with a paragraph, as Word requires.
+    """
+    parts = [_PACKAGE_HEAD]
+    for fragment in fragments:
+        parts.append(fragment)
+        parts.append(_EMPTY_PARAGRAPH)
+    if len(parts) == 1:
+        parts.append(_EMPTY_PARAGRAPH)
+    parts.append(_PACKAGE_TAIL)
+    return b"".join(parts)
@@ -0,0 +1,115 @@
+"""Per-route query budgets: statement time and row limits.
+
+Every route runs under a budget: the default of its admission class
+(see ``app.utils.bulkheads``), or one declared with ``@query_budget``. The
+time limit becomes ``SET LOCAL statement_timeout`` at the start of each
+transaction of the request's session, so a pathological search or a huge
+export is stopped by PostgreSQL instead of holding a connection for minutes;
+``app.main`` turns the resulting cancellation into a ``504``. Row limits are
+checked by the routes that return or change many rows (``limit_rows`` and
+``enforce_row_budget``) and produce a ``413``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from fastapi import HTTPException, status
+from fastapi.requests import HTTPConnection
+from sqlalchemy import Select, event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.metrics import metrics
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# PostgreSQL SQLSTATE of a statement cancelled by statement_timeout
+QUERY_CANCELED = "57014"
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    statement_timeout: float  # seconds per statement
+    max_rows: int | None = None
+
+
+CLASS_BUDGETS = {
+    "interactive": QueryBudget(statement_timeout=5.0),
+    "sync": QueryBudget(statement_timeout=30.0),
+    "import_export": QueryBudget(statement_timeout=120.0),
+    "admin": QueryBudget(statement_timeout=30.0),
+}
+
+# Endpoint function -> budget, for routes that declare their own
+_endpoint_budgets: dict[Callable[..., Any], QueryBudget] = {}
+
+
+def query_budget(*, statement_timeout: float, max_rows: int | None = None) -> Callable[[F], F]:
+    """Declare a route's budget instead of its class default. Apply below the route decorator."""
+    budget = QueryBudget(statement_timeout=statement_timeout, max_rows=max_rows)
+
+    def decorator(endpoint: F) -> F:
+        _endpoint_budgets[endpoint] = budget
+        return endpoint
+
+    return decorator
+
+
+def budget_for(endpoint: Callable[..., Any] | None, class_name: str | None) -> QueryBudget | None:
+    if endpoint in _endpoint_budgets:
+        return _endpoint_budgets[endpoint]
+    return CLASS_BUDGETS.get(class_name) if class_name is not None else None
+
+
+def apply_budget(connection: HTTPConnection, db: AsyncSession, budget: QueryBudget) -> None:
+    """Remember ``budget`` for the request and enforce its time limit on every transaction of ``db``."""
+    connection.state.query_budget = budget
+    if db.bind.dialect.name != "postgresql":
+        return
+    timeout_ms = int(budget.statement_timeout * 1000)
+
+    @event.listens_for(db.sync_session, "after_begin")
+    def set_statement_timeout(_session, _transaction, sync_connection) -> None:
+        sync_connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+
+
+def _row_limit(connection: HTTPConnection) -> int | None:
+    budget: QueryBudget | None = getattr(connection.state, "query_budget", None)
+    return budget.max_rows if budget is not None else None
+
+
+def limit_rows(connection: HTTPConnection, query: Select) -> Select:
+    """Fetch at most one row more than the budget allows (enough to detect an overrun)."""
+    max_rows = _row_limit(connection)
+    return query if max_rows is None else query.limit(max_rows + 1)
+
+
+def enforce_row_budget(connection: HTTPConnection, count: int) -> None:
+    """Refuse a result of ``count`` rows that exceeds the route's budget with ``413``."""
+    max_rows = _row_limit(connection)
+    if max_rows is None or count <= max_rows:
+        return
+    metrics.inc("query_budget.rows_exceeded")
+    raise HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail={
+            "error": "query_budget_exceeded",
+            "budget": "rows",
+            "limit": max_rows,
+            "message": f"The selection exceeds {max_rows} rows; narrow it with filters",
+        },
+    )
+
+
+def timeout_detail(connection: HTTPConnection) -> dict[str, Any]:
+    """Body of the ``504`` sent when a statement ran out of time."""
+    metrics.inc("query_budget.timeouts")
+    budget: QueryBudget | None = getattr(connection.state, "query_budget", None)
+    return {
+        "error": "query_budget_exceeded",
+        "budget": "statement_timeout",
+        "limit_ms": int(budget.statement_timeout * 1000) if budget is not None else None,
+        "message": "The query took too long; narrow the search or retry later",
+    }
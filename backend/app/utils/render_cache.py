@@ -0,0 +1,83 @@
+"""Bounded in-memory cache of rendered export fragments.
+
+Exports (Word cards in JSON/XML/OOXML, the XML library export, .docx annexes)
+are assembled by concatenating per-vulnerability fragments taken from here,
+so a popular finding is serialised once per version rather than once per
+export.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+from app.config import settings
+from app.utils.metrics import metrics
+
+# Rough per-entry bookkeeping cost (key tuple, OrderedDict node, bytes header).
+ENTRY_OVERHEAD = 256
+
+
+class RenderCache:
+    """
+    LRU cache of rendered bytes bounded by a memory budget.
+
+    Keys must include everything the output depends on, typically
+    ``(vulnerability id, updated_at, format, template version)``, so entries
+    never need explicit invalidation: an edit changes ``updated_at`` and the
+    old entry simply ages out. Least recently used entries are evicted once
+    the cached fragments exceed ``max_bytes``. Safe to use from worker threads
+    (streaming responses render in the threadpool).
+    """
+
+    def __init__(self, name: str, max_bytes: int) -> None:
+        self.name = name
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        metrics.register_gauge(f"render_cache.{name}.entries", self.__len__)
+        metrics.register_gauge(f"render_cache.{name}.bytes", self.size)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def size(self) -> int:
+        """Approximate memory held by the cached fragments, in bytes."""
+        return self._size
+
+    def get_or_render(self, key: Hashable, render: Callable[[], bytes]) -> bytes:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                metrics.inc(f"render_cache.{self.name}.hits")
+                return value
+            metrics.inc(f"render_cache.{self.name}.misses")
+
+        # Render outside the lock; a concurrent miss just renders twice.
+        value = render()
+        cost = len(value) + ENTRY_OVERHEAD
+        if cost > self.max_bytes:
+            return value
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous) + ENTRY_OVERHEAD
+            self._entries[key] = value
+            self._size += cost
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted) + ENTRY_OVERHEAD
+                metrics.inc(f"render_cache.{self.name}.evictions")
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+export_cache = RenderCache("exports", max_bytes=settings.render_cache_max_bytes)
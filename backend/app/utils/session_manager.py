@@ -1,11 +1,29 @@
-"""Utilities for managing signed user sessions."""
+"""Utilities for managing signed user sessions.
+
+Sessions are always recorded in the ``sessions`` table, which stays the
+source of truth for revocation. How a request's cookie is checked depends on
+``settings.session_mode``:
+
+* ``database``: the cookie is an opaque token looked up in ``sessions`` (and
+  its user loaded) on every request.
+* ``stateless``: the cookie carries signed claims (session id, user id, role,
+  expiry) and is checked in memory against the revocation snapshot of
+  ``app.utils.session_revocations``, without a query.
+
+Claims cookies are also recorded by hash, so they keep working if the mode is
+switched back to ``database``; opaque cookies issued before a switch to
+``stateless`` are still checked against the table until they expire.
+"""
 
 from __future__ import annotations
 
 import base64
+import binascii
 import hmac
+import json
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException, status
 from sqlalchemy import select
@@ -13,18 +31,59 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.models.session import Session
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.security import generate_session_id, hash_token
+from app.utils.session_revocations import session_revocations
+
+# Prefix of tokens carrying claims (opaque tokens never contain a dot)
+CLAIMS_PREFIX = "v1."
 
 
 @dataclass(slots=True)
 class SessionContext:
-    """Result of validating a session cookie."""
+    """Result of validating a session cookie (``session`` is None for stateless sessions)."""
 
-    session: Session
+    session: Session | None
     user: User
 
 
+@dataclass(frozen=True, slots=True)
+class SessionClaims:
+    """What a stateless session cookie asserts about itself."""
+
+    session_id: UUID
+    user_id: UUID
+    role: UserRole
+    expires_at: datetime
+
+    def encode(self) -> str:
+        payload = {
+            "sid": str(self.session_id),
+            "uid": str(self.user_id),
+            "role": self.role.value,
+            "exp": int(self.expires_at.timestamp()),
+        }
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return CLAIMS_PREFIX + base64.urlsafe_b64encode(raw).decode("utf-8").rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> SessionClaims | None:
+        """Claims of a (signature-checked) token, or None for an opaque token."""
+        if not token.startswith(CLAIMS_PREFIX):
+            return None
+        encoded = token[len(CLAIMS_PREFIX):]
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+            return cls(
+                session_id=UUID(payload["sid"]),
+                user_id=UUID(payload["uid"]),
+                role=UserRole(payload["role"]),
+                expires_at=datetime.fromtimestamp(payload["exp"], timezone.utc),
+            )
+        except (binascii.Error, ValueError, KeyError, TypeError) as exc:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid session") from exc
+
+
 def _sign(token: str) -> str:
     signature = hmac.new(
         settings.secret_key.encode("utf-8"), token.encode("utf-8"), digestmod="sha256"
@@ -58,13 +117,18 @@ async def create_session(
 ) -> tuple[str, Session]:
     """Create a persistent session for the given user and return the signed token and model."""
 
-    token = generate_session_id()
-    token_hash = hash_token(token)
-    lifetime = timedelta(hours=settings.session_lifetime_hours)
+    session_id = uuid4()
+    # Whole seconds, as in the claims
+    expires_at = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(hours=settings.session_lifetime_hours)
+    if settings.session_mode == "stateless":
+        token = SessionClaims(session_id, user.id, user.role, expires_at).encode()
+    else:
+        token = generate_session_id()
     session = Session(
+        id=session_id,
         user_id=user.id,
-        token_hash=token_hash,
-        expires_at=datetime.now(timezone.utc) + lifetime,
+        token_hash=hash_token(token),
+        expires_at=expires_at,
         ip_address=ip_address,
         user_agent=user_agent,
     )
@@ -92,6 +156,7 @@ async def invalidate_session(db: AsyncSession, signed_token: str | None) -> Sess
     if session:
         session.is_active = False
         await db.flush()
+        await session_revocations.revoke(db, session)
     return session
 
 
@@ -102,6 +167,10 @@ async def validate_session(
     """Validate a signed session token and return the associated session and user."""
 
     token = _verify_signature(signed_token)
+    if settings.session_mode == "stateless":
+        claims = SessionClaims.decode(token)
+        if claims is not None:
+            return await _validate_claims(db, claims)
     token_hash = hash_token(token)
 
     result = await db.execute(
@@ -131,6 +200,30 @@ async def validate_session(
     return SessionContext(session=session, user=user)
 
 
+async def _validate_claims(db: AsyncSession, claims: SessionClaims) -> SessionContext:
+    """Check a stateless session in memory (the snapshot reloads every few seconds)."""
+
+    if claims.expires_at < datetime.now(timezone.utc):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Session expired")
+
+    snapshot = await session_revocations.get(db)
+    if session_revocations.is_revoked(snapshot, claims.session_id):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid session")
+
+    state = snapshot.users.get(claims.user_id)
+    if state is None:
+        # Created after the snapshot was loaded (or deleted): look again once.
+        session_revocations.invalidate()
+        state = (await session_revocations.get(db)).users.get(claims.user_id)
+    if state is None or not state.is_active:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User inactive")
+    # A role change ends the sessions that claim the old role.
+    if state.role != claims.role:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid session")
+
+    return SessionContext(session=None, user=state.as_user())
+
+
 def sign_session_token(raw_token: str) -> str:
     """Expose signing for testing purposes."""
 
@@ -0,0 +1,143 @@
+"""In-memory revocation state for stateless sessions.
+
+In stateless mode a session cookie carries its own claims and is checked
+without touching the ``sessions`` table. What the cookie cannot know is
+whether the session was ended (logout) or its user deactivated, deleted or
+given another role since. Each worker keeps that in a small snapshot: the
+revoked sessions that have not expired yet, and the role and status of every
+user. The snapshot is reloaded after ``REFRESH_SECONDS`` at most, or sooner
+when another worker publishes a revocation, so a revoked cookie stops working
+within seconds everywhere and immediately on the worker that revoked it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.session import Session
+from app.models.user import User, UserRole
+from app.utils.metrics import metrics
+from app.utils.notifier import ChangeNotifier, publish
+
+CHANNEL = "session_revocations"
+
+# Longest a revocation made on another worker can go unnoticed
+REFRESH_SECONDS = 5.0
+
+
+@dataclass(frozen=True, slots=True)
+class UserState:
+    """The columns of a user needed to serve requests without loading the row."""
+
+    id: UUID
+    username: str
+    email: str | None
+    full_name: str
+    role: UserRole
+    is_active: bool
+
+    def as_user(self) -> User:
+        """A transient ``User`` for the request (never added to a database session)."""
+        return User(
+            id=self.id,
+            username=self.username,
+            email=self.email,
+            full_name=self.full_name,
+            role=self.role,
+            is_active=self.is_active,
+        )
+
+
+@dataclass(frozen=True)
+class RevocationSnapshot:
+    loaded_at: float
+    revoked: frozenset[UUID]
+    users: dict[UUID, UserState] = field(default_factory=dict)
+
+
+class RevocationList:
+    """Process-wide holder of the current revocation snapshot."""
+
+    def __init__(self) -> None:
+        self._snapshot: RevocationSnapshot | None = None
+        self._stale = True
+        self._lock = asyncio.Lock()
+        # Revoked by this worker; kept until expiry so a reload racing the commit cannot drop them
+        self._local: dict[UUID, datetime] = {}
+
+    def invalidate(self, _payload: str | None = None) -> None:
+        """Mark the snapshot stale; the next check reloads it."""
+        self._stale = True
+
+    def reset(self) -> None:
+        self._snapshot = None
+        self._stale = True
+        self._local.clear()
+
+    async def revoke(self, db: AsyncSession, session: Session) -> None:
+        """Deny ``session`` here at once and tell the other workers when ``db`` commits."""
+        self._local[session.id] = session.expires_at
+        await publish(db, CHANNEL)
+
+    async def users_changed(self, db: AsyncSession) -> None:
+        """A user's role or status changed, or a user was deleted."""
+        self.invalidate()
+        await publish(db, CHANNEL)
+
+    def is_revoked(self, snapshot: RevocationSnapshot, session_id: UUID) -> bool:
+        return session_id in snapshot.revoked or session_id in self._local
+
+    async def get(self, db: AsyncSession) -> RevocationSnapshot:
+        """Return the current snapshot, reloading it from ``db`` if stale or too old."""
+        snapshot = self._snapshot
+        if snapshot is not None and not self._stale and time.monotonic() - snapshot.loaded_at < REFRESH_SECONDS:
+            return snapshot
+
+        async with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and not self._stale and time.monotonic() - snapshot.loaded_at < REFRESH_SECONDS:
+                return snapshot
+            # Clear first: an invalidation arriving during the load marks it stale again.
+            self._stale = False
+            try:
+                self._snapshot = await self._load(db)
+            except Exception:
+                self._stale = True
+                raise
+            metrics.inc("sessions.revocations.reloads")
+            return self._snapshot
+
+    async def _load(self, db: AsyncSession) -> RevocationSnapshot:
+        loaded_at = time.monotonic()
+        now = datetime.now(timezone.utc)
+        # Expired sessions need no entry: their cookies carry the expiry.
+        revoked = await db.execute(
+            select(Session.id).where(Session.is_active.is_(False), Session.expires_at > now)
+        )
+        users = await db.execute(
+            select(User.id, User.username, User.email, User.full_name, User.role, User.is_active)
+        )
+        self._local = {
+            session_id: expires_at
+            for session_id, expires_at in self._local.items()
+            if (expires_at if expires_at.tzinfo else expires_at.replace(tzinfo=timezone.utc)) > now
+        }
+        return RevocationSnapshot(
+            loaded_at=loaded_at,
+            revoked=frozenset(revoked.scalars()),
+            users={row.id: UserState(*row) for row in users},
+        )
+
+    def watch(self, notifier: ChangeNotifier) -> None:
+        """Reload as soon as another worker revokes a session (PostgreSQL only; else on age)."""
+        notifier.subscribe(CHANNEL, self.invalidate)
+
+
+session_revocations = RevocationList()
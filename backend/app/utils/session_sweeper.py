@@ -0,0 +1,92 @@
+"""Periodic removal of dead sessions.
+
+Logout and expiry only mark a session inactive, so without a sweeper the
+``sessions`` table grows with every login. The sweeper deletes expired
+sessions, and inactive ones, in small batches (each its own transaction) so
+it never holds locks on many rows or runs one long statement.
+
+In stateless mode a logged-out session is kept until it expires: the
+revocation list of ``app.utils.session_revocations`` is built from those rows,
+and deleting one early would make its cookie valid again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import ColumnElement, delete, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.models.session import Session
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SWEEP_INTERVAL_SECONDS = 900.0
+
+# Rows deleted per transaction, and the pause between batches
+SWEEP_BATCH = 1000
+BATCH_PAUSE_SECONDS = 0.1
+
+
+def _dead_sessions() -> ColumnElement[bool]:
+    expired = Session.expires_at < datetime.now(timezone.utc)
+    if settings.session_mode == "stateless":
+        return expired
+    return or_(expired, Session.is_active.is_(False))
+
+
+class SessionSweeper:
+    """Background task deleting dead sessions every ``SWEEP_INTERVAL_SECONDS``."""
+
+    def __init__(self) -> None:
+        self._session_factory: async_sessionmaker[AsyncSession] | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        if self._task is not None:
+            return
+        self._session_factory = session_factory
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with self._session_factory() as db:
+                    swept = await self.sweep(db)
+                if swept:
+                    logger.info("Swept %d dead sessions", swept)
+            except Exception:  # pragma: no cover - depends on database failures
+                logger.exception("Session sweep failed")
+            await asyncio.sleep(SWEEP_INTERVAL_SECONDS)
+
+    async def sweep(self, db: AsyncSession, *, batch_size: int = SWEEP_BATCH) -> int:
+        """Delete dead sessions batch by batch; returns how many were deleted."""
+        swept = 0
+        while True:
+            batch = select(Session.id).where(_dead_sessions()).limit(batch_size)
+            result = await db.execute(
+                delete(Session).where(Session.id.in_(batch)).execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            swept += result.rowcount
+            metrics.inc("sessions.swept", result.rowcount)
+            if result.rowcount < batch_size:
+                return swept
+            await asyncio.sleep(BATCH_PAUSE_SECONDS)
+
+
+session_sweeper = SessionSweeper()
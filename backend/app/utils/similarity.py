@@ -0,0 +1,267 @@
+"""TF-IDF index for "similar vulnerabilities" lookups.
+
+Documents are hashed bags of words (``DIM`` buckets) over the name (counted
+twice), description and recommendation, with ``1 + log(tf)`` term weights.
+Queries are scored by cosine similarity against a term-sorted posting matrix
+built with NumPy: only the postings of the query terms are touched, so a
+lookup over the whole library takes a few milliseconds.
+
+The posting matrix is a snapshot. Entries changed after it was built are
+masked out of it and scored directly from their term vectors; the snapshot is
+rebuilt (in a worker thread) once too many entries have changed. The term
+vectors, with the sync watermark, can be saved to an ``.npz`` file so a
+restart only needs to catch up on recent changes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import tempfile
+import zlib
+from collections import Counter
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.vulnerability import Vulnerability
+from app.utils.duplicates import normalise
+from app.utils.incremental_index import IncrementalIndex
+
+logger = logging.getLogger("vulnmanager.similarity")
+
+DIM = 1 << 20
+FILE_FORMAT = 1
+
+# Rebuild the posting matrix once this many entries (or this share) changed.
+REBUILD_MIN_CHANGES = 256
+REBUILD_RATIO = 0.05
+
+
+def term_vector(*texts: str | None) -> tuple[np.ndarray, np.ndarray]:
+    """Sorted hashed term ids and their ``1 + log(tf)`` weights."""
+    counts = Counter(
+        zlib.crc32(token.encode()) % DIM
+        for text in texts
+        for token in normalise(text or "")
+        if len(token) > 1
+    )
+    terms = np.fromiter(sorted(counts), dtype=np.int64, count=len(counts))
+    tf = 1.0 + np.log(np.fromiter((counts[term] for term in terms), dtype=np.float32, count=len(counts)))
+    return terms, tf.astype(np.float32)
+
+
+def _document(row: Mapping[str, Any]) -> tuple[np.ndarray, np.ndarray]:
+    return term_vector(row["name"], row["name"], row["description"], row["recommendation"])
+
+
+@dataclass
+class SimilarMatch:
+    id: UUID
+    score: float
+
+
+class _PostingMatrix:
+    """Immutable, L2-normalised TF-IDF matrix stored as term-sorted postings."""
+
+    def __init__(self, docs: Mapping[UUID, tuple[np.ndarray, np.ndarray]]) -> None:
+        self.ids = list(docs)
+        self.rows = {vuln_id: row for row, vuln_id in enumerate(self.ids)}
+
+        terms = [docs[vuln_id][0] for vuln_id in self.ids]
+        lengths = np.fromiter((len(t) for t in terms), dtype=np.int64, count=len(terms))
+        all_terms = np.concatenate(terms) if terms else np.zeros(0, dtype=np.int64)
+        all_tf = (
+            np.concatenate([docs[vuln_id][1] for vuln_id in self.ids]) if terms else np.zeros(0, dtype=np.float32)
+        )
+        doc_index = np.repeat(np.arange(len(self.ids), dtype=np.int32), lengths)
+
+        df = np.bincount(all_terms, minlength=DIM)
+        self.idf = (np.log((1.0 + len(self.ids)) / (1.0 + df)) + 1.0).astype(np.float32)
+
+        weights = all_tf * self.idf[all_terms]
+        norms = np.sqrt(np.bincount(doc_index, weights=weights * weights, minlength=len(self.ids)))
+        weights = weights / np.where(norms > 0, norms, 1.0)[doc_index]
+
+        order = np.argsort(all_terms, kind="stable")
+        self.terms = all_terms[order]
+        self.docs = doc_index[order]
+        self.weights = weights[order].astype(np.float32)
+
+    def weigh(self, terms: np.ndarray, tf: np.ndarray) -> np.ndarray:
+        """L2-normalised TF-IDF weights for a term vector."""
+        weights = tf * self.idf[terms]
+        norm = float(np.sqrt(np.dot(weights, weights)))
+        return weights / norm if norm else weights
+
+    def scores(self, terms: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        starts = np.searchsorted(self.terms, terms, side="left")
+        ends = np.searchsorted(self.terms, terms, side="right")
+        for start, end, weight in zip(starts, ends, weights, strict=True):
+            if start < end:
+                scores[self.docs[start:end]] += self.weights[start:end] * weight
+        return scores
+
+
+class SimilarityIndex(IncrementalIndex):
+    """Cosine top-k over TF-IDF vectors of the library."""
+
+    name = "similarity"
+    columns = (Vulnerability.name, Vulnerability.description, Vulnerability.recommendation)
+
+    def __init__(self) -> None:
+        self._docs: dict[UUID, tuple[np.ndarray, np.ndarray]] = {}
+        self.names: dict[UUID, str] = {}
+        self._matrix: _PostingMatrix | None = None
+        self._changed: set[UUID] = set()
+        self.path: Path | None = None
+        super().__init__()
+
+    def _clear(self) -> None:
+        self._docs.clear()
+        self.names.clear()
+        self._matrix = None
+        self._changed.clear()
+
+    def _upsert(self, row: Mapping[str, Any]) -> None:
+        self._docs[row["id"]] = _document(row)
+        self.names[row["id"]] = row["name"]
+        self._changed.add(row["id"])
+
+    def _remove(self, vuln_id: UUID) -> None:
+        self._docs.pop(vuln_id, None)
+        self.names.pop(vuln_id, None)
+        self._changed.add(vuln_id)
+
+    def _rebuild(self) -> None:
+        self._matrix = _PostingMatrix(self._docs)
+        self._changed.clear()
+
+    def _needs_rebuild(self) -> bool:
+        if self._matrix is None:
+            return True
+        return len(self._changed) > max(REBUILD_MIN_CHANGES, REBUILD_RATIO * len(self._docs))
+
+    async def _sync(self, db: AsyncSession) -> int:
+        changed = await super()._sync(db)
+        if self._needs_rebuild():
+            await asyncio.to_thread(self._rebuild)
+            if self.path is not None and changed:
+                await asyncio.to_thread(self.save, self.path)
+        return changed
+
+    def vector(self, vuln_id: UUID) -> tuple[np.ndarray, np.ndarray] | None:
+        return self._docs.get(vuln_id)
+
+    def query(
+        self,
+        terms: np.ndarray,
+        tf: np.ndarray,
+        *,
+        limit: int = 10,
+        exclude: UUID | None = None,
+    ) -> list[SimilarMatch]:
+        """Top ``limit`` entries by cosine similarity to a term vector (score > 0)."""
+        matrix = self._matrix
+        if matrix is None or not len(terms):
+            return []
+
+        weights = matrix.weigh(terms, tf)
+        scores = matrix.scores(terms, weights)
+        candidates: dict[UUID, float] = {}
+
+        # Entries changed since the matrix was built are scored directly.
+        for vuln_id in self._changed:
+            row = matrix.rows.get(vuln_id)
+            if row is not None:
+                scores[row] = 0.0
+            doc = self._docs.get(vuln_id)
+            if doc is None:
+                continue
+            doc_weights = matrix.weigh(*doc)
+            _, query_pos, doc_pos = np.intersect1d(terms, doc[0], assume_unique=True, return_indices=True)
+            score = float(np.dot(weights[query_pos], doc_weights[doc_pos]))
+            if score > 0:
+                candidates[vuln_id] = score
+
+        if exclude is not None and exclude in matrix.rows:
+            scores[matrix.rows[exclude]] = 0.0
+        candidates.pop(exclude, None)
+
+        if len(scores):
+            top = min(limit, len(scores))
+            best = np.argpartition(-scores, top - 1)[:top]
+            for row in best:
+                if scores[row] > 0:
+                    candidates[matrix.ids[row]] = float(scores[row])
+
+        ranked = sorted(candidates.items(), key=lambda item: -item[1])[:limit]
+        return [SimilarMatch(id=vuln_id, score=round(score, 4)) for vuln_id, score in ranked]
+
+    def save(self, path: Path) -> None:
+        """Write term vectors, names and sync state to ``path`` (an ``.npz`` file)."""
+        ids = list(self._docs)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Per-process temporary name: several workers may save at the same time.
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=".tmp.npz")
+        tmp = Path(tmp_name)
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                self._write(tmp_file, ids)
+            tmp.replace(path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+    def _write(self, file: Any, ids: list[UUID]) -> None:
+        np.savez(
+            file,
+            format=np.array([FILE_FORMAT, DIM]),
+            ids=np.array([str(vuln_id) for vuln_id in ids]),
+            names=np.array([self.names[vuln_id] for vuln_id in ids]),
+            versions=np.array([self._versions[vuln_id].isoformat() for vuln_id in ids]),
+            lengths=np.array([len(self._docs[vuln_id][0]) for vuln_id in ids], dtype=np.int64),
+            terms=np.concatenate([self._docs[vuln_id][0] for vuln_id in ids]) if ids else np.zeros(0, np.int64),
+            tf=np.concatenate([self._docs[vuln_id][1] for vuln_id in ids]) if ids else np.zeros(0, np.float32),
+        )
+
+    def load(self, path: Path) -> None:
+        """
+        Restore the state saved by ``save``; the next sync only reads rows changed since.
+
+        A missing, unreadable or incompatible file is ignored (full rebuild).
+        """
+        self.path = path
+        if not path.exists():
+            return
+        try:
+            with np.load(path) as data:
+                if tuple(data["format"]) != (FILE_FORMAT, DIM):
+                    return
+                offsets = np.concatenate([[0], np.cumsum(data["lengths"])])
+                terms, tf = data["terms"], data["tf"]
+                self.reset()
+                for index, (vuln_id, name, version) in enumerate(zip(data["ids"], data["names"], data["versions"], strict=True)):
+                    vuln_id = UUID(str(vuln_id))
+                    start, end = offsets[index], offsets[index + 1]
+                    self._docs[vuln_id] = (terms[start:end], tf[start:end])
+                    self.names[vuln_id] = str(name)
+                    self._versions[vuln_id] = datetime.fromisoformat(str(version))
+        except Exception:
+            logger.exception("Could not load similarity index from %s; rebuilding", path)
+            self.reset()
+            return
+        if self._versions:
+            self._watermark = max(self._versions.values())
+        self._rebuild()
+
+
+similarity_index = SimilarityIndex()
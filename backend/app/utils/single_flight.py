@@ -0,0 +1,73 @@
+"""Coalescing of identical concurrent computations.
+
+When many clients ask for the same heavy result at the same moment (the
+morning wave of Word caches syncing, a team exporting the library), only the
+first request runs the query and serialisation; the others wait for it and
+share the resulting bytes. Keys must capture everything the result depends
+on, including the library version, so a request arriving after a write never
+joins a computation that started before it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+from app.utils.metrics import metrics
+
+T = TypeVar("T")
+
+
+class _LeaderCancelled(Exception):
+    """The request running the computation went away; a waiter takes over."""
+
+
+class SingleFlight(Generic[T]):
+    """
+    Share one in-flight ``compute()`` between concurrent callers with the same key.
+
+    Nothing is kept once the computation finishes: this removes duplicate
+    work, it is not a cache. Errors are shared with the waiters; if the
+    leading request is cancelled (client disconnected), one waiter runs the
+    computation again instead.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Future[T]] = {}
+        metrics.register_gauge(f"single_flight.{name}.in_flight", self.__len__)
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            call = self._calls.get(key)
+            if call is None:
+                break
+            metrics.inc(f"single_flight.{self.name}.shared")
+            try:
+                # Shielded: a waiter disconnecting must not cancel the shared call.
+                return await asyncio.shield(call)
+            except _LeaderCancelled:
+                continue
+
+        call = asyncio.get_running_loop().create_future()
+        self._calls[key] = call
+        metrics.inc(f"single_flight.{self.name}.leaders")
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            call.set_exception(_LeaderCancelled())
+            call.exception()  # retrieved, even if nobody was waiting
+            raise
+        except Exception as exc:
+            call.set_exception(exc)
+            call.exception()
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
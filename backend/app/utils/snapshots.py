@@ -0,0 +1,287 @@
+"""Full-library snapshots pre-rendered to disk.
+
+Full syncs (``GET /api/vulns/bulk`` with no filter) and full XML exports
+return the whole library. Instead of querying and serialising it per request,
+a background materializer renders each payload once per library version,
+stores it next to gzip and brotli encodings and publishes it with atomic
+renames. Requests only compare the library version with the published
+manifest and hand the matching file to ``FileResponse``, so their cost does
+not grow with the library.
+
+Snapshots are shared by the workers through the directory: whichever worker
+takes the lock renders, the others pick up the new manifest on their next
+request. Writes are debounced, so a burst of edits leads to one rendering.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import brotli
+from fastapi import Request, Response, status
+from fastapi.responses import FileResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.vulnerability import Vulnerability
+from app.utils.change_feed import CHANNEL, current_sequence
+from app.utils.fast_read import VULNERABILITY_COLUMNS, labelled, rows_as_dicts, vulnerability_list_adapter
+from app.utils.library_state import library_state
+from app.utils.metrics import metrics
+from app.utils.notifier import ChangeNotifier
+from app.utils.xml_parser import export_vulnerabilities_xml
+
+logger = logging.getLogger(__name__)
+
+# Quiet period after a change before rendering, and the longest a change waits
+DEBOUNCE_SECONDS = 2.0
+MAX_DELAY_SECONDS = 30.0
+
+# Export counts do not change the library version; re-render this often anyway
+REFRESH_SECONDS = 600.0
+
+# Older renderings kept so responses already started by other workers can finish
+KEEP_GENERATIONS = 2
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One published rendering, as described by its manifest."""
+
+    name: str
+    version: str
+    digest: str
+    count: int
+    media_type: str
+    filename: str
+
+    def etag(self, encoding: str | None) -> str:
+        return f'"{self.name}-{self.digest}-{encoding}"' if encoding else f'"{self.name}-{self.digest}"'
+
+
+async def _render_bulk(db: AsyncSession) -> tuple[bytes, int]:
+    """Body of ``GET /api/vulns/bulk`` with no filter and the full projection."""
+    result = await db.execute(select(*labelled(VULNERABILITY_COLUMNS)).order_by(Vulnerability.name.asc()))
+    rows = rows_as_dicts(result.mappings())
+    return await asyncio.to_thread(vulnerability_list_adapter.dump_json, rows), len(rows)
+
+
+async def _render_export(db: AsyncSession) -> tuple[bytes, int]:
+    """Body of ``POST /api/vulns/export/xml`` for the whole library."""
+    result = await db.execute(select(Vulnerability).order_by(Vulnerability.name.asc()))
+    vulnerabilities = result.scalars().all()
+    return await asyncio.to_thread(export_vulnerabilities_xml, vulnerabilities), len(vulnerabilities)
+
+
+@dataclass(frozen=True)
+class _Artifact:
+    name: str
+    suffix: str
+    media_type: str
+    render: Callable[[AsyncSession], Awaitable[tuple[bytes, int]]]
+
+
+ARTIFACTS = {
+    "bulk": _Artifact("bulk", ".json", "application/json", _render_bulk),
+    "export": _Artifact("export", ".xml", "application/xml", _render_export),
+}
+
+
+def _accepted_encoding(accept_encoding: str) -> str | None:
+    """Best of ``ENCODINGS`` allowed by an ``Accept-Encoding`` header (``q=0`` refuses one)."""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, *params = (item.strip() for item in part.split(";"))
+        if not name:
+            continue
+        weight = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.lower()] = weight
+    candidates = [(weights.get(name, weights.get("*", 0.0)), name) for name in ENCODINGS]
+    weight, name = max(candidates, key=lambda candidate: candidate[0])  # first wins a tie
+    return name if weight > 0 else None
+
+
+class SnapshotMaterializer:
+    """Keeps the ``ARTIFACTS`` rendered for the current library version in a directory."""
+
+    def __init__(self) -> None:
+        self.directory: Path | None = None
+        self._session_factory: async_sessionmaker[AsyncSession] | None = None
+        self._manifests: dict[str, tuple[tuple[int, int], Snapshot]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def configure(
+        self, directory: Path | None, session_factory: async_sessionmaker[AsyncSession] | None = None
+    ) -> None:
+        """Enable snapshots in ``directory`` (``None`` disables them)."""
+        self.directory = directory
+        self._session_factory = session_factory
+        self._manifests.clear()
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def watch(self, notifier: ChangeNotifier) -> None:
+        """Re-render after committed library changes."""
+        notifier.subscribe(CHANNEL, self.notify, poll=current_sequence)
+
+    def notify(self, _payload: str | None = None) -> None:
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._task is None and self.directory is not None and self._session_factory is not None:
+            self._wakeup.set()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), REFRESH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            # Debounce: wait for a quiet period, but not forever under constant writes.
+            deadline = time.monotonic() + MAX_DELAY_SECONDS
+            while self._wakeup.is_set() and time.monotonic() < deadline:
+                self._wakeup.clear()
+                await asyncio.sleep(DEBOUNCE_SECONDS)
+            self._wakeup.clear()
+            try:
+                async with self._session_factory() as db:
+                    await self.refresh(db)
+            except Exception:  # pragma: no cover - depends on database and disk failures
+                logger.exception("Snapshot rendering failed")
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """Render and publish every artifact, unless another worker is already doing it."""
+        if self.directory is None:
+            return
+        with open(self.directory / ".lock", "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+            # Read the version first: the rows read next are at least that recent.
+            state = await library_state(db)
+            for artifact in ARTIFACTS.values():
+                started = time.perf_counter()
+                body, count = await artifact.render(db)
+                await asyncio.to_thread(self._publish, artifact, state.version, body, count)
+                metrics.inc(f"snapshots.{artifact.name}.renders")
+                logger.info(
+                    "Snapshot %s rendered: %d items, %d bytes in %.2fs",
+                    artifact.name, count, len(body), time.perf_counter() - started,
+                )
+
+    def _write(self, path: Path, data: bytes) -> None:
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _publish(self, artifact: _Artifact, version: str, body: bytes, count: int) -> None:
+        digest = hashlib.sha256(body).hexdigest()[:24]
+        filename = f"{artifact.name}-{digest}{artifact.suffix}"
+        path = self.directory / filename
+        if not path.exists():
+            self._write(path.with_name(filename + ENCODINGS["br"]), brotli.compress(body, quality=9))
+            self._write(path.with_name(filename + ENCODINGS["gzip"]), gzip.compress(body, compresslevel=6, mtime=0))
+            # The identity file goes last: its presence means the set is complete.
+            self._write(path, body)
+
+        snapshot = Snapshot(artifact.name, version, digest, count, artifact.media_type, filename)
+        self._write(self.directory / f"{artifact.name}.manifest.json", json.dumps(asdict(snapshot)).encode())
+        self._prune(artifact, keep=filename)
+
+    def _prune(self, artifact: _Artifact, keep: str) -> None:
+        renderings = sorted(
+            self.directory.glob(f"{artifact.name}-*{artifact.suffix}"),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True,
+        )
+        for path in [path for path in renderings if path.name != keep][KEEP_GENERATIONS - 1:]:
+            for suffix in ("", *ENCODINGS.values()):
+                path.with_name(path.name + suffix).unlink(missing_ok=True)
+
+    def current(self, name: str) -> Snapshot | None:
+        """The published snapshot of ``name`` (re-read only when its manifest changed)."""
+        if self.directory is None:
+            return None
+        path = self.directory / f"{name}.manifest.json"
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._manifests.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        snapshot = Snapshot(**json.loads(path.read_bytes()))
+        self._manifests[name] = (key, snapshot)
+        return snapshot
+
+    def lookup(self, name: str, version: str) -> Snapshot | None:
+        """
+        The snapshot of ``name`` if it was rendered at library ``version``.
+
+        A stale or missing snapshot wakes the materializer; the caller then
+        answers from the database as usual.
+        """
+        if self.directory is None:
+            return None
+        snapshot = self.current(name)
+        if snapshot is None or snapshot.version != version:
+            metrics.inc(f"snapshots.{name}.misses")
+            self.notify()
+            return None
+        metrics.inc(f"snapshots.{name}.hits")
+        return snapshot
+
+    def response(self, request: Request, snapshot: Snapshot, headers: Mapping[str, str] | None = None) -> Response:
+        """Serve ``snapshot`` in the best encoding the client accepts, or ``304``."""
+        encoding = _accepted_encoding(request.headers.get("accept-encoding", ""))
+        response_headers = {
+            **(headers or {}),
+            "ETag": snapshot.etag(encoding),
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if request.headers.get("if-none-match") == response_headers["ETag"]:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=response_headers)
+
+        path = self.directory / snapshot.filename
+        if encoding is not None:
+            path = path.with_name(snapshot.filename + ENCODINGS[encoding])
+            response_headers["Content-Encoding"] = encoding
+        return FileResponse(path, media_type=snapshot.media_type, headers=response_headers)
+
+
+library_snapshots = SnapshotMaterializer()
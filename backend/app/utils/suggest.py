@@ -0,0 +1,321 @@
+"""In-memory typeahead over vulnerability names.
+
+Every word position of a (normalised) name is a key in one sorted list, so
+"sign" finds "SMB signing not required" as well as "Signing key exposed". A
+prefix lookup is two bisections over that list; the matching slice is ranked
+with NumPy on a score array aligned with it (export count first, then name),
+so even a one-letter prefix over the whole library takes a few milliseconds.
+
+The ranked arrays are rebuilt after changes, which takes most of a second
+for a large library. That happens in a worker thread, started by the sync
+that saw the change, while lookups keep using the previous ranking until the
+new one is swapped in: new and renamed entries show up in suggestions a
+rebuild later than in the index itself.
+
+Export counts do not move ``updated_at``, and counting one is not a database
+write: exports served by this process are applied to the ranking at once and
+kept in memory (``record_exports``), then added to ``export_count`` in batches
+by the background task (``flush_exports``), so export requests stay read-only
+and never wait on row locks. Counts from other workers are picked up by a
+periodic refresh of the (id, export_count) pairs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import case, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.vulnerability import Vulnerability
+from app.utils.duplicates import normalise
+from app.utils.incremental_index import IncrementalIndex
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Seconds between full reloads of export counts
+POPULARITY_REFRESH_SECONDS = 600.0
+
+# Seconds between writes of the exports counted by this process, and rows per write
+EXPORT_FLUSH_SECONDS = 60.0
+EXPORT_FLUSH_BATCH = 500
+
+# Batches at least this large are sorted in one go instead of inserted one by one
+BULK_THRESHOLD = 64
+
+_END = "\U0010ffff"
+
+# score = export_count << _NAME_BITS | inverted alphabetical rank of the name
+_NAME_BITS = 32
+
+
+def name_keys(name: str) -> list[str]:
+    """Keys indexed for a name: the normalised name from each word onwards."""
+    tokens = normalise(name)
+    return list(dict.fromkeys(" ".join(tokens[i:]) for i in range(len(tokens))))
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    id: UUID
+    name: str
+    export_count: int
+
+
+class _Ranking:
+    """
+    A copy of the sorted entries with a score array aligned to it, plus each id's positions in it.
+
+    Never changed once built, except for export counts bumped in place, so it
+    can be built in a thread and swapped in whole.
+    """
+
+    def __init__(self, entries: list[tuple[str, UUID]], names: dict[UUID, str], popularity: dict[UUID, int]):
+        self.entries = entries
+        by_name = sorted(names, key=lambda vuln_id: (names[vuln_id].lower(), str(vuln_id)))
+        name_rank = {vuln_id: len(by_name) - rank for rank, vuln_id in enumerate(by_name)}
+
+        self.ids = [vuln_id for _, vuln_id in entries]
+        self.scores = np.fromiter(
+            ((popularity[vuln_id] << _NAME_BITS) | name_rank[vuln_id] for vuln_id in self.ids),
+            dtype=np.int64,
+            count=len(self.ids),
+        )
+        positions: dict[UUID, list[int]] = {}
+        for position, vuln_id in enumerate(self.ids):
+            positions.setdefault(vuln_id, []).append(position)
+        self.positions = {vuln_id: np.array(found) for vuln_id, found in positions.items()}
+
+
+class SuggestIndex(IncrementalIndex):
+    """Sorted word-prefix index of names, ranked by export count."""
+
+    name = "suggest"
+    columns = (Vulnerability.name, Vulnerability.export_count)
+
+    def __init__(self) -> None:
+        self._entries: list[tuple[str, UUID]] = []
+        self._keys: dict[UUID, list[str]] = {}
+        self.names: dict[UUID, str] = {}
+        self.popularity: dict[UUID, int] = {}
+        self._ranking: _Ranking | None = None
+        self._dirty = False  # entries or counts changed since the ranking was built
+        self._generation = 0  # bumped by reset, so a rebuild finishing afterwards is dropped
+        self._rebuild_task: asyncio.Task | None = None
+        self._session_factory: async_sessionmaker[AsyncSession] | None = None
+        self._refresh_task: asyncio.Task | None = None
+        self._pending_exports: Counter[UUID] = Counter()  # counted here, not yet written
+        super().__init__()
+
+    def _clear(self) -> None:
+        self._entries.clear()
+        self._keys.clear()
+        self.names.clear()
+        self.popularity.clear()
+        self._ranking = None
+        self._dirty = False
+        self._generation += 1
+        self._pending_exports.clear()  # only reset when switching databases
+
+    def _upsert(self, row: Mapping[str, Any]) -> None:
+        vuln_id = row["id"]
+        self._remove(vuln_id)
+        keys = name_keys(row["name"])
+        for key in keys:
+            insort(self._entries, (key, vuln_id))
+        self._keys[vuln_id] = keys
+        self.names[vuln_id] = row["name"]
+        self.popularity[vuln_id] = row["export_count"] or 0
+        self._dirty = True
+
+    def _upsert_many(self, rows: Sequence[Mapping[str, Any]]) -> None:
+        if len(rows) < BULK_THRESHOLD:
+            super()._upsert_many(rows)
+            return
+        # Initial build or large import: append everything, then sort once.
+        for row in rows:
+            self._remove(row["id"])
+        for row in rows:
+            vuln_id = row["id"]
+            keys = name_keys(row["name"])
+            self._entries.extend((key, vuln_id) for key in keys)
+            self._keys[vuln_id] = keys
+            self.names[vuln_id] = row["name"]
+            self.popularity[vuln_id] = row["export_count"] or 0
+        self._entries.sort()
+        self._dirty = True
+
+    def _remove(self, vuln_id: UUID) -> None:
+        for key in self._keys.pop(vuln_id, ()):
+            index = bisect_left(self._entries, (key, vuln_id))
+            if index < len(self._entries) and self._entries[index] == (key, vuln_id):
+                del self._entries[index]
+        if self.names.pop(vuln_id, None) is not None:
+            self._dirty = True
+        self.popularity.pop(vuln_id, None)
+
+    async def _sync(self, db: AsyncSession) -> int:
+        changed = await super()._sync(db)
+        if self._ranking is None:
+            # Nothing to serve yet: wait for the first ranking (called under the sync lock).
+            self._dirty = False
+            await self._build(self._generation)
+        elif self._dirty and (self._rebuild_task is None or self._rebuild_task.done()):
+            self._dirty = False
+            self._rebuild_task = asyncio.create_task(self._rebuild(self._generation))
+        return changed
+
+    async def _rebuild(self, generation: int) -> None:
+        # The sync lock keeps entries and names from changing while they are copied.
+        async with self._lock:
+            await self._build(generation)
+
+    async def _build(self, generation: int) -> None:
+        """Copy the index and rank it, both in a worker thread, then swap the ranking in."""
+
+        def build() -> _Ranking:
+            return _Ranking(list(self._entries), dict(self.names), dict(self.popularity))
+
+        ranking = await asyncio.to_thread(build)
+        if generation == self._generation:
+            self._ranking = ranking
+            metrics.inc("index.suggest.rankings")
+
+    def start(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        """Write this process's export counts and refresh other workers' in the background."""
+        if self._refresh_task is None:
+            self._session_factory = session_factory
+            self._refresh_task = asyncio.create_task(self._refresh_popularity())
+
+    async def stop(self) -> None:
+        for task in (self._refresh_task, self._rebuild_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._refresh_task = self._rebuild_task = None
+        if self._session_factory is not None and self._pending_exports:
+            try:
+                async with self._session_factory() as db:
+                    await self.flush_exports(db)
+            except Exception:  # pragma: no cover - depends on database failures
+                logger.exception("Export count flush failed")
+
+    async def _refresh_popularity(self) -> None:
+        refreshed_at = time.monotonic()
+        while True:
+            await asyncio.sleep(EXPORT_FLUSH_SECONDS)
+            counts: dict[UUID, int] | None = None
+            try:
+                async with self._session_factory() as db:
+                    await self.flush_exports(db)
+                    if time.monotonic() - refreshed_at >= POPULARITY_REFRESH_SECONDS:
+                        refreshed_at = time.monotonic()
+                        counts = dict((await db.execute(select(Vulnerability.id, Vulnerability.export_count))).all())
+            except Exception:  # pragma: no cover - depends on database failures
+                logger.exception("Export count flush or refresh failed")
+                continue
+            if counts is None:
+                continue
+            for vuln_id in counts.keys() & self.popularity.keys():
+                # Exports counted since the flush are not in the database yet.
+                count = counts[vuln_id] + self._pending_exports[vuln_id]
+                if self.popularity[vuln_id] != count:
+                    self.popularity[vuln_id] = count
+                    self._dirty = True  # the next sync re-ranks
+
+    def record_exports(self, ids: Iterable[UUID]) -> None:
+        """Count exports made by this process: ranked right away, written by ``flush_exports``."""
+        ranking = self._ranking
+        for vuln_id in ids:
+            self._pending_exports[vuln_id] += 1
+            if vuln_id not in self.popularity:
+                continue
+            self.popularity[vuln_id] += 1
+            positions = ranking.positions.get(vuln_id) if ranking is not None else None
+            if positions is not None:
+                ranking.scores[positions] += 1 << _NAME_BITS
+        if self._rebuild_task is not None and not self._rebuild_task.done():
+            self._dirty = True  # the ranking being built was copied before these exports
+
+    async def flush_exports(self, db: AsyncSession) -> int:
+        """
+        Add the exports counted since the last flush to ``export_count``.
+
+        One UPDATE per batch of ids (in id order, each its own short
+        transaction) adds every id's own count. Counts of a failed batch are
+        kept for the next flush. Returns the number of ids written.
+        """
+        pending, self._pending_exports = self._pending_exports, Counter()
+        ids = sorted(pending, key=str)
+        written = 0
+        try:
+            for first in range(0, len(ids), EXPORT_FLUSH_BATCH):
+                batch = ids[first : first + EXPORT_FLUSH_BATCH]
+                await db.execute(
+                    update(Vulnerability)
+                    .where(Vulnerability.id.in_(batch))
+                    .values(
+                        export_count=Vulnerability.export_count
+                        + case({vuln_id: pending[vuln_id] for vuln_id in batch}, value=Vulnerability.id, else_=0),
+                        updated_at=Vulnerability.updated_at,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+                written += len(batch)
+        finally:
+            for vuln_id in ids[written:]:
+                self._pending_exports[vuln_id] += pending[vuln_id]
+        metrics.inc("index.suggest.exports_written", written)
+        return written
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[Suggestion]:
+        """Names with a word starting with ``prefix``, most exported first."""
+        key = " ".join(normalise(prefix))
+        ranking = self._ranking
+        if not key or ranking is None:
+            return []
+
+        start = bisect_left(ranking.entries, (key,))
+        end = bisect_left(ranking.entries, (key + _END,))
+        scores = ranking.scores[start:end]
+
+        # A name can match through several of its words: over-fetch, then dedupe.
+        fetch = min(len(scores), limit * 4)
+        while True:
+            if fetch < len(scores):
+                top = np.argpartition(-scores, fetch - 1)[:fetch]
+            else:
+                top = np.arange(len(scores))
+            top = top[np.argsort(-scores[top], kind="stable")]
+            # Entries removed since the ranking was built are skipped.
+            best = [
+                vuln_id
+                for vuln_id in dict.fromkeys(ranking.ids[start + int(position)] for position in top)
+                if vuln_id in self.names
+            ][:limit]
+            if len(best) == limit or fetch == len(scores):
+                break
+            fetch = min(len(scores), fetch * 4)
+
+        return [
+            Suggestion(id=vuln_id, name=self.names[vuln_id], export_count=self.popularity[vuln_id])
+            for vuln_id in best
+        ]
+
+
+suggest_index = SuggestIndex()
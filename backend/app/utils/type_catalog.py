@@ -0,0 +1,161 @@
+"""In-memory, versioned catalog of vulnerability types.
+
+The catalog merges the built-in types (with their persisted metadata
+overrides) and the custom types into one read-only snapshot, serialised once.
+Every write bumps the ``vulnerability_types`` row of ``cache_versions`` and
+publishes on the ``vulnerability_types`` channel; each worker then reloads on
+its next request, so all workers serve the same catalog and ETag.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.cache_version import CacheVersion
+from app.models.custom_type import CustomVulnerabilityType, VulnerabilityTypeOverride
+from app.utils.notifier import ChangeNotifier, publish
+from app.utils.vulnerability_types import VULNERABILITY_TYPES
+
+CACHE_NAME = "vulnerability_types"
+CHANNEL = "vulnerability_types"
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Immutable view of the catalog at one version."""
+
+    version: int
+    etag: str
+    types: dict[str, dict[str, Any]]
+    body: bytes
+
+    def get(self, name: str) -> dict[str, Any] | None:
+        return self.types.get(name)
+
+
+async def current_version(db: AsyncSession) -> int:
+    """Read the persisted catalog version (0 if never bumped)."""
+    result = await db.execute(select(CacheVersion.version).where(CacheVersion.name == CACHE_NAME))
+    return result.scalar_one_or_none() or 0
+
+
+async def bump_version(db: AsyncSession) -> None:
+    """
+    Record a catalog change in the current transaction.
+
+    The version row update and the notification both take effect on commit.
+    """
+    # One statement whether or not the version row exists yet: concurrent first writers
+    # cannot both insert it.
+    dialect_insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    result = await db.execute(
+        dialect_insert(CacheVersion)
+        .values(name=CACHE_NAME, version=1)
+        .on_conflict_do_update(index_elements=[CacheVersion.name], set_={"version": CacheVersion.version + 1})
+        .returning(CacheVersion.version)
+    )
+    await publish(db, CHANNEL, str(result.scalar_one()))
+
+
+def _build_types(
+    overrides: list[VulnerabilityTypeOverride],
+    custom_types: list[CustomVulnerabilityType],
+) -> dict[str, dict[str, Any]]:
+    types: dict[str, dict[str, Any]] = {name: dict(meta) for name, meta in VULNERABILITY_TYPES.items()}
+    for override in overrides:
+        if override.name in types:
+            types[override.name].update(
+                icon=override.icon,
+                color=override.color,
+                description=override.description,
+            )
+    for custom in custom_types:
+        types[custom.name] = {
+            "name": custom.name,
+            "category": custom.category,
+            "icon": custom.icon,
+            "color": custom.color,
+            "description": custom.description,
+            "is_custom": True,
+        }
+    return types
+
+
+def _serialise(version: int, types: dict[str, dict[str, Any]]) -> tuple[bytes, str]:
+    all_types = list(types.values())
+    by_category: dict[str, list[dict[str, Any]]] = {}
+    for type_data in all_types:
+        by_category.setdefault(type_data["category"], []).append(type_data)
+
+    body = json.dumps(
+        {"version": version, "types": all_types, "by_category": by_category},
+        separators=(",", ":"),
+    ).encode()
+    # Derived from content, so every worker at this version yields the same tag.
+    etag = f'"types-{version}-{hashlib.sha1(body).hexdigest()[:16]}"'
+    return body, etag
+
+
+class TypeCatalog:
+    """Process-wide holder of the current catalog snapshot."""
+
+    def __init__(self) -> None:
+        self._snapshot: CatalogSnapshot | None = None
+        self._stale = True
+        self._lock = asyncio.Lock()
+
+    def invalidate(self, _payload: str | None = None) -> None:
+        """Mark the snapshot stale; the next read reloads it."""
+        self._stale = True
+
+    def reset(self) -> None:
+        """Drop the snapshot entirely (used when switching databases, e.g. in tests)."""
+        self._snapshot = None
+        self._stale = True
+
+    async def get(self, db: AsyncSession) -> CatalogSnapshot:
+        """Return the current snapshot, reloading it from ``db`` if stale."""
+        snapshot = self._snapshot
+        if snapshot is not None and not self._stale:
+            return snapshot
+
+        async with self._lock:
+            if self._snapshot is not None and not self._stale:
+                return self._snapshot
+            # Clear first: an invalidation arriving during the load marks it stale again.
+            self._stale = False
+            try:
+                self._snapshot = await self._load(db)
+            except Exception:
+                self._stale = True
+                raise
+            return self._snapshot
+
+    async def _load(self, db: AsyncSession) -> CatalogSnapshot:
+        version = await current_version(db)
+        if self._snapshot is not None and self._snapshot.version == version and version:
+            return self._snapshot
+
+        overrides = list((await db.execute(select(VulnerabilityTypeOverride))).scalars())
+        custom_types = list(
+            (await db.execute(select(CustomVulnerabilityType).order_by(CustomVulnerabilityType.name))).scalars()
+        )
+        types = _build_types(overrides, custom_types)
+        body, etag = _serialise(version, types)
+        return CatalogSnapshot(version=version, etag=etag, types=types, body=body)
+
+    def watch(self, notifier: ChangeNotifier) -> None:
+        """Subscribe to cross-worker invalidations."""
+        notifier.subscribe(CHANNEL, self.invalidate, poll=current_version)
+
+
+type_catalog = TypeCatalog()
+
@@ -6,6 +6,7 @@ from uuid import UUID
 from lxml import etree
 
 from app.models.vulnerability import VulnerabilityLevel, VulnerabilityType
+from app.utils.render_cache import export_cache
 
 
 def parse_vulnerabilities_xml(xml_content: bytes) -> list[dict[str, Any]]:
@@ -113,66 +114,86 @@ def parse_vulnerabilities_xml(xml_content: bytes) -> list[dict[str, Any]]:
     return vulnerabilities
 
 
+# Bump whenever the exported markup changes, so cached fragments are invalidated.
+EXPORT_XML_VERSION = "1"
+
+DEFAULT_TAG_ORDER = [
+    "Id",
+    "Name",
+    "Level",
+    "Scope",
+    "Protocol-Interface",
+    "CVSS3.1_Score",
+    "CVSS3.1_VectorString",
+    "Description",
+    "Risk",
+    "Recommendation",
+    "Type",
+]
+
+_XML_DECLARATION = b"<?xml version='1.0' encoding='UTF-8'?>\n"
+
+
+def render_vulnerability_xml(vuln) -> bytes:
+    """
+    Render one `<vulnerability>` element of the XML export.
+
+    The fragment is indented as a child of `<vulnerabilities>` and ends with
+    a newline, so an export is the plain concatenation of fragments.
+    """
+    vuln_elem = etree.Element("vulnerability")
+
+    # Use preserved order if available
+    tag_order = vuln.tag_order if vuln.tag_order else DEFAULT_TAG_ORDER
+
+    # Map field names to XML tags
+    field_map = {
+        "Id": str(vuln.id),
+        "Name": vuln.name,
+        "Level": vuln.level.value,
+        "Scope": vuln.scope,
+        "Protocol-Interface": vuln.protocol_interface,
+        "CVSS3.1_Score": str(vuln.cvss_score) if vuln.cvss_score is not None else "",
+        "CVSS3.1_VectorString": vuln.cvss_vector or "",
+        "Description": vuln.description,
+        "Risk": vuln.risk,
+        "Recommendation": vuln.recommendation,
+        "Type": vuln.vuln_type.value,
+    }
+
+    # Add elements in preserved order
+    for tag in tag_order:
+        if tag in field_map:
+            elem = etree.SubElement(vuln_elem, tag)
+            elem.text = field_map[tag]
+
+    etree.indent(vuln_elem, level=1)
+    return b"  " + etree.tostring(vuln_elem, encoding="UTF-8") + b"\n"
+
+
 def export_vulnerabilities_xml(vulnerabilities: list) -> bytes:
     """
     Export vulnerabilities to XML format.
 
+    Each `<vulnerability>` is taken from the render cache (keyed by id and
+    `updated_at`) and only rendered when the finding changed.
+
     Args:
         vulnerabilities: List of Vulnerability model instances.
 
     Returns:
         XML content as bytes.
     """
-    root = etree.Element("vulnerabilities")
+    if not vulnerabilities:
+        return _XML_DECLARATION + b"<vulnerabilities/>\n"
 
+    parts = [_XML_DECLARATION, b"<vulnerabilities>\n"]
     for vuln in vulnerabilities:
-        vuln_elem = etree.SubElement(root, "vulnerability")
-
-        # Define default order if not preserved
-        default_order = [
-            "Id",
-            "Name",
-            "Level",
-            "Scope",
-            "Protocol-Interface",
-            "CVSS3.1_Score",
-            "CVSS3.1_VectorString",
-            "Description",
-            "Risk",
-            "Recommendation",
-            "Type",
-        ]
-
-        # Use preserved order if available
-        tag_order = vuln.tag_order if vuln.tag_order else default_order
-
-        # Map field names to XML tags
-        field_map = {
-            "Id": str(vuln.id),
-            "Name": vuln.name,
-            "Level": vuln.level.value,
-            "Scope": vuln.scope,
-            "Protocol-Interface": vuln.protocol_interface,
-            "CVSS3.1_Score": str(vuln.cvss_score) if vuln.cvss_score is not None else "",
-            "CVSS3.1_VectorString": vuln.cvss_vector or "",
-            "Description": vuln.description,
-            "Risk": vuln.risk,
-            "Recommendation": vuln.recommendation,
-            "Type": vuln.vuln_type.value,
-        }
-
-        # Add elements in preserved order
-        for tag in tag_order:
-            if tag in field_map:
-                elem = etree.SubElement(vuln_elem, tag)
-                elem.text = field_map[tag]
-
-    # Convert to bytes with pretty formatting
-    xml_bytes = etree.tostring(
-        root,
-        pretty_print=True,
-        xml_declaration=True,
-        encoding="UTF-8",
-    )
-
-    return xml_bytes
+        parts.append(
+            export_cache.get_or_render(
+                (vuln.id, vuln.updated_at, "xml-export", EXPORT_XML_VERSION),
+                lambda vuln=vuln: render_vulnerability_xml(vuln),
+            )
+        )
+    parts.append(b"</vulnerabilities>\n")
+    return b"".join(parts)
@@ -1,10 +1,15 @@
-"""Minimal aiosqlite stub for test environment without external dependency."""
+"""Minimal aiosqlite stub for test environment without external dependency.
+
+As in aiosqlite, every call on a connection runs on that connection's own
+worker thread, so the event loop keeps running while a statement does.
+"""
 
 from __future__ import annotations
 
 import asyncio
 import functools
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Iterable
 
 __all__ = [
@@ -76,16 +81,20 @@ class Cursor:
         await self.close()
 
     async def _run(self, func, *args):
-        return func(*args)
+        return await self._connection._run(func, *args)
 
 
 class Connection:
-    def __init__(self, conn: sqlite3.Connection, loop: asyncio.AbstractEventLoop):
+    def __init__(self, conn: sqlite3.Connection, loop: asyncio.AbstractEventLoop, executor: ThreadPoolExecutor):
         self._conn = conn
         self._loop = loop
+        self._executor = executor
+
+    async def _run(self, func, *args):
+        return await self._loop.run_in_executor(self._executor, functools.partial(func, *args))
 
     async def cursor(self) -> Cursor:
-        cursor = self._conn.cursor()
+        cursor = await self._run(self._conn.cursor)
         return Cursor(self, cursor, self._loop)
 
     async def execute(self, sql: str, parameters: Iterable[Any] | None = None):
@@ -99,13 +108,16 @@ class Connection:
         return cursor
 
     async def commit(self):
-        self._conn.commit()
+        await self._run(self._conn.commit)
 
     async def rollback(self):
-        self._conn.rollback()
+        await self._run(self._conn.rollback)
 
     async def close(self):
-        self._conn.close()
+        try:
+            await self._run(self._conn.close)
+        finally:
+            self._executor.shutdown(wait=False)
 
     @property
     def total_changes(self) -> int:
@@ -134,13 +146,13 @@ class Connection:
         await self.close()
 
     async def create_function(self, *args, **kwargs):
-        self._conn.create_function(*args, **kwargs)
+        await self._run(functools.partial(self._conn.create_function, *args, **kwargs))
 
     async def create_aggregate(self, *args, **kwargs):
-        self._conn.create_aggregate(*args, **kwargs)
+        await self._run(functools.partial(self._conn.create_aggregate, *args, **kwargs))
 
     async def create_collation(self, *args, **kwargs):
-        self._conn.create_collation(*args, **kwargs)
+        await self._run(functools.partial(self._conn.create_collation, *args, **kwargs))
 
 
 class ConnectionTask:
@@ -153,8 +165,10 @@ class ConnectionTask:
     def __await__(self):
         async def _inner():
             loop = asyncio.get_running_loop()
-            conn = sqlite3.connect(self._database, **self._kwargs)
-            return Connection(conn, loop)
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='aiosqlite')
+            connect = functools.partial(sqlite3.connect, self._database, **self._kwargs)
+            conn = await loop.run_in_executor(executor, connect)
+            return Connection(conn, loop, executor)
 
         return _inner().__await__()
 
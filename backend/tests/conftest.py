@@ -21,10 +21,20 @@ from app.main import app  # noqa: E402
 from app import security as security_module  # noqa: E402
 from app.dependencies import rate_limiter  # noqa: E402
 from app.models.api_token import ApiToken  # noqa: E402
+from app.models.audit_event import AuditEvent  # noqa: E402
+from app.models.cache_version import CacheVersion  # noqa: E402
+from app.models.custom_type import CustomVulnerabilityType, VulnerabilityTypeOverride  # noqa: E402
 from app.models.session import Session  # noqa: E402
 from app.models.user import User  # noqa: E402
 from app.models.vulnerability import Vulnerability, VulnerabilityHistory  # noqa: E402
+from app.models.vulnerability_change import VulnerabilityChange  # noqa: E402
 from app.routers import auth as auth_router  # noqa: E402
+from app.utils.change_feed import change_feed  # noqa: E402
+from app.utils.duplicates import duplicate_index  # noqa: E402
+from app.utils.session_revocations import session_revocations  # noqa: E402
+from app.utils.similarity import similarity_index  # noqa: E402
+from app.utils.suggest import suggest_index  # noqa: E402
+from app.utils.type_catalog import type_catalog  # noqa: E402
 
 
 @pytest.fixture(scope='session')
@@ -54,12 +64,23 @@ async def client():
             ApiToken.__table__,
             Vulnerability.__table__,
             VulnerabilityHistory.__table__,
+            VulnerabilityChange.__table__,
+            CustomVulnerabilityType.__table__,
+            VulnerabilityTypeOverride.__table__,
+            CacheVersion.__table__,
+            AuditEvent.__table__,
         ]
         await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tables))
 
     session_factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
     rate_limiter.requests.clear()
+    type_catalog.reset()
+    duplicate_index.reset()
+    similarity_index.reset()
+    suggest_index.reset()
+    change_feed.reset()
+    session_revocations.reset()
 
     original_hash_password = security_module.hash_password
     original_verify_password = security_module.verify_password
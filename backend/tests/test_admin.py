@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app import security
+from app.models.user import User, UserRole
+from app.models.vulnerability import Vulnerability, VulnerabilityHistory, VulnerabilityLevel, VulnerabilityType
+from app.models.vulnerability_change import VulnerabilityChange
+from app.utils.audit import audit_log, audit_pipeline
+from app.utils.cvss_consistency import check_cvss_consistency
+from app.utils.metrics import metrics
+
+CRITICAL_VECTOR = 'CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H'  # 9.8
+
+
+async def _create_admin(session):
+    user = User(
+        username='admin',
+        full_name='Admin User',
+        password_hash=security.hash_password('secret123'),
+        role=UserRole.ADMIN,
+    )
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    return user
+
+
+def _vuln(name, *, level, score, vector):
+    return Vulnerability(
+        name=name,
+        level=level,
+        scope='Scope',
+        protocol_interface='HTTPS',
+        cvss_score=score,
+        cvss_vector=vector,
+        description='Description',
+        risk='Risk',
+        recommendation='Recommendation',
+        vuln_type=VulnerabilityType.WEB,
+    )
+
+
+async def _seed_inconsistent(session):
+    session.add_all([
+        _vuln('Consistent', level=VulnerabilityLevel.CRITICAL, score=9.8, vector=CRITICAL_VECTOR),
+        _vuln('Wrong score', level=VulnerabilityLevel.CRITICAL, score=5.0, vector=CRITICAL_VECTOR),
+        _vuln('Wrong level', level=VulnerabilityLevel.LOW, score=7.5, vector=None),
+        _vuln('Bad vector', level=VulnerabilityLevel.MEDIUM, score=5.0, vector='CVSS:3.1/AV:X'),
+    ])
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_consistency_check_reports_without_fixing(client):
+    _, session_factory = client
+
+    async with session_factory() as session:
+        await _seed_inconsistent(session)
+        report = await check_cvss_consistency(session, chunk_size=2)
+
+    assert report.scanned == 4
+    assert report.score_mismatches == 1
+    assert report.level_mismatches == 1
+    assert report.invalid_vectors == 1
+    assert report.fixed_scores == 0
+
+    async with session_factory() as session:
+        result = await session.execute(select(Vulnerability).where(Vulnerability.name == 'Wrong score'))
+        assert result.scalar_one().cvss_score == 5.0
+
+
+@pytest.mark.asyncio
+async def test_consistency_job_fixes_mismatches(client):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        admin = await _create_admin(session)
+        await _seed_inconsistent(session)
+
+    await test_client.post('/api/auth/login', json={'username': 'admin', 'password': 'secret123'})
+
+    response = await test_client.post('/api/admin/cvss-consistency', params={'fix': 'true'})
+    assert response.status_code == 202
+    job_id = response.json()['id']
+
+    for _ in range(50):
+        job = (await test_client.get(f'/api/admin/cvss-consistency/{job_id}')).json()
+        if job['status'] not in ('pending', 'running'):
+            break
+        await asyncio.sleep(0.01)
+
+    assert job['status'] == 'completed'
+    assert job['report']['fixed_scores'] == 1
+    assert job['report']['fixed_levels'] == 1
+
+    async with session_factory() as session:
+        rows = {v.name: v for v in (await session.execute(select(Vulnerability))).scalars()}
+        assert rows['Wrong score'].cvss_score == 9.8
+        assert rows['Wrong level'].level == VulnerabilityLevel.HIGH
+        assert rows['Bad vector'].cvss_score == 5.0
+
+        changes = (await session.execute(select(VulnerabilityChange))).scalars().all()
+        assert sorted((change.action, change.name) for change in changes) == [
+            ('updated', 'Wrong level'),
+            ('updated', 'Wrong score'),
+        ]
+
+        history = (await session.execute(select(VulnerabilityHistory))).scalars().all()
+        assert sorted(entry.snapshot['name'] for entry in history) == ['Wrong level', 'Wrong score']
+        assert {entry.changed_by for entry in history} == {admin.id}
+        snapshots = {entry.snapshot['name']: entry.snapshot for entry in history}
+        assert snapshots['Wrong score']['cvss_score'] == 9.8
+        assert snapshots['Wrong level']['level'] == 'High'
+
+
+@pytest.mark.asyncio
+async def test_audit_pipeline_batches_events_and_drops_on_overflow(client):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        admin = await _create_admin(session)
+
+    audit_pipeline.start(session_factory, queue_size=3)
+    try:
+        dropped_before = metrics.counters.get('audit.dropped', 0)
+        for index in range(5):
+            audit_log('vuln.export_doc', actor_id='token-owner', target={'n': index})
+        await audit_pipeline.flush()
+        assert metrics.counters['audit.dropped'] - dropped_before == 2
+
+        await test_client.post('/api/auth/login', json={'username': 'admin', 'password': 'secret123'})
+        await audit_pipeline.flush()
+
+        events = (await test_client.get('/api/admin/audit/events', params={'action': 'vuln.export_doc'})).json()
+        assert len(events) == 3
+        assert {event['actor_id'] for event in events} == {'token-owner'}
+
+        logins = (await test_client.get('/api/admin/audit/events', params={'actor_id': str(admin.id)})).json()
+        assert [event['action'] for event in logins] == ['auth.login']
+
+        snapshot = (await test_client.get('/api/admin/metrics')).json()
+        assert snapshot['audit.queue_depth'] == 0
+        assert snapshot['audit.written'] >= 4
+    finally:
+        await audit_pipeline.stop()
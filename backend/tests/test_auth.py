@@ -1,3 +1,5 @@
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from sqlalchemy import select
 
@@ -6,6 +8,8 @@ from app.config import settings
 from app.dependencies import rate_limiter
 from app.models.session import Session
 from app.models.user import User, UserRole
+from app.utils.metrics import metrics
+from app.utils.session_sweeper import session_sweeper
 
 
 @pytest.mark.asyncio
@@ -126,3 +130,67 @@ async def test_login_emits_audit_log(client, caplog):
 
     assert response.status_code == 200
     assert any('"action": "auth.login"' in record.message for record in caplog.records)
+
+
+@pytest.mark.asyncio
+async def test_stateless_session_checked_in_memory_and_revoked_on_logout(client, monkeypatch):
+    test_client, session_factory = client
+    monkeypatch.setattr(settings, 'session_mode', 'stateless')
+
+    async with session_factory() as session:
+        session.add(User(
+            username='stateless',
+            full_name='Stateless User',
+            password_hash=security.hash_password('secret123'),
+            role=UserRole.EDITOR,
+        ))
+        await session.commit()
+
+    response = await test_client.post('/api/auth/login', json={'username': 'stateless', 'password': 'secret123'})
+    assert response.status_code == 200
+    cookie = response.cookies.get('session_id')
+    assert cookie.startswith('v1.')
+
+    reloads_before = metrics.counters.get('sessions.revocations.reloads', 0)
+    for _ in range(3):
+        me = await test_client.get('/api/auth/me')
+        assert me.status_code == 200
+        assert me.json()['username'] == 'stateless'
+    assert metrics.counters['sessions.revocations.reloads'] - reloads_before == 1
+
+    assert (await test_client.post('/api/auth/logout')).status_code == 200
+    async with session_factory() as session:
+        assert (await session.execute(select(Session))).scalar_one().is_active is False
+
+    test_client.cookies.set('session_id', cookie)
+    assert (await test_client.get('/api/auth/me')).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_sweeper_deletes_dead_sessions_in_batches(client, monkeypatch):
+    _test_client, session_factory = client
+    now = datetime.now(timezone.utc)
+
+    async with session_factory() as session:
+        user = User(username='sweep', full_name='Sweep', password_hash='x', role=UserRole.VIEWER)
+        session.add(user)
+        await session.flush()
+        for index, (expires_at, is_active) in enumerate([
+            (now - timedelta(hours=1), True),
+            (now - timedelta(hours=2), False),
+            (now + timedelta(hours=1), False),
+            (now + timedelta(hours=1), True),
+        ]):
+            session.add(Session(user_id=user.id, token_hash=f'hash-{index}', expires_at=expires_at, is_active=is_active))
+        await session.commit()
+
+    # Stateless mode keeps logged-out sessions until they expire (they feed the revocation list).
+    monkeypatch.setattr(settings, 'session_mode', 'stateless')
+    async with session_factory() as session:
+        assert await session_sweeper.sweep(session, batch_size=1) == 2
+
+    monkeypatch.setattr(settings, 'session_mode', 'database')
+    async with session_factory() as session:
+        assert await session_sweeper.sweep(session, batch_size=1) == 1
+        remaining = (await session.execute(select(Session.token_hash))).scalars().all()
+        assert remaining == ['hash-3']
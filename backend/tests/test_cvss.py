@@ -0,0 +1,66 @@
+import pytest
+
+from app.utils.cvss_calculator import calculate_cvss
+
+
+def test_cvss31_temporal_and_environmental_scores():
+    temporal = calculate_cvss('CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H/E:P/RL:O/RC:C')
+    assert temporal['base_score'] == 9.8
+    assert temporal['temporal_score'] == 8.8
+    assert temporal['environmental_score'] is None
+
+    environmental = calculate_cvss('CVSS:3.1/AV:N/AC:L/PR:L/UI:N/S:U/C:H/I:H/A:H/CR:L/IR:L/AR:L/MAV:L')
+    assert environmental['score'] == 8.8
+    assert environmental['environmental_score'] == 5.9
+
+
+def test_cvss40_macrovector_scores():
+    base = calculate_cvss('CVSS:4.0/AV:N/AC:L/AT:N/PR:N/UI:N/VC:H/VI:H/VA:H/SC:N/SI:N/SA:N')
+    assert base['version'] == '4.0'
+    assert base['score'] == 9.3
+    assert base['nomenclature'] == 'CVSS-B'
+
+    threat = calculate_cvss('CVSS:4.0/AV:N/AC:L/AT:N/PR:N/UI:N/VC:H/VI:H/VA:H/SC:N/SI:N/SA:N/E:U')
+    assert threat['score'] == 8.1
+    assert threat['base_score'] == 9.3
+    assert threat['nomenclature'] == 'CVSS-BT'
+
+    safety = calculate_cvss('CVSS:4.0/AV:L/AC:L/AT:P/PR:L/UI:P/VC:H/VI:L/VA:N/SC:L/SI:N/SA:N/MSI:S')
+    assert safety['score'] == 7.0
+    assert safety['severity'] == 'High'
+
+
+def test_invalid_vectors_rejected():
+    assert calculate_cvss('CVSS:4.0/AV:N/AC:L') is None
+    assert calculate_cvss('CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H/E:Z') is None
+    assert calculate_cvss('CVSS:2.0/AV:N') is None
+
+
+@pytest.mark.asyncio
+async def test_build_and_metrics_routes_are_version_aware(client):
+    test_client, _ = client
+
+    response = await test_client.post(
+        '/api/cvss/build',
+        json={
+            'version': '4.0',
+            'metrics': {
+                'AV': 'N', 'AC': 'L', 'AT': 'N', 'PR': 'N', 'UI': 'N',
+                'VC': 'H', 'VI': 'H', 'VA': 'H', 'SC': 'N', 'SI': 'N', 'SA': 'N',
+            },
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()['vector'] == 'CVSS:4.0/AV:N/AC:L/AT:N/PR:N/UI:N/VC:H/VI:H/VA:H/SC:N/SI:N/SA:N'
+    assert response.json()['score'] == 9.3
+
+    legacy = await test_client.post(
+        '/api/cvss/build',
+        json={'av': 'N', 'ac': 'L', 'pr': 'N', 'ui': 'N', 's': 'U', 'c': 'H', 'i': 'H', 'a': 'H'},
+    )
+    assert legacy.status_code == 200
+    assert legacy.json()['score'] == 9.8
+
+    metrics = (await test_client.get('/api/cvss/metrics', params={'version': '4.0'})).json()
+    assert metrics['AT']['group'] == 'base'
+    assert metrics['E']['group'] == 'threat'
@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import update
+
+from app import security
+from app.models.cache_version import CacheVersion
+from app.models.user import User, UserRole
+from app.utils.notifier import ChangeNotifier
+from app.utils.type_catalog import CACHE_NAME, TypeCatalog, bump_version, current_version
+from app.utils.vulnerability_types import VULNERABILITY_TYPES
+
+
+async def _login_admin(test_client, session_factory):
+    async with session_factory() as session:
+        session.add(User(
+            username='admin',
+            full_name='Admin User',
+            password_hash=security.hash_password('secret123'),
+            role=UserRole.ADMIN,
+        ))
+        await session.commit()
+    await test_client.post('/api/auth/login', json={'username': 'admin', 'password': 'secret123'})
+
+
+@pytest.mark.asyncio
+async def test_catalog_etag_and_persisted_builtin_override(client):
+    test_client, session_factory = client
+    await _login_admin(test_client, session_factory)
+
+    first = await test_client.get('/api/types')
+    assert first.status_code == 200
+    etag = first.headers['etag']
+    assert (await test_client.get('/api/types', headers={'If-None-Match': etag})).status_code == 304
+
+    original_icon = VULNERABILITY_TYPES['Network']['icon']
+    response = await test_client.put(
+        '/api/types/Network',
+        json={'icon': 'Globe', 'color': 'text-red-600', 'description': 'Overridden'},
+    )
+    assert response.status_code == 200
+    assert response.json()['type']['icon'] == 'Globe'
+    assert VULNERABILITY_TYPES['Network']['icon'] == original_icon
+
+    second = await test_client.get('/api/types', headers={'If-None-Match': etag})
+    assert second.status_code == 200
+    assert second.headers['etag'] != etag
+    assert second.json()['version'] > first.json()['version']
+    network = next(t for t in second.json()['types'] if t['name'] == 'Network')
+    assert network['description'] == 'Overridden'
+
+
+@pytest.mark.asyncio
+async def test_polling_invalidates_other_workers(client):
+    test_client, session_factory = client
+    await _login_admin(test_client, session_factory)
+
+    # A second worker with its own catalog, kept in sync by polling.
+    other = TypeCatalog()
+    async with session_factory() as session:
+        engine = session.bind
+        before = await other.get(session)
+    notifier = ChangeNotifier(engine)
+    other.watch(notifier)
+    await notifier.poll_once()
+
+    created = await test_client.post(
+        '/api/types',
+        json={'name': 'Mainframe', 'category': 'Hardware', 'icon': 'Cpu', 'color': 'text-gray-600', 'description': 'x'},
+    )
+    assert created.status_code == 200, created.text
+    async with session_factory() as session:
+        assert (await other.get(session)).etag == before.etag
+
+    await notifier.poll_once()
+    async with session_factory() as session:
+        after = await other.get(session)
+    assert after.etag != before.etag
+    assert after.get('Mainframe')['is_custom'] is True
+
+    # A version bump with unchanged content still yields a new snapshot.
+    async with session_factory() as session:
+        await session.execute(
+            update(CacheVersion).where(CacheVersion.name == CACHE_NAME).values(version=CacheVersion.version + 1)
+        )
+        await session.commit()
+    await notifier.poll_once()
+    async with session_factory() as session:
+        assert (await other.get(session)).version == after.version + 1
+
+
+@pytest.mark.asyncio
+async def test_bump_version_creates_then_increments_row(client):
+    _, session_factory = client
+
+    for expected in (1, 2):
+        async with session_factory() as session:
+            await bump_version(session)
+            await session.commit()
+            assert await current_version(session) == expected
@@ -1,14 +1,35 @@
+import asyncio
+import io
+import zipfile
+from contextlib import AsyncExitStack
+
 import pytest
-from sqlalchemy import select
+from lxml import etree
+from sqlalchemy import event as sa_event
+from sqlalchemy import func, select, text
 
 from app import security
+from app.main import app
 from app.models.api_token import ApiToken
 from app.models.user import User, UserRole
-from app.models.vulnerability import Vulnerability, VulnerabilityLevel, VulnerabilityType
+from app.models.vulnerability import Vulnerability, VulnerabilityHistory, VulnerabilityLevel, VulnerabilityType
+from app.routers import vulnerabilities as vulnerabilities_router
+from app.schemas.vulnerability import VulnerabilityInfo
+from app.utils import ooxml
+from app.utils.bulkheads import bulkheads
+from app.utils.change_feed import change_feed
+from app.utils.metrics import metrics
+from app.utils.query_budget import QueryBudget, _endpoint_budgets
+from app.utils.render_cache import ENTRY_OVERHEAD, RenderCache
+from app.utils.similarity import SimilarityIndex, similarity_index
+from app.utils.single_flight import SingleFlight
+from app.utils.snapshots import library_snapshots
+from app.utils.suggest import suggest_index
 
 
 async def _create_user(session, *, role=UserRole.EDITOR, email='editor@example.com'):
     user = User(
+        username=email.split('@')[0],
         email=email,
         full_name='Editor User',
         password_hash=security.hash_password('secret123'),
@@ -142,7 +163,7 @@ async def test_import_xml_rolls_back_on_error(client):
     test_client, session_factory = client
 
     async with session_factory() as session:
-        user = await _create_user(session)
+        await _create_user(session)
 
     await test_client.post(
         '/api/auth/login',
@@ -235,3 +256,738 @@ async def test_export_doc_xml_response(client):
     assert response.status_code == 200
     assert response.headers['content-type'].startswith('application/xml')
     assert b'<vulnerability>' in response.content
+
+
+def _make_vuln(name, user, *, vector, level=VulnerabilityLevel.HIGH, vuln_type=VulnerabilityType.WEB):
+    return Vulnerability(
+        name=name,
+        level=level,
+        scope='Scope',
+        protocol_interface='HTTPS',
+        cvss_score=7.5,
+        cvss_vector=vector,
+        description='Description',
+        risk='Risk',
+        recommendation='Recommendation',
+        vuln_type=vuln_type,
+        created_by=user.id,
+        updated_by=user.id,
+    )
+
+
+async def _login(test_client, username='editor'):
+    response = await test_client.post('/api/auth/login', json={'username': username, 'password': 'secret123'})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_search_filters_on_cvss_metric_columns(client):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        user = await _create_user(session)
+        session.add_all([
+            _make_vuln('Remote unauthenticated', user, vector='CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H'),
+            _make_vuln('Remote authenticated', user, vector='CVSS:3.1/AV:N/AC:L/PR:L/UI:N/S:U/C:H/I:H/A:H'),
+            _make_vuln('Local', user, vector='CVSS:4.0/AV:L/AC:L/AT:N/PR:N/UI:N/VC:H/VI:H/VA:H/SC:N/SI:N/SA:N'),
+            _make_vuln('No vector', user, vector=None),
+        ])
+        await session.commit()
+
+    await _login(test_client)
+
+    response = await test_client.get('/api/vulns', params={'av': 'N', 'pr': 'N'})
+    assert response.status_code == 200
+    assert [item['name'] for item in response.json()['items']] == ['Remote unauthenticated']
+
+    response = await test_client.get('/api/vulns', params={'pr': 'n'})
+    assert response.json()['total'] == 2
+
+    facets = (await test_client.get('/api/vulns/facets/cvss')).json()
+    assert facets['AV'] == {'N': 2, 'L': 1}
+    assert facets['S'] == {'U': 2}
+
+    facets = (await test_client.get('/api/vulns/facets/cvss', params={'av': 'N'})).json()
+    assert facets['PR'] == {'N': 1, 'L': 1}
+
+
+@pytest.mark.asyncio
+async def test_search_returns_level_type_and_category_facets(client):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        user = await _create_user(session)
+        session.add_all([
+            _make_vuln('Web high', user, vector=None),
+            _make_vuln('API high', user, vector=None, vuln_type=VulnerabilityType.API),
+            _make_vuln('Web low', user, vector=None, level=VulnerabilityLevel.LOW),
+            _make_vuln('Linux low', user, vector=None, level=VulnerabilityLevel.LOW, vuln_type=VulnerabilityType.LINUX),
+        ])
+        await session.commit()
+
+    await _login(test_client)
+
+    response = await test_client.get('/api/vulns', params={'facets': 'true', 'per_page': 1, 'q': 'high'})
+    body = response.json()
+    assert body['total'] == 2
+    assert len(body['items']) == 1
+    assert body['facets']['level'] == {'High': 2}
+    assert body['facets']['type'] == {'Web Application': 1, 'API': 1}
+
+    facets = (await test_client.get('/api/vulns/facets')).json()
+    assert facets['total'] == 4
+    assert facets['level'] == {'High': 2, 'Low': 2}
+    assert facets['category']['Web & Applications'] == 3
+    assert facets['category']['Systems'] == 1
+
+    assert (await test_client.get('/api/vulns')).json()['facets'] is None
+
+
+@pytest.mark.asyncio
+async def test_fast_read_path_matches_response_schema(client):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        user = await _create_user(session)
+        vuln = _make_vuln('Schema check', user, vector='CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H')
+        vuln.tag_order = ['name', 'risk']
+        session.add(vuln)
+        await session.commit()
+        await session.refresh(vuln)
+        expected = VulnerabilityInfo.model_validate(vuln).model_dump(mode='json', by_alias=True)
+
+    await _login(test_client)
+
+    items = (await test_client.get('/api/vulns')).json()['items']
+    assert items == [expected]
+
+    summary = (await test_client.get('/api/vulns', params={'view': 'summary'})).json()['items']
+    assert summary == [{key: expected[key] for key in ('id', 'name', 'level', 'type', 'cvss_score', 'updated_at')}]
+
+    sparse = (await test_client.get('/api/vulns', params={'fields': 'risk,name'})).json()['items']
+    assert sparse == [{'id': expected['id'], 'name': 'Schema check', 'risk': 'Risk'}]
+
+    response = await test_client.get('/api/vulns', params={'fields': 'name,secret'})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_and_delete_are_set_based(client):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        user = await _create_user(session)
+        legacy = [_make_vuln(f'Legacy {index}', user, vector=None, level=VulnerabilityLevel.LOW) for index in range(3)]
+        keep = _make_vuln('Keep', user, vector=None)
+        session.add_all([*legacy, keep])
+        await session.commit()
+
+    await _login(test_client)
+
+    response = await test_client.patch('/api/vulns/bulk', json={'changes': {'level': 'High'}})
+    assert response.status_code == 400
+
+    response = await test_client.patch('/api/vulns/bulk', params={'level': 'Low'}, json={'changes': {'risk': None}})
+    assert response.status_code == 422
+
+    response = await test_client.patch(
+        '/api/vulns/bulk',
+        params={'level': 'Low'},
+        json={'changes': {'type': 'API', 'cvss_vector': 'CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H'}},
+    )
+    assert response.status_code == 200
+    assert response.json()['count'] == 3
+    assert sorted(response.json()['ids']) == sorted(str(vuln.id) for vuln in legacy)
+
+    async with session_factory() as session:
+        updated = (await session.execute(select(Vulnerability).where(Vulnerability.name.like('Legacy%')))).scalars().all()
+        assert {(vuln.vuln_type, vuln.cvss_av) for vuln in updated} == {(VulnerabilityType.API, 'N')}
+        history = (await session.execute(select(VulnerabilityHistory))).scalars().all()
+        assert len(history) == 3
+        assert all(entry.snapshot['vuln_type'] == 'API' for entry in history)
+
+    response = await test_client.post(
+        '/api/vulns/bulk-delete', params={'type': 'API'}, json={'ids': [str(legacy[0].id), str(keep.id)]}
+    )
+    assert response.status_code == 200
+    assert response.json() == {'count': 1, 'ids': [str(legacy[0].id)]}
+
+    async with session_factory() as session:
+        remaining = (await session.execute(select(Vulnerability.name))).scalars().all()
+        assert sorted(remaining) == ['Keep', 'Legacy 1', 'Legacy 2']
+
+
+SMB_DESCRIPTION = (
+    'SMB message signing is not required on the file server, so an attacker in a man-in-the-middle '
+    'position can relay NTLM authentication and tamper with SMB traffic between clients and the host.'
+)
+
+
+@pytest.mark.asyncio
+async def test_duplicates_clusters_near_identical_entries_incrementally(client):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        user = await _create_user(session)
+        first = _make_vuln('SMB signing not required', user, vector=None)
+        second = _make_vuln('SMB Signing Not Required', user, vector=None)
+        other = _make_vuln('Verbose banner', user, vector=None)
+        for vuln in (first, second):
+            vuln.description = SMB_DESCRIPTION
+            vuln.recommendation = 'Require SMB signing on every server and workstation through group policy.'
+        session.add_all([first, second, other])
+        await session.commit()
+
+    await _login(test_client)
+    response = await test_client.get('/api/vulns/duplicates')
+    assert response.status_code == 200
+    clusters = response.json()['clusters']
+    assert len(clusters) == 1
+    assert {item['id'] for item in clusters[0]['items']} == {str(first.id), str(second.id)}
+
+    async with session_factory() as session:
+        third = _make_vuln('SMB signing disabled', user, vector=None)
+        third.description = SMB_DESCRIPTION.replace('is not required', 'is disabled')
+        third.recommendation = 'Require SMB signing on every server and workstation through group policy.'
+        session.add(third)
+        await session.commit()
+        await session.delete(await session.get(Vulnerability, second.id))
+        await session.commit()
+
+    clusters = (await test_client.get('/api/vulns/duplicates')).json()['clusters']
+    assert len(clusters) == 1
+    assert {item['id'] for item in clusters[0]['items']} == {str(first.id), str(third.id)}
+    assert 0.6 <= clusters[0]['min_similarity'] < 1.0
+
+
+@pytest.mark.asyncio
+async def test_similar_vulnerabilities_ranks_by_tfidf_and_persists(client, tmp_path):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        user = await _create_user(session)
+        smb = _make_vuln('SMB signing not required', user, vector=None)
+        smb.description = SMB_DESCRIPTION
+        tls = _make_vuln('TLS 1.0 enabled', user, vector=None)
+        tls.description = 'The web server still accepts TLS 1.0 connections with weak cipher suites.'
+        banner = _make_vuln('Verbose banner', user, vector=None)
+        session.add_all([smb, tls, banner])
+        await session.commit()
+
+    await _login(test_client)
+    response = await test_client.get('/api/vulns/similar', params={'text': 'NTLM relay because SMB signing is off'})
+    assert response.status_code == 200
+    assert response.json()[0]['id'] == str(smb.id)
+
+    # Added after the posting matrix was built: scored from its own vector
+    async with session_factory() as session:
+        relay = _make_vuln('NTLM relay over SMB', user, vector=None)
+        relay.description = SMB_DESCRIPTION
+        session.add(relay)
+        await session.commit()
+
+    response = await test_client.get(f'/api/vulns/{smb.id}/similar')
+    assert response.status_code == 200
+    ranked = [item['id'] for item in response.json()]
+    assert str(smb.id) not in ranked
+    assert ranked[0] == str(relay.id)
+
+    path = tmp_path / 'similarity.npz'
+    similarity_index.save(path)
+    restored = SimilarityIndex()
+    restored.load(path)
+    assert len(restored) == 4
+    matches = restored.query(*restored.vector(smb.id), exclude=smb.id)
+    assert matches[0].id == relay.id
+
+
+async def _create_api_token(session, user, scopes, plain_token='vm_batchtoken1234567890'):
+    session.add(ApiToken(
+        owner_user_id=user.id,
+        label='word token',
+        token_hash=security.hash_token(plain_token),
+        scopes=scopes,
+    ))
+    await session.commit()
+    return {'Authorization': f'Bearer {plain_token}'}
+
+
+@pytest.mark.asyncio
+async def test_catalog_and_batched_details(client):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        user = await _create_user(session)
+        first = _make_vuln('Alpha', user, vector=None)
+        second = _make_vuln('Beta', user, vector=None)
+        session.add_all([first, second])
+        await session.commit()
+        headers = await _create_api_token(session, user, ['read:vulns'])
+
+    response = await test_client.get('/api/vulns/catalog', headers=headers)
+    assert response.status_code == 200
+    catalog = response.json()
+    assert [entry['name'] for entry in catalog['items']] == ['Alpha', 'Beta']
+    assert set(catalog['items'][0]) == {'id', 'name', 'level', 'type', 'cvss_score', 'v'}
+
+    etag = response.headers['etag']
+    cached = await test_client.get('/api/vulns/catalog', headers={**headers, 'If-None-Match': etag})
+    assert cached.status_code == 304
+
+    missing_id = '00000000-0000-0000-0000-000000000000'
+    details = await test_client.post(
+        '/api/vulns/details',
+        json={'ids': [str(second.id), missing_id, str(first.id)]},
+        headers=headers,
+    )
+    assert details.status_code == 200
+    body = details.json()
+    assert [item['name'] for item in body['items']] == ['Beta', 'Alpha']
+    assert body['items'][0]['description'] == 'Description'
+    assert body['missing'] == [missing_id]
+
+
+@pytest.mark.asyncio
+async def test_exportdoc_batch_keeps_order_and_reports_missing(client, caplog):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        user = await _create_user(session)
+        first = _make_vuln('First card', user, vector=None)
+        second = _make_vuln('Second card', user, vector=None)
+        session.add_all([first, second])
+        await session.commit()
+        read_only = await _create_api_token(session, user, ['read:vulns'], plain_token='vm_readonly1234567890')
+        headers = await _create_api_token(session, user, ['export:doc'])
+
+    missing_id = '00000000-0000-0000-0000-000000000000'
+    ids = [str(second.id), missing_id, str(first.id)]
+
+    response = await test_client.post('/api/vulns/exportdoc/batch', json={'ids': ids}, headers=read_only)
+    assert response.status_code == 403
+
+    with caplog.at_level('INFO', logger='vulnmanager.audit'):
+        response = await test_client.post('/api/vulns/exportdoc/batch', json={'ids': ids}, headers=headers)
+    assert response.status_code == 200
+    items = response.json()['items']
+    assert [item['found'] for item in items] == [True, False, True]
+    assert items[0]['card']['name'] == 'Second card'
+    assert response.json()['missing'] == [missing_id]
+    assert sum('vuln.export_doc_batch' in record.message for record in caplog.records) == 1
+
+    response = await test_client.post(
+        '/api/vulns/exportdoc/batch', params={'format': 'xml'}, json={'ids': ids}, headers=headers
+    )
+    assert response.headers['content-type'].startswith('application/xml')
+    assert response.content.count(b'<vulnerability>') == 2
+    assert f'<missing id="{missing_id}"/>'.encode() in response.content
+
+
+@pytest.mark.asyncio
+async def test_suggest_ranks_word_prefix_matches_by_exports(client):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        user = await _create_user(session)
+        smb = _make_vuln('SMB signing not required', user, vector=None)
+        key = _make_vuln('Signing key exposed', user, vector=None)
+        tls = _make_vuln('Weak TLS ciphers', user, vector=None)
+        session.add_all([smb, key, tls])
+        await session.commit()
+        updated_at = smb.updated_at
+        headers = await _create_api_token(session, user, ['export:doc', 'read:vulns'])
+
+    response = await test_client.get('/api/vulns/suggest', params={'prefix': 'sig'}, headers=headers)
+    assert response.status_code == 200
+    assert [item['name'] for item in response.json()] == ['Signing key exposed', 'SMB signing not required']
+
+    for _ in range(2):
+        assert (await test_client.get(f'/api/vulns/{smb.id}/exportdoc', headers=headers)).status_code == 200
+
+    await _login(test_client)
+    response = await test_client.get('/api/vulns/suggest', params={'prefix': 'SIGN'})
+    assert response.status_code == 200
+    assert [(item['name'], item['export_count']) for item in response.json()] == [
+        ('SMB signing not required', 2),
+        ('Signing key exposed', 0),
+    ]
+
+    async with session_factory() as session:
+        # Exports are counted in memory and written in batches, not per request.
+        stored = await session.get(Vulnerability, smb.id)
+        assert stored.export_count == 0
+
+        assert await suggest_index.flush_exports(session) == 1
+        session.expire_all()
+        stored = await session.get(Vulnerability, smb.id)
+        assert (stored.export_count, stored.updated_at) == (2, updated_at)
+        assert await suggest_index.flush_exports(session) == 0
+
+
+@pytest.mark.asyncio
+async def test_suggest_serves_previous_ranking_while_rebuilding(client):
+    _test_client, session_factory = client
+
+    async with session_factory() as session:
+        user = await _create_user(session)
+        session.add(_make_vuln('SMB signing not required', user, vector=None))
+        await session.commit()
+        await suggest_index.sync(session)
+        assert [item.name for item in suggest_index.suggest('sig')] == ['SMB signing not required']
+
+        session.add(_make_vuln('Signing key exposed', user, vector=None))
+        await session.commit()
+        await suggest_index.sync(session)
+        # The new entry is indexed, but ranked by a rebuild running off the request path.
+        assert [item.name for item in suggest_index.suggest('sig')] == ['SMB signing not required']
+
+    await suggest_index._rebuild_task
+    assert [item.name for item in suggest_index.suggest('sig')] == ['Signing key exposed', 'SMB signing not required']
+
+
+@pytest.mark.asyncio
+async def test_change_stream_replays_and_fans_out_committed_changes(client):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        user = await _create_user(session)
+        smb = _make_vuln('SMB signing not required', user, vector=None)
+        tls = _make_vuln('Weak TLS ciphers', user, vector=None)
+        session.add_all([smb, tls])
+        await session.commit()
+        await change_feed.catch_up(session)
+    subscription = change_feed.subscribe()
+
+    await _login(test_client)
+    response = await test_client.put(f'/api/vulns/{smb.id}', json={'risk': 'Relay'})
+    assert response.status_code == 200
+    response = await test_client.post('/api/vulns/bulk-delete', json={'ids': [str(tls.id)]})
+    assert response.status_code == 200
+
+    async with session_factory() as session:
+        assert await change_feed.catch_up(session) == 2
+        assert await change_feed.replay(session, 5) is None
+    live = [event async for event in _take(subscription.listen(0, heartbeat=1), 2)]
+    assert [(event.seq, event.action, event.id) for event in live] == [(1, 'updated', smb.id), (2, 'deleted', tls.id)]
+    change_feed.unsubscribe(subscription)
+
+    # A reconnecting client gets what it missed, then the stream stays open.
+    request = asyncio.create_task(test_client.get('/api/vulns/stream', headers={'Last-Event-ID': '1'}))
+    while not change_feed._subscribers:
+        await asyncio.sleep(0.01)
+    await change_feed.stop()
+    response = await request
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/event-stream')
+    messages = [block.split('\n') for block in response.text.split('\n\n') if block.startswith('id:')]
+    assert messages[0][:2] == ['id: 2', 'event: ready']
+    assert messages[1][:2] == ['id: 2', 'event: deleted']
+    assert '"name":"Weak TLS ciphers"' in messages[1][2]
+
+
+async def _take(events, count):
+    async for event in events:
+        yield event
+        count -= 1
+        if not count:
+            return
+
+
+@pytest.mark.asyncio
+async def test_exportdoc_ooxml_renders_cached_cartouches(client):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        user = await _create_user(session)
+        critical = _make_vuln('TLS misconfiguration', user, vector=None, level=VulnerabilityLevel.CRITICAL)
+        low = _make_vuln('Verbose banner', user, vector=None, level=VulnerabilityLevel.LOW)
+        session.add_all([critical, low])
+        await session.commit()
+        headers = await _create_api_token(session, user, ['export:doc'])
+
+    hits_before = metrics.counters.get('render_cache.exports.hits', 0)
+    ids = [str(critical.id), str(low.id)]
+    for _ in range(2):
+        response = await test_client.post(
+            '/api/vulns/exportdoc/batch', params={'format': 'ooxml'}, json={'ids': ids}, headers=headers
+        )
+        assert response.status_code == 200
+    assert metrics.counters['render_cache.exports.hits'] - hits_before == 2
+
+    package = etree.fromstring(response.content)
+    w = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+    tables = package.findall(f'.//{w}tbl')
+    assert len(tables) == 2
+    title = ''.join(tables[0].find(f'{w}tr').itertext())
+    assert title == 'TLS misconfiguration'
+    assert tables[0].find(f'.//{w}shd').get(f'{w}fill') == ooxml.LEVEL_COLORS['Critical']
+
+    single = await test_client.get(f'/api/vulns/{low.id}/exportdoc', params={'format': 'ooxml'}, headers=headers)
+    assert len(etree.fromstring(single.content).findall(f'.//{w}tbl')) == 1
+
+
+def test_render_cache_evicts_least_recently_used_within_budget():
+    cache = RenderCache('test-budget', max_bytes=3 * (100 + ENTRY_OVERHEAD))
+    for key in ('a', 'b', 'c'):
+        cache.get_or_render(key, lambda key=key: key.encode() * 100)
+    cache.get_or_render('a', lambda: pytest.fail('should be cached'))
+    cache.get_or_render('d', lambda: b'd' * 100)
+
+    assert len(cache) == 3
+    assert cache.size() <= cache.max_bytes
+    assert metrics.counters['render_cache.test-budget.evictions'] == 1
+    assert metrics.counters['render_cache.test-budget.hits'] == 1
+    assert cache.get_or_render('b', lambda: b'rerendered') == b'rerendered'
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_one_computation_and_survives_leader_cancel():
+    flight = SingleFlight('test-flight')
+    release = asyncio.Event()
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        await release.wait()
+        return b'library'
+
+    leader = asyncio.create_task(flight.do('key', compute))
+    await asyncio.sleep(0)
+    followers = [asyncio.create_task(flight.do('key', compute)) for _ in range(3)]
+    await asyncio.sleep(0)
+    leader.cancel()
+    while len(runs) < 2:  # a follower takes over
+        await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*followers) == [b'library'] * 3
+    assert len(runs) == 2 and len(flight) == 0
+    assert metrics.counters['single_flight.test-flight.leaders'] == 2
+    assert metrics.counters['single_flight.test-flight.shared'] == 5
+
+
+@pytest.mark.asyncio
+async def test_full_sync_served_from_precompressed_snapshot(client, tmp_path):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        user = await _create_user(session)
+        smb = _make_vuln('SMB signing not required', user, vector=None)
+        session.add_all([smb, _make_vuln('Weak TLS ciphers', user, vector=None)])
+        await session.commit()
+        headers = await _create_api_token(session, user, ['read:vulns'])
+
+    library_snapshots.configure(tmp_path)
+    try:
+        expected = (await test_client.get('/api/vulns/bulk', headers=headers)).json()
+        async with session_factory() as session:
+            await library_snapshots.refresh(session)
+
+        response = await test_client.get('/api/vulns/bulk', headers={**headers, 'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['content-encoding'] == 'gzip'
+        assert response.json() == expected
+        etag = response.headers['etag']
+        assert etag.startswith('"bulk-') and etag.endswith('-gzip"')
+        cached = await test_client.get(
+            '/api/vulns/bulk', headers={**headers, 'Accept-Encoding': 'br, gzip', 'If-None-Match': etag}
+        )
+        assert cached.status_code == 200 and cached.headers['content-encoding'] == 'br'
+        refused = await test_client.get('/api/vulns/bulk', headers={**headers, 'Accept-Encoding': 'br;q=0, gzip'})
+        assert refused.headers['content-encoding'] == 'gzip'
+
+        await _login(test_client)
+        response = await test_client.post('/api/vulns/export/xml')
+        assert response.headers['x-items-exported'] == '2'
+        assert response.headers['etag'].startswith('"export-')
+
+        # Any write makes the snapshot stale until it is rendered again.
+        assert (await test_client.put(f'/api/vulns/{smb.id}', json={'risk': 'Relay'})).status_code == 200
+        response = await test_client.get('/api/vulns/bulk', headers=headers)
+        assert 'etag' not in response.headers
+        assert next(item['risk'] for item in response.json() if item['id'] == str(smb.id)) == 'Relay'
+    finally:
+        library_snapshots.configure(None)
+
+
+@pytest.mark.asyncio
+async def test_busy_export_class_sheds_load_without_blocking_interactive(client, monkeypatch):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        user = await _create_user(session)
+        session.add(_make_vuln('SMB signing not required', user, vector=None))
+        await session.commit()
+    await _login(test_client)
+
+    exports = bulkheads['import_export']
+    monkeypatch.setattr(exports, 'queue_timeout', 0.05)
+    rejected_before = metrics.counters.get('bulkhead.import_export.rejected', 0)
+    async with AsyncExitStack() as stack:
+        for _ in range(exports.limit):
+            await stack.enter_async_context(exports.slot())
+
+        response = await test_client.post('/api/vulns/export/xml')
+        assert response.status_code == 503
+        assert response.headers['retry-after'] == str(exports.retry_after)
+        assert (await test_client.get('/api/vulns')).status_code == 200
+
+    assert metrics.counters['bulkhead.import_export.rejected'] - rejected_before == 1
+    assert (await test_client.post('/api/vulns/export/xml')).status_code == 200
+    assert exports.active == 0 and exports.queued == 0
+
+
+# Counts to three million: well over a second of real work for SQLite
+SLOW_SQL = 'WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 3000000) SELECT count(*) FROM n'
+
+
+@pytest.mark.asyncio
+async def test_slow_query_cancelled_when_client_disconnects(client, monkeypatch):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        await _create_user(session)
+    await _login(test_client)
+
+    async def slow_count_facets(db, filters):
+        await db.execute(text(SLOW_SQL))
+
+    monkeypatch.setattr(vulnerabilities_router, 'count_facets', slow_count_facets)
+
+    engine = session_factory.kw['bind'].sync_engine
+    running, invalidated, checked_in = [], [], []
+
+    def before_cursor_execute(conn, _cursor, statement, *_args):
+        if statement == SLOW_SQL:
+            running.append(conn.connection.dbapi_connection)
+
+    def on_invalidate(dbapi_connection, _record, _exception):
+        invalidated.append(dbapi_connection)
+
+    def on_checkin(dbapi_connection, _record):
+        checked_in.append(dbapi_connection)
+
+    listeners = [
+        (engine, 'before_cursor_execute', before_cursor_execute),
+        (engine.pool, 'invalidate', on_invalidate),
+        (engine.pool, 'checkin', on_checkin),
+    ]
+    for target, name, listener in listeners:
+        sa_event.listen(target, name, listener)
+
+    gone_at = asyncio.get_running_loop().time() + 0.3
+    sent = []
+
+    async def receive():
+        if asyncio.get_running_loop().time() < gone_at:
+            await asyncio.sleep(gone_at - asyncio.get_running_loop().time())
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': '/api/vulns/facets', 'raw_path': b'/api/vulns/facets', 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'test'), (b'cookie', f"session_id={test_client.cookies['session_id']}".encode())],
+        'client': ('127.0.0.1', 1234), 'server': ('test', 80),
+    }
+    before = metrics.counters.get('requests.cancelled_on_disconnect', 0)
+    try:
+        await asyncio.wait_for(app(scope, receive, send), timeout=10)
+    finally:
+        for target, name, listener in listeners:
+            sa_event.remove(target, name, listener)
+
+    assert sent[0]['status'] == 499
+    assert metrics.counters['requests.cancelled_on_disconnect'] - before == 1
+    assert bulkheads['interactive'].active == 0
+    # The connection running the statement was discarded, never checked back in live.
+    assert len(running) == 1
+    assert invalidated == running
+    assert running[0] not in checked_in
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_over_row_budget_is_refused_and_rolled_back(client, monkeypatch):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        user = await _create_user(session)
+        session.add_all([_make_vuln(f'Legacy {index}', user, vector=None) for index in range(3)])
+        await session.commit()
+    await _login(test_client)
+
+    endpoint = vulnerabilities_router.bulk_delete_vulnerabilities
+    monkeypatch.setitem(_endpoint_budgets, endpoint, QueryBudget(statement_timeout=60.0, max_rows=2))
+    before = metrics.counters.get('query_budget.rows_exceeded', 0)
+
+    response = await test_client.post('/api/vulns/bulk-delete', params={'q': 'Legacy'}, json={})
+    assert response.status_code == 413
+    assert response.json()['detail']['error'] == 'query_budget_exceeded'
+    assert response.json()['detail']['limit'] == 2
+    assert metrics.counters['query_budget.rows_exceeded'] - before == 1
+
+    async with session_factory() as session:
+        assert (await session.execute(select(func.count()).select_from(Vulnerability))).scalar_one() == 3
+
+
+@pytest.mark.asyncio
+async def test_exportdoc_batch_json_reuses_cached_cards(client):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        user = await _create_user(session)
+        vuln = _make_vuln('TLS misconfiguration', user, vector=None)
+        session.add(vuln)
+        await session.commit()
+        headers = await _create_api_token(session, user, ['export:doc'])
+
+    missing_id = '00000000-0000-0000-0000-000000000000'
+    misses_before = metrics.counters.get('render_cache.exports.misses', 0)
+    for _ in range(2):
+        response = await test_client.post(
+            '/api/vulns/exportdoc/batch', json={'ids': [str(vuln.id), missing_id, str(vuln.id)]}, headers=headers
+        )
+        assert response.status_code == 200
+    assert metrics.counters['render_cache.exports.misses'] - misses_before == 1
+
+    body = response.json()
+    assert [item['found'] for item in body['items']] == [True, False, True]
+    assert body['items'][0]['card']['name'] == 'TLS misconfiguration'
+    assert body['missing'] == [missing_id]
+
+
+@pytest.mark.asyncio
+async def test_docx_report_streams_reproducible_package(client):
+    test_client, session_factory = client
+
+    async with session_factory() as session:
+        user = await _create_user(session)
+        session.add_all([
+            _make_vuln('Weak ciphers', user, vector=None, level=VulnerabilityLevel.LOW),
+            _make_vuln('SQL injection', user, vector=None, level=VulnerabilityLevel.CRITICAL),
+            _make_vuln('Open redirect', user, vector=None, level=VulnerabilityLevel.MEDIUM, vuln_type=VulnerabilityType.API),
+        ])
+        await session.commit()
+
+    await _login(test_client)
+
+    response = await test_client.post('/api/vulns/report/docx', json={'title': 'Annexe'})
+    assert response.status_code == 200
+    assert response.headers['x-items-exported'] == '3'
+
+    with zipfile.ZipFile(io.BytesIO(response.content)) as package:
+        assert package.testzip() is None
+        assert {'[Content_Types].xml', 'word/document.xml', 'word/styles.xml'} <= set(package.namelist())
+        document = etree.fromstring(package.read('word/document.xml'))
+
+    w = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+    titles = [''.join(table.find(f'{w}tr').itertext()) for table in document.iter(f'{w}tbl')]
+    assert titles == ['SQL injection', 'Open redirect', 'Weak ciphers']
+
+    again = await test_client.post('/api/vulns/report/docx', json={'title': 'Annexe'})
+    assert again.content == response.content
+
+    filtered = await test_client.post('/api/vulns/report/docx', params={'type': 'API'}, json={})
+    assert filtered.headers['x-items-exported'] == '1'
@@ -82,6 +82,7 @@ export default function VulnerabilityFormModal({ isOpen, onClose, vulnerability
   const isEdit = !!vulnerability
   const [showCVSSCalculator, setShowCVSSCalculator] = useState(false)
   const [debouncedName, setDebouncedName] = useState('')
+  const [debouncedDraft, setDebouncedDraft] = useState('')
 
   // Fetch vulnerability types with metadata
   const { data: typesData } = useQuery({
@@ -114,6 +115,18 @@ export default function VulnerabilityFormModal({ isOpen, onClose, vulnerability
     return () => clearTimeout(h)
   }, [formData.name])
 
+  // Debounce name + description for the similar-findings lookup
+  useEffect(() => {
+    const h = setTimeout(() => setDebouncedDraft(`${formData.name} ${formData.description}`.trim()), 500)
+    return () => clearTimeout(h)
+  }, [formData.name, formData.description])
+
+  const { data: similarData } = useQuery({
+    queryKey: ['vulnerabilities', 'similar', debouncedDraft],
+    queryFn: () => vulnsApi.similar(debouncedDraft).then((res) => res.data),
+    enabled: debouncedDraft.length >= 20 && isOpen,
+  })
+
   // Fetch possible duplicates as user types name and selects type
   const { data: duplicateData } = useQuery({
     queryKey: ['vulnerabilities', 'dupecheck', debouncedName, formData.type],
@@ -137,6 +150,10 @@ export default function VulnerabilityFormModal({ isOpen, onClose, vulnerability
   const exactDuplicate = possibleDuplicates.some(
     (v) => v.name?.trim().toLowerCase() === formData.name.trim().toLowerCase() && v.type === formData.type,
   )
+  // Hide the entry being edited and anything already listed as a name duplicate
+  const similarFindings = (similarData || []).filter(
+    (v) => !(vulnerability && v.id === vulnerability.id) && !possibleDuplicates.some((d) => d.id === v.id),
+  )
 
   useEffect(() => {
     if (vulnerability) {
@@ -491,6 +508,21 @@ export default function VulnerabilityFormModal({ isOpen, onClose, vulnerability
                 className="input w-full"
                 placeholder="Detailed description of the vulnerability..."
               />
+              {similarFindings.length > 0 && (
+                <div className="mt-2 rounded-md border border-blue-200 dark:border-blue-800 bg-blue-50/50 dark:bg-blue-900/20 p-3">
+                  <p className="mb-1 text-xs font-medium text-gray-600 dark:text-gray-400">Similar existing findings</p>
+                  <ul className="space-y-1 mt-2">
+                    {similarFindings.map((v) => (
+                      <li key={v.id} className="flex items-center justify-between text-xs">
+                        <span className="truncate pr-2 text-gray-800 dark:text-gray-200">{v.name}</span>
+                        <span className="rounded px-1.5 py-0.5 text-[10px] font-semibold bg-gray-100 dark:bg-gray-700 text-gray-700 dark:text-gray-200">
+                          {Math.round(v.score * 100)}%
+                        </span>
+                      </li>
+                    ))}
+                  </ul>
+                </div>
+              )}
             </div>
 
             {/* Risk */}
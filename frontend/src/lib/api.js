@@ -19,7 +19,10 @@ api.interceptors.response.use(
       broadcastUnauthorized()
     } else if (status === 403) {
       notify('You do not have permission to perform this action.', 'error')
-    } else if (!status) {
+    } else if (status === 503) {
+      const retryAfter = error.response.headers['retry-after']
+      notify(`The server is busy. Please retry${retryAfter ? ` in ${retryAfter}s` : ' shortly'}.`, 'warning')
+    } else if (!status && !axios.isCancel(error)) {
       notify('Network error. Please check your connection.', 'error')
     }
     return Promise.reject(error)
@@ -35,12 +38,16 @@ export const authApi = {
 
 // Vulnerabilities
 export const vulnsApi = {
-  search: (params) => api.get('/api/vulns', { params }),
+  search: (params, signal) => api.get('/api/vulns', { params, signal }),
   get: (id) => api.get(`/api/vulns/${id}`),
   create: (data) => api.post('/api/vulns', data),
   update: (id, data) => api.put(`/api/vulns/${id}`, data),
   delete: (id) => api.delete(`/api/vulns/${id}`),
   getHistory: (id) => api.get(`/api/vulns/${id}/history`),
+  suggest: (prefix, limit = 8) => api.get('/api/vulns/suggest', { params: { prefix, limit } }),
+  similar: (text, limit = 5) => api.get('/api/vulns/similar', { params: { text, limit } }),
+  // Server-Sent Events; EventSource resumes with Last-Event-ID after a reconnect
+  changes: () => new EventSource('/api/vulns/stream', { withCredentials: true }),
   importXml: (file) => {
     const formData = new FormData()
     formData.append('file', file)
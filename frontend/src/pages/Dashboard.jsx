@@ -1,4 +1,4 @@
-import { useState } from 'react'
+import { useEffect, useState } from 'react'
 import { useQuery, useQueryClient, useMutation } from '@tanstack/react-query'
 import Layout from '../components/Layout'
 import { vulnsApi } from '../lib/api'
@@ -11,6 +11,7 @@ import { useAuth } from '../contexts/AuthContext'
 
 export default function Dashboard() {
   const { user } = useAuth()
+  const [searchInput, setSearchInput] = useState('')
   const [searchQuery, setSearchQuery] = useState('')
   const [filters, setFilters] = useState({})
   const [showFilters, setShowFilters] = useState(false)
@@ -22,16 +23,53 @@ export default function Dashboard() {
 
   const canEdit = user?.role === 'editor' || user?.role === 'admin'
 
+  // Run the full search once typing pauses; keystrokes only hit the typeahead
+  useEffect(() => {
+    const h = setTimeout(() => setSearchQuery(searchInput.trim()), 300)
+    return () => clearTimeout(h)
+  }, [searchInput])
+
+  // Refresh lists when anyone commits a change instead of polling
+  useEffect(() => {
+    const source = vulnsApi.changes()
+    let timer
+    const refresh = () => {
+      clearTimeout(timer)
+      timer = setTimeout(() => queryClient.invalidateQueries({ queryKey: ['vulnerabilities'] }), 250)
+    }
+    for (const action of ['created', 'updated', 'deleted']) {
+      source.addEventListener(action, refresh)
+    }
+    source.addEventListener('ready', (event) => {
+      if (JSON.parse(event.data).reset) refresh()
+    })
+    return () => {
+      clearTimeout(timer)
+      source.close()
+    }
+  }, [queryClient])
+
+  const { data: suggestions } = useQuery({
+    queryKey: ['vulnerabilities', 'suggest', searchInput.trim()],
+    queryFn: () => vulnsApi.suggest(searchInput.trim()).then((res) => res.data),
+    enabled: searchInput.trim().length >= 2,
+    staleTime: 1000 * 30,
+  })
+
   const { data, isLoading, isFetching } = useQuery({
     queryKey: ['vulnerabilities', searchQuery, filters, page, perPage],
-    queryFn: () =>
+    // The signal aborts a superseded search, which also stops its query server-side
+    queryFn: ({ signal }) =>
       vulnsApi
-        .search({
-          q: searchQuery || undefined,
-          ...filters,
-          page,
-          per_page: perPage,
-        })
+        .search(
+          {
+            q: searchQuery || undefined,
+            ...filters,
+            page,
+            per_page: perPage,
+          },
+          signal,
+        )
         .then((res) => res.data),
     keepPreviousData: true,
   })
@@ -161,13 +199,19 @@ export default function Dashboard() {
                 <input
                   type="text"
                   placeholder="Search vulnerabilities..."
-                  value={searchQuery}
+                  value={searchInput}
                   onChange={(e) => {
-                    setSearchQuery(e.target.value)
+                    setSearchInput(e.target.value)
                     setPage(1)
                   }}
+                  list="vulnerability-suggestions"
                   className="input pl-10"
                 />
+                <datalist id="vulnerability-suggestions">
+                  {(suggestions || []).map((item) => (
+                    <option key={item.id} value={item.name} />
+                  ))}
+                </datalist>
               </div>
               <button
                 onClick={() => setShowFilters(!showFilters)}
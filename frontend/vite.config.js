@@ -11,6 +11,7 @@ export default defineConfig({
         // In Docker, use service name 'api', otherwise localhost
         target: process.env.VITE_PROXY_TARGET || process.env.VITE_API_URL || 'http://localhost:8000',
         changeOrigin: true,
+        ws: true,
       },
     },
   },
@@ -50,6 +50,45 @@ ErrorHandler:
     ApiGet = ""
 End Function
 
+' Private function to make HTTP POST requests with a JSON body
+Private Function ApiPost(ByVal url As String, ByVal token As String, ByVal body As String) As String
+    On Error GoTo ErrorHandler
+
+    Dim http As Object
+    Set http = CreateObject("MSXML2.XMLHTTP")
+
+    http.Open "POST", url, False
+    If Len(token) > 0 Then
+        http.setRequestHeader "Authorization", "Bearer " & token
+    End If
+    http.setRequestHeader "Content-Type", "application/json"
+    http.send body
+
+    If http.Status = 401 Or http.Status = 403 Then
+        MsgBox "Token invalide, expiré ou révoqué." & vbCrLf & vbCrLf & _
+               "Merci d'enregistrer un nouveau token via Settings.", _
+               vbExclamation, "VulnManager"
+        ApiPost = ""
+        Exit Function
+    ElseIf http.Status <> 200 Then
+        MsgBox "Erreur API: " & http.Status & " - " & http.statusText, _
+               vbExclamation, "VulnManager"
+        ApiPost = ""
+        Exit Function
+    End If
+
+    ApiPost = http.responseText
+
+    Set http = Nothing
+    Exit Function
+
+ErrorHandler:
+    MsgBox "Erreur de connexion: " & Err.Description & vbCrLf & vbCrLf & _
+           "Vérifiez que l'API est accessible.", _
+           vbCritical, "VulnManager"
+    ApiPost = ""
+End Function
+
 ' Get vulnerabilities for cache (bulk endpoint)
 Public Function GetBulk(Optional ByVal updatedSince As String = "") As String
     Dim url As String
@@ -66,6 +105,94 @@ Public Function GetBulk(Optional ByVal updatedSince As String = "") As String
     GetBulk = ApiGet(url, token)
 End Function
 
+' Get lightweight catalog (id, name, level, type, score, version per entry)
+' etag: ETag of the cached catalog, sent as If-None-Match (empty for a full fetch)
+' newEtag receives the ETag of the returned catalog; notModified is True on 304,
+' in which case the cached catalog is current and "" is returned
+Public Function GetCatalog(ByVal etag As String, ByRef newEtag As String, ByRef notModified As Boolean) As String
+    On Error GoTo ErrorHandler
+
+    Dim http As Object
+
+    notModified = False
+    newEtag = ""
+
+    ' ServerXMLHTTP has no WinInet cache, so a 304 reaches us instead of a cached 200
+    Set http = CreateObject("MSXML2.ServerXMLHTTP.6.0")
+
+    http.Open "GET", GetApiBase() & "/api/vulns/catalog", False
+    http.setRequestHeader "Authorization", "Bearer " & GetVulnToken()
+    If Len(etag) > 0 Then
+        http.setRequestHeader "If-None-Match", etag
+    End If
+    http.send
+
+    If http.Status = 304 Then
+        notModified = True
+        newEtag = etag
+        GetCatalog = ""
+        Exit Function
+    ElseIf http.Status = 401 Or http.Status = 403 Then
+        MsgBox "Token invalide, expiré ou révoqué." & vbCrLf & vbCrLf & _
+               "Merci d'enregistrer un nouveau token via Settings.", _
+               vbExclamation, "VulnManager"
+        GetCatalog = ""
+        Exit Function
+    ElseIf http.Status <> 200 Then
+        MsgBox "Erreur API: " & http.Status & " - " & http.statusText, _
+               vbExclamation, "VulnManager"
+        GetCatalog = ""
+        Exit Function
+    End If
+
+    newEtag = http.getResponseHeader("ETag")
+    GetCatalog = http.responseText
+
+    Set http = Nothing
+    Exit Function
+
+ErrorHandler:
+    MsgBox "Erreur de connexion: " & Err.Description & vbCrLf & vbCrLf & _
+           "Vérifiez que l'API est accessible.", _
+           vbCritical, "VulnManager"
+    GetCatalog = ""
+End Function
+
+' Get full records for several vulnerabilities in one request
+' idsJson: JSON array of quoted IDs, e.g. ["id1","id2"]
+Public Function GetDetails(ByVal idsJson As String) As String
+    GetDetails = ApiPost(GetApiBase() & "/api/vulns/details", GetVulnToken(), "{""ids"":" & idsJson & "}")
+End Function
+
+' Typeahead: up to `limit` names starting with (a word starting with) prefix, most exported first
+Public Function Suggest(ByVal prefix As String, Optional ByVal limit As Integer = 10) As String
+    Suggest = ApiGet(GetApiBase() & "/api/vulns/suggest?prefix=" & UrlEncode(prefix) & "&limit=" & limit, GetVulnToken())
+End Function
+
+' Percent-encode a query string value as UTF-8
+Private Function UrlEncode(ByVal value As String) As String
+    Dim i As Long
+    Dim code As Long
+    Dim result As String
+
+    For i = 1 To Len(value)
+        code = AscW(Mid$(value, i, 1)) And &HFFFF&
+        If (code >= 48 And code <= 57) Or (code >= 65 And code <= 90) Or (code >= 97 And code <= 122) _
+           Or code = 45 Or code = 46 Or code = 95 Or code = 126 Then
+            result = result & ChrW(code)
+        ElseIf code < &H80& Then
+            result = result & "%" & Right$("0" & Hex$(code), 2)
+        ElseIf code < &H800& Then
+            result = result & "%" & Hex$(&HC0& Or (code \ &H40&)) & "%" & Hex$(&H80& Or (code And &H3F&))
+        Else
+            result = result & "%" & Hex$(&HE0& Or (code \ &H1000&)) & "%" & Hex$(&H80& Or ((code \ &H40&) And &H3F&)) _
+                            & "%" & Hex$(&H80& Or (code And &H3F&))
+        End If
+    Next i
+
+    UrlEncode = result
+End Function
+
 ' Get vulnerability details for document export (exportdoc endpoint)
 Public Function GetCardJson(ByVal vulnId As String) As String
     Dim url As String
@@ -77,6 +204,17 @@ Public Function GetCardJson(ByVal vulnId As String) As String
     GetCardJson = ApiGet(url, token)
 End Function
 
+' Get several cards for document export in one request (exportdoc batch endpoint)
+' idsJson: JSON array of quoted IDs in insertion order
+Public Function GetCardsJson(ByVal idsJson As String) As String
+    GetCardsJson = ApiPost(GetApiBase() & "/api/vulns/exportdoc/batch?format=json", GetVulnToken(), "{""ids"":" & idsJson & "}")
+End Function
+
+' Get several cartouches rendered as OOXML (Flat OPC) for Range.InsertXML
+Public Function GetCardsOoxml(ByVal idsJson As String) As String
+    GetCardsOoxml = ApiPost(GetApiBase() & "/api/vulns/exportdoc/batch?format=ooxml", GetVulnToken(), "{""ids"":" & idsJson & "}")
+End Function
+
 ' Validate token (check if it's still valid)
 Public Function ValidateToken() As Boolean
     On Error GoTo ErrorHandler
@@ -6,6 +6,7 @@ Option Explicit
 
 Private Const CACHE_NAMESPACE As String = "VulnManager/Cache"
 Private Const CACHE_MAX_AGE_HOURS As Integer = 24
+Private Const DETAILS_BATCH_SIZE As Long = 500
 
 ' Get cache XML part
 Private Function GetCachePart() As Object
@@ -27,12 +28,19 @@ Private Function GetCachePart() As Object
     On Error GoTo 0
 End Function
 
-' Save vulnerabilities to cache
-Public Sub SaveCache(ByVal jsonData As String)
+' Save the catalog to cache, with the full records fetched so far and the catalog ETag
+' detailsJson: JSON object mapping id to full record (each carrying the catalog "v" it was fetched at)
+Public Sub SaveCache(ByVal jsonData As String, Optional ByVal detailsJson As String = "{}", _
+                     Optional ByVal etag As String = "")
+    WriteCache jsonData, detailsJson, etag, Format(Now, "yyyy-mm-ddThh:nn:ss") & "Z"
+End Sub
+
+' Replace the cache part, keeping the given lastSync timestamp
+Private Sub WriteCache(ByVal jsonData As String, ByVal detailsJson As String, _
+                       ByVal etag As String, ByVal lastSync As String)
     On Error GoTo ErrorHandler
 
     Dim part As Object
-    Dim lastSync As String
 
     ' Delete existing cache
     Set part = GetCachePart()
@@ -40,12 +48,11 @@ Public Sub SaveCache(ByVal jsonData As String)
         part.Delete
     End If
 
-    ' Create new cache with current timestamp
-    lastSync = Format(Now, "yyyy-mm-ddThh:nn:ss") & "Z"
-
     Set part = ActiveDocument.CustomXMLParts.Add( _
-        "<cache xmlns=""" & CACHE_NAMESPACE & """ lastSync=""" & lastSync & """>" & _
+        "<cache xmlns=""" & CACHE_NAMESPACE & """ lastSync=""" & lastSync & """" & _
+        " etag=""" & Replace(etag, """", "&quot;") & """>" & _
         "<data><![CDATA[" & jsonData & "]]></data>" & _
+        "<details><![CDATA[" & detailsJson & "]]></details>" & _
         "</cache>")
 
     Exit Sub
@@ -54,39 +61,89 @@ ErrorHandler:
     MsgBox "Erreur lors de la sauvegarde du cache: " & Err.Description, vbExclamation
 End Sub
 
-' Load vulnerabilities from cache
-Public Function LoadCache() As String
+' Extract the CDATA content of a cache element
+Private Function ReadCacheElement(ByVal elementName As String) As String
     On Error GoTo ErrorHandler
 
     Dim part As Object
     Dim xml As String
-    Dim dataNode As Object
+    Dim openTag As String
+    Dim startPos As Long
+    Dim endPos As Long
 
     Set part = GetCachePart()
     If part Is Nothing Then
-        LoadCache = ""
+        ReadCacheElement = ""
         Exit Function
     End If
 
     xml = part.xml
+    openTag = "<" & elementName & "><![CDATA["
+
+    startPos = InStr(xml, openTag)
+    If startPos = 0 Then
+        ReadCacheElement = ""
+        Exit Function
+    End If
+    startPos = startPos + Len(openTag)
+    endPos = InStr(startPos, xml, "]]></" & elementName & ">")
+
+    If endPos > startPos Then
+        ReadCacheElement = Mid(xml, startPos, endPos - startPos)
+    Else
+        ReadCacheElement = ""
+    End If
+
+    Exit Function
+
+ErrorHandler:
+    ReadCacheElement = ""
+End Function
+
+' Load the catalog from cache: {"version": ..., "items": [{id, name, level, type, cvss_score, v}, ...]}
+Public Function LoadCache() As String
+    LoadCache = ReadCacheElement("data")
+End Function
+
+' Load the cached full records: {"<id>": {...record..., "v": ...}, ...}
+Public Function LoadDetails() As String
+    LoadDetails = ReadCacheElement("details")
+    If Len(LoadDetails) = 0 Then
+        LoadDetails = "{}"
+    End If
+End Function
 
-    ' Extract CDATA content
+' Get the ETag of the cached catalog (sent as If-None-Match on the next sync)
+Public Function GetCacheEtag() As String
+    On Error GoTo ErrorHandler
+
+    Dim part As Object
+    Dim xml As String
     Dim startPos As Long
     Dim endPos As Long
 
-    startPos = InStr(xml, "<![CDATA[")
-    endPos = InStr(xml, "]]>")
+    ' Without a catalog the ETag is useless: a 304 would leave nothing to show
+    If Len(LoadCache()) = 0 Then
+        GetCacheEtag = ""
+        Exit Function
+    End If
 
-    If startPos > 0 And endPos > startPos Then
-        LoadCache = Mid(xml, startPos + 9, endPos - startPos - 9)
+    Set part = GetCachePart()
+    xml = part.xml
+
+    startPos = InStr(xml, "etag=""")
+    If startPos > 0 Then
+        startPos = startPos + 6
+        endPos = InStr(startPos, xml, """")
+        GetCacheEtag = Replace(Mid(xml, startPos, endPos - startPos), "&quot;", """")
     Else
-        LoadCache = ""
+        GetCacheEtag = ""
     End If
 
     Exit Function
 
 ErrorHandler:
-    LoadCache = ""
+    GetCacheEtag = ""
 End Function
 
 ' Get last sync timestamp
@@ -151,30 +208,36 @@ Public Function NeedsRefresh() As Boolean
 End Function
 
 ' Sync cache with API
+' The catalog is requested with If-None-Match: a 304 keeps the cache as is. Otherwise
+' only the cached full records whose "v" changed are fetched again; records of
+' entries that left the catalog are dropped.
 Public Sub SyncCache()
     On Error GoTo ErrorHandler
 
     Dim jsonData As String
-    Dim lastSync As String
+    Dim etag As String
+    Dim newEtag As String
+    Dim notModified As Boolean
 
     ' Show progress
     Application.StatusBar = "Synchronizing vulnerabilities..."
 
-    ' Get last sync for incremental update
-    lastSync = GetLastSync()
-
-    ' Fetch from API
-    jsonData = GetBulk(lastSync)
+    ' Fetch the lightweight catalog; full cards are fetched on insertion
+    etag = GetCacheEtag()
+    jsonData = GetCatalog(etag, newEtag, notModified)
 
-    If Len(jsonData) = 0 Then
+    If notModified Then
+        ' Nothing changed on the server: only the sync timestamp moves
+        SaveCache LoadCache(), LoadDetails(), etag
+    ElseIf Len(jsonData) = 0 Then
         MsgBox "Échec de la synchronisation. Vérifiez votre connexion.", vbExclamation
         Application.StatusBar = False
         Exit Sub
+    Else
+        ' Save to cache
+        SaveCache jsonData, RefreshDetails(jsonData, LoadDetails()), newEtag
     End If
 
-    ' Save to cache
-    SaveCache jsonData
-
     Application.StatusBar = "Synchronization complete!"
 
     ' Clear status bar after 2 seconds
@@ -187,6 +250,115 @@ ErrorHandler:
     Application.StatusBar = False
 End Sub
 
+' Bring the cached full records in line with a new catalog; returns the records as JSON
+Private Function RefreshDetails(ByVal catalogJson As String, ByVal detailsJson As String) As String
+    Dim versions As Object
+    Dim details As Object
+    Dim stale As Collection
+    Dim vulnId As Variant
+
+    Set versions = CatalogVersions(catalogJson)
+    Set details = ParseJson(detailsJson)
+    Set stale = New Collection
+
+    For Each vulnId In details.Keys
+        If Not versions.Exists(vulnId) Then
+            details.Remove vulnId
+        ElseIf details(vulnId)("v") <> versions(vulnId) Then
+            stale.Add vulnId
+        End If
+    Next vulnId
+
+    If stale.Count > 0 Then
+        FetchDetails stale, details, versions
+    End If
+
+    RefreshDetails = ConvertToJson(details)
+End Function
+
+' Map each catalog id to its version "v"
+Private Function CatalogVersions(ByVal catalogJson As String) As Object
+    Dim catalog As Object
+    Dim item As Variant
+
+    Set CatalogVersions = CreateObject("Scripting.Dictionary")
+    If Len(catalogJson) = 0 Then
+        Exit Function
+    End If
+
+    Set catalog = ParseJson(catalogJson)
+    For Each item In catalog("items")
+        CatalogVersions(item("id")) = item("v")
+    Next item
+End Function
+
+' Fetch full records for ids (in batches the details endpoint accepts) into details
+' Each record is stamped with its catalog version; ids the server no longer has are dropped
+Private Sub FetchDetails(ByVal ids As Collection, ByVal details As Object, ByVal versions As Object)
+    Dim batch() As String
+    Dim response As Object
+    Dim record As Variant
+    Dim vulnId As Variant
+    Dim jsonData As String
+    Dim first As Long
+    Dim i As Long
+    Dim n As Long
+
+    For first = 1 To ids.Count Step DETAILS_BATCH_SIZE
+        n = ids.Count - first + 1
+        If n > DETAILS_BATCH_SIZE Then n = DETAILS_BATCH_SIZE
+        ReDim batch(0 To n - 1)
+        For i = 0 To n - 1
+            batch(i) = ids(first + i)
+        Next i
+
+        jsonData = GetDetails("[""" & Join(batch, """,""") & """]")
+        ' On failure the remaining records keep their old "v" and are fetched again later
+        If Len(jsonData) = 0 Then
+            Exit Sub
+        End If
+
+        Set response = ParseJson(jsonData)
+        For Each record In response("items")
+            record("v") = versions(record("id"))
+            Set details(record("id")) = record
+        Next record
+        For Each vulnId In response("missing")
+            If details.Exists(vulnId) Then details.Remove vulnId
+        Next vulnId
+    Next first
+End Sub
+
+' Get the full record of one vulnerability, from cache when its "v" still matches the catalog
+Public Function GetVulnerabilityDetails(ByVal vulnId As String) As Object
+    Dim versions As Object
+    Dim details As Object
+    Dim ids As Collection
+
+    Set versions = CatalogVersions(LoadCache())
+    Set details = ParseJson(LoadDetails())
+
+    If details.Exists(vulnId) And versions.Exists(vulnId) Then
+        If details(vulnId)("v") = versions(vulnId) Then
+            Set GetVulnerabilityDetails = details(vulnId)
+            Exit Function
+        End If
+    End If
+
+    Set ids = New Collection
+    ids.Add vulnId
+    FetchDetails ids, details, versions
+
+    If Not details.Exists(vulnId) Then
+        Set GetVulnerabilityDetails = Nothing
+        Exit Function
+    End If
+
+    ' Keep the record for the next insertion, without moving the sync timestamp
+    WriteCache LoadCache(), ConvertToJson(details), GetCacheEtag(), GetLastSync()
+    Set GetVulnerabilityDetails = details(vulnId)
+End Function
+
 ' Helper to clear status bar
 Public Sub ClearStatusBar()
     Application.StatusBar = False
@@ -8,20 +8,16 @@ Option Explicit
 Public Sub InsertVulnerability(ByVal vulnId As String)
     On Error GoTo ErrorHandler
 
-    Dim jsonData As String
     Dim vuln As Object
 
-    ' Get vulnerability details from API
-    jsonData = GetCardJson(vulnId)
+    ' Get vulnerability details from cache, or from the API if missing or outdated
+    Set vuln = GetVulnerabilityDetails(vulnId)
 
-    If Len(jsonData) = 0 Then
+    If vuln Is Nothing Then
         MsgBox "Impossible de récupérer la vulnérabilité.", vbExclamation
         Exit Sub
     End If
 
-    ' Parse JSON (requires VBA-JSON module)
-    Set vuln = ParseJson(jsonData)
-
     ' Insert cartouche
     InsertCartouche vuln
 
@@ -33,6 +29,29 @@ ErrorHandler:
     MsgBox "Erreur lors de l'insertion: " & Err.Description, vbCritical
 End Sub
 
+' Insert several vulnerabilities at cursor position with a single InsertXML call
+' idsJson: JSON array of quoted IDs in report order
+' The server renders the cartouche tables (level colors, CVSS row)
+Public Sub InsertVulnerabilities(ByVal idsJson As String)
+    On Error GoTo ErrorHandler
+
+    Dim ooxml As String
+
+    ooxml = GetCardsOoxml(idsJson)
+
+    If Len(ooxml) = 0 Then
+        MsgBox "Impossible de récupérer les vulnérabilités.", vbExclamation
+        Exit Sub
+    End If
+
+    Selection.Range.InsertXML ooxml
+
+    Exit Sub
+
+ErrorHandler:
+    MsgBox "Erreur lors de l'insertion: " & Err.Description, vbCritical
+End Sub
+
 ' Insert formatted cartouche
 Private Sub InsertCartouche(ByVal vuln As Object)
     Dim rng As Range